@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Build the bit-packed land/sea mask used for tsunami feature engineering
+
+The source is the 1 km GLOBE land mask shipped with the `global-land-mask`
+package (pip install global-land-mask, only needed to rebuild the file).
+It is downsampled to a 0.1 degree grid where a cell counts as ocean when most
+of it is ocean, then bit-packed row by row:
+
+    rows    -> latitude from 90N down to 90S
+    columns -> longitude from 180W eastwards, 8 cells per byte (MSB first)
+    bit set -> ocean
+
+The result is saved as models/ocean_mask.npy so main.py can memory-map it.
+"""
+
+import os
+import numpy as np
+
+RESOLUTION_DEG = 0.1
+
+def build_ocean_mask(resolution_deg: float = RESOLUTION_DEG) -> np.ndarray:
+    """Downsample the GLOBE mask to a majority-vote ocean grid"""
+    from global_land_mask import globe
+
+    source = globe._mask  # (21600, 43200) bool, True = ocean
+    source_rows, source_cols = source.shape
+
+    rows = int(round(180 / resolution_deg))
+    cols = int(round(360 / resolution_deg))
+    block = source_rows // rows
+    if source_rows % rows or source_cols != cols * block:
+        raise ValueError(f"Resolution {resolution_deg} does not evenly divide the source grid")
+
+    print(f"🌍 Downsampling {source_rows}x{source_cols} GLOBE mask to {rows}x{cols} cells...")
+
+    ocean = np.zeros((rows, cols), dtype=bool)
+    for row in range(rows):
+        band = source[row * block:(row + 1) * block]
+        ocean_cells = band.reshape(block, cols, block).sum(axis=(0, 2))
+        ocean[row] = ocean_cells * 2 > block * block
+
+    return ocean
+
+def save_ocean_mask():
+    """Build the mask and save it next to the other models"""
+    try:
+        ocean = build_ocean_mask()
+    except ImportError:
+        print("❌ global-land-mask is not installed (pip install global-land-mask)")
+        return False
+
+    packed = np.packbits(ocean, axis=1)
+
+    models_dir = os.path.join(os.path.dirname(__file__), 'models')
+    os.makedirs(models_dir, exist_ok=True)
+    mask_path = os.path.join(models_dir, 'ocean_mask.npy')
+    np.save(mask_path, packed)
+
+    print(f"💾 Mask saved to: {mask_path}")
+    print(f"📁 File size: {os.path.getsize(mask_path):,} bytes, ocean fraction: {ocean.mean():.3f}")
+
+    # Spot checks: Tokyo/Jakarta/Delhi are land, mid-Pacific/Bay of Bengal are ocean
+    checks = [(35.68, 139.69, False), (-6.2, 106.85, False), (28.61, 77.21, False),
+              (0.0, -150.0, True), (15.0, 88.0, True)]
+    for lat, lon, expected in checks:
+        row = int((90 - lat) / RESOLUTION_DEG)
+        col = int((lon + 180) / RESOLUTION_DEG)
+        status = "✅" if ocean[row, col] == expected else "❌"
+        print(f"{status} ({lat}, {lon}) ocean={bool(ocean[row, col])}")
+
+    return True
+
+if __name__ == "__main__":
+    print("🔧 Building land/sea mask...")
+    if save_ocean_mask():
+        print("✅ Land/sea mask built successfully!")
+    else:
+        print("❌ Failed to build land/sea mask!")
@@ -0,0 +1,103 @@
+"""
+In-process helpers for upstream calls shared by every request handler
+
+    SingleFlight -> one in-flight fetch per key; concurrent callers share its result
+    TTLCache     -> LRU responses with per-entry expiry and a memory cap
+    grid_cell    -> snaps coordinates to a grid cell so nearby lookups share a key
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+class SingleFlight:
+    """Coalesce concurrent identical upstream calls into one in-flight request
+    
+    Callers asking for a key that is already being fetched await the same task and
+    get the same result. The task is shielded so a caller disconnecting does not
+    cancel the fetch for everyone else.
+    """
+    
+    def __init__(self):
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+    
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self.forget(key, done))
+        return await asyncio.shield(task)
+    
+    def forget(self, key: Hashable, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+
+class TTLCache:
+    """LRU cache with per-entry expiry, an approximate memory cap and hit/miss counters
+    
+    Entry size is estimated from the JSON encoding of the value when it is stored.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict = OrderedDict()  # key -> (expires_at, size_bytes, value)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self.remove(key)
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: float):
+        self.remove(key)
+        size = len(json.dumps(value, default=str))
+        self.entries[key] = (time.monotonic() + ttl_seconds, size, value)
+        self.total_bytes += size
+        
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest = next(iter(self.entries))
+            self.remove(oldest)
+            self.evictions += 1
+    
+    def remove(self, key: Hashable):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'size_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
+
+def grid_cell(lat: float, lon: float, step: float) -> Tuple[float, float]:
+    """Snap coordinates to the center of their `step`-degree grid cell
+    
+    Centers stay valid coordinates: latitude is clamped to [-90, 90] and
+    longitude wrapped into [-180, 180), so lon=180 shares lon=-180's cell.
+    """
+    lon = (lon + 180) % 360 - 180
+    return (
+        round(min(90.0, max(-90.0, math.floor(lat / step) * step + step / 2)), 6),
+        round(min(180 - step / 2, math.floor(lon / step) * step + step / 2), 6)
+    )
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Export the pickled models to the compiled array format (see compiled_models.py)
+
+Run after retraining or replacing any model pickle:
+
+    python compile_models.py
+
+Writes models/compiled/{tsunami,flood,cyclone}/ next to the pickles. Each
+export is staged, loaded back and checked against its source estimator before
+it replaces the previous one, so a mismatching export is never stamped with
+the pickle's fingerprint. The API also refreshes stale exports on startup, so
+this is mainly for building them ahead of a deploy.
+"""
+
+import os
+import pickle
+
+from compiled_models import export_compiled_model, export_lock, file_fingerprint
+from main import MODEL_PICKLES, export_check
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+COMPILED_DIR = os.path.join(MODELS_DIR, 'compiled')
+
+def export(name: str, filename: str, unpack) -> bool:
+    """Export one model pickle; the export only lands if it predicts like the original"""
+    pickle_path = os.path.join(MODELS_DIR, filename)
+    path = os.path.join(COMPILED_DIR, name)
+    try:
+        with open(pickle_path, 'rb') as f:
+            estimator, scaler, metadata = unpack(pickle.load(f))
+        with export_lock(path):
+            manifest = export_compiled_model(path, estimator, scaler, metadata,
+                                             source=file_fingerprint(pickle_path),
+                                             verify=export_check(estimator, scaler))
+    except Exception as e:
+        print(f"❌ {name}: {e}")
+        return False
+
+    size = sum(os.path.getsize(os.path.join(path, entry)) for entry in os.listdir(path))
+    print(f"💾 {name}: {manifest['estimator']} -> {path} ({size:,} bytes)")
+    print(f"✅ {name}: round trip verified")
+    return True
+
+def compile_all() -> bool:
+    results = [export(name, filename, unpack) for name, (filename, unpack) in MODEL_PICKLES.items()]
+    return all(results)
+
+if __name__ == "__main__":
+    print("🔧 Compiling models...")
+    if compile_all():
+        print("✅ All models compiled successfully!")
+    else:
+        print("❌ Some models failed to compile!")
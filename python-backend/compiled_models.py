@@ -0,0 +1,388 @@
+"""
+Array-based model format for fast, pickle-free loading
+
+A compiled model is a directory holding one .npy file per array plus a
+manifest.json describing them:
+
+    models/compiled/tsunami/
+        manifest.json
+        children.npy  feature.npy  threshold.npy  value.npy
+        scaler_mean.npy  scaler_scale.npy
+
+Arrays are stored in exactly the layout the evaluators index, and are
+memory-mapped on load, so every worker process scores straight from the same
+page-cache pages and loading needs neither pickle nor scikit-learn. Exporting
+(export_compiled_model) reads attributes off fitted scikit-learn estimators
+but does not import it either. The manifest records a fingerprint of the
+pickle an export was made from, so loaders can tell when it is out of date.
+
+Supported estimators:
+    tree_ensemble -> RandomForestClassifier / ExtraTreesClassifier / DecisionTreeClassifier
+    linear        -> LogisticRegression (binary), LinearRegression
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: exports are not locked
+    fcntl = None
+
+import numpy as np
+
+FORMAT_NAME = 'waveguard-compiled-model'
+FORMAT_VERSION = 2
+
+class CompiledScaler:
+    """StandardScaler parameters (mean_ / scale_)"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.n_features_in_ = len(mean)
+
+    def transform(self, X: np.ndarray, copy: bool = True) -> np.ndarray:
+        """(X - mean_) / scale_, in place when copy=False and X is a float64 matrix
+
+        Subtracting then dividing is the order StandardScaler.transform uses, so
+        the result is bit-identical to it.
+        """
+        X = np.array(X, dtype=np.float64, ndmin=2) if copy else np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}")
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+    @classmethod
+    def from_scaler(cls, scaler) -> 'CompiledScaler':
+        if not (getattr(scaler, 'with_mean', True) and getattr(scaler, 'with_std', True)):
+            raise ValueError("Only StandardScaler(with_mean=True, with_std=True) can be compiled")
+        return cls(np.asarray(scaler.mean_, dtype=np.float64), np.asarray(scaler.scale_, dtype=np.float64))
+
+class CompiledTreeEnsemble:
+    """Trees of a fitted forest stacked into (n_trees, max_nodes) arrays
+
+    Node ids are flat across the forest (tree * max_nodes + node) and
+    children[..., 0] / children[..., 1] hold the flat ids of the left / right
+    child. Leaves point to themselves with an infinite threshold, so a traversal
+    can run a fixed max_depth steps. value holds each node's normalized class
+    probabilities, shape (n_trees, max_nodes, n_classes).
+    """
+
+    kind = 'tree_ensemble'
+
+    def __init__(self, children: np.ndarray, feature: np.ndarray, threshold: np.ndarray,
+                 value: np.ndarray, classes: np.ndarray, max_depth: int, n_features: int):
+        self.children = children
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+        # Flat views for the evaluator; no copies, so memory-mapped pages stay shared
+        n_trees, max_nodes = feature.shape
+        self._children = children.reshape(-1)
+        self._feature = feature.reshape(-1)
+        self._threshold = threshold.reshape(-1)
+        self._value = value.reshape(n_trees * max_nodes, -1)
+        self._roots = (np.arange(n_trees, dtype=np.int64) * max_nodes)[:, None]
+
+    @property
+    def n_estimators(self) -> int:
+        return self.feature.shape[0]
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Flat index of the leaf reached in every tree, shape (n_trees, n_rows)
+
+        All trees and rows advance one level per step. Features are rounded to
+        float32 first because that is what scikit-learn's trees compare against
+        the (float64) thresholds.
+        """
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a 2D array with {self.n_features_in_} features")
+
+        row_start = np.arange(len(X), dtype=np.int64) * X.shape[1]
+        x = X.ravel()
+        nodes = np.broadcast_to(self._roots, (self.n_estimators, len(X))).copy()
+        for _ in range(self.max_depth):
+            go_right = x[row_start + self._feature[nodes]] > self._threshold[nodes]
+            nodes = self._children[2 * nodes + go_right]
+        return nodes
+
+    def predict_proba(self, X: np.ndarray, chunk_rows: int = 4096) -> np.ndarray:
+        """Class probabilities averaged over the trees, like RandomForestClassifier"""
+        X = np.asarray(X)
+        proba = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), chunk_rows):
+            leaves = self.apply(X[start:start + chunk_rows])
+            # Summing over axis 0 adds tree by tree, the order sklearn accumulates in
+            proba[start:start + chunk_rows] = self._value[leaves].sum(axis=0) / self.n_estimators
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'children': self.children,
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'value': self.value
+        }
+
+    def manifest(self) -> Dict[str, Any]:
+        return {'max_depth': self.max_depth, 'n_features': self.n_features_in_,
+                'classes': self.classes_.tolist()}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], manifest: Dict[str, Any]) -> 'CompiledTreeEnsemble':
+        return cls(arrays['children'], arrays['feature'], arrays['threshold'], arrays['value'],
+                   np.asarray(manifest['classes']), manifest['max_depth'], manifest['n_features'])
+
+    @classmethod
+    def from_estimator(cls, estimator) -> 'CompiledTreeEnsemble':
+        trees = [tree.tree_ for tree in getattr(estimator, 'estimators_', [estimator])]
+        n_trees = len(trees)
+        max_nodes = max(tree.node_count for tree in trees)
+        n_classes = len(estimator.classes_)
+
+        node_ids = np.arange(n_trees * max_nodes, dtype=np.int64).reshape(n_trees, max_nodes)
+        children = np.repeat(node_ids[:, :, None], 2, axis=2)
+        feature = np.zeros((n_trees, max_nodes), dtype=np.int64)
+        threshold = np.full((n_trees, max_nodes), np.inf)
+        value = np.zeros((n_trees, max_nodes, n_classes))
+
+        for index, tree in enumerate(trees):
+            nodes = tree.node_count
+            root = index * max_nodes
+            split = tree.children_left != -1
+            children[index, :nodes, 0] = np.where(split, root + tree.children_left, node_ids[index, :nodes])
+            children[index, :nodes, 1] = np.where(split, root + tree.children_right, node_ids[index, :nodes])
+            feature[index, :nodes] = np.where(split, tree.feature, 0)
+            threshold[index, :nodes] = np.where(split, tree.threshold, np.inf)
+
+            node_value = tree.value[:, 0, :n_classes]
+            normalizer = node_value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0] = 1
+            value[index, :nodes] = node_value / normalizer
+
+        max_depth = max(tree.max_depth for tree in trees)
+        return cls(children, feature, threshold, value,
+                   np.asarray(estimator.classes_), max_depth, int(estimator.n_features_in_))
+
+SMALL_BATCH_ROWS = 256
+
+def _libm_sigmoid(score: float) -> float:
+    try:
+        return 1.0 / (1.0 + math.exp(-score))
+    except OverflowError:
+        return 0.0
+
+def _sigmoid(scores: np.ndarray) -> np.ndarray:
+    """1 / (1 + exp(-x))
+
+    Small batches go through the C library's exp, which makes them bit-identical
+    to scipy.special.expit as used by scikit-learn. NumPy's SIMD exp is used for
+    larger batches and can differ from it in the last bit.
+    """
+    if scores.size <= SMALL_BATCH_ROWS:
+        return np.array([_libm_sigmoid(score) for score in scores.tolist()], dtype=np.float64)
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-scores))
+
+class CompiledLinearModel:
+    """coef_ / intercept_ of a linear model; identity link (LinearRegression)"""
+
+    kind = 'linear'
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, link: str,
+                 classes: Optional[np.ndarray] = None):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.link = link
+        self.classes_ = classes
+        self.n_features_in_ = coef.shape[-1]
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """X @ coef_.T + intercept_, the same expression scikit-learn evaluates"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a 2D array with {self.n_features_in_} features")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        scores = X @ self.coef_.T + self.intercept_
+        return scores.ravel() if scores.ndim == 2 and scores.shape[1] == 1 else scores
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.decision_function(X)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {'coef': self.coef_, 'intercept': self.intercept_}
+
+    def manifest(self) -> Dict[str, Any]:
+        manifest = {'link': self.link}
+        if self.classes_ is not None:
+            manifest['classes'] = self.classes_.tolist()
+        return manifest
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], manifest: Dict[str, Any]) -> 'CompiledLinearModel':
+        if manifest['link'] == 'logistic':
+            return CompiledLogisticModel(arrays['coef'], arrays['intercept'], 'logistic',
+                                         np.asarray(manifest['classes']))
+        return CompiledLinearModel(arrays['coef'], arrays['intercept'], manifest['link'])
+
+    @classmethod
+    def from_estimator(cls, estimator) -> 'CompiledLinearModel':
+        coef = np.asarray(estimator.coef_, dtype=np.float64)
+        intercept = np.atleast_1d(np.asarray(estimator.intercept_, dtype=np.float64))
+        if hasattr(estimator, 'classes_'):
+            if len(estimator.classes_) != 2:
+                raise ValueError("Only binary linear classifiers can be compiled")
+            return CompiledLogisticModel(coef, intercept, 'logistic', np.asarray(estimator.classes_))
+        return CompiledLinearModel(coef, intercept, 'identity')
+
+class CompiledLogisticModel(CompiledLinearModel):
+    """Binary logistic regression: sigmoid of the linear score"""
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """[P(classes_[0]), P(classes_[1])] per row"""
+        positive = _sigmoid(self.decision_function(X))
+        return np.vstack([1 - positive, positive]).T
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+TREE_ENSEMBLES = ('RandomForestClassifier', 'ExtraTreesClassifier', 'DecisionTreeClassifier')
+
+COMPILED_KINDS = {
+    CompiledTreeEnsemble.kind: CompiledTreeEnsemble,
+    CompiledLinearModel.kind: CompiledLinearModel
+}
+
+def compile_estimator(estimator):
+    """Pick the compiled representation for a fitted scikit-learn estimator"""
+    if isinstance(estimator, (CompiledTreeEnsemble, CompiledLinearModel)):
+        return estimator
+    if type(estimator).__name__ in TREE_ENSEMBLES:
+        compiled = CompiledTreeEnsemble.from_estimator(estimator)
+    elif hasattr(estimator, 'coef_') and hasattr(estimator, 'intercept_'):
+        compiled = CompiledLinearModel.from_estimator(estimator)
+    else:
+        raise ValueError(f"Don't know how to compile {type(estimator).__name__}")
+    compiled.estimator_name = type(estimator).__name__
+    return compiled
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """Name, size and SHA-256 of a source file, recorded in the manifest"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'file': os.path.basename(path), 'size': os.path.getsize(path), 'sha256': digest.hexdigest()}
+
+@contextmanager
+def export_lock(path: str):
+    """Exclusive lock so concurrent workers don't write the same export at once"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def export_compiled_model(path: str, estimator, scaler=None, metadata: Optional[Dict[str, Any]] = None,
+                          source: Optional[Dict[str, Any]] = None,
+                          verify: Optional[Callable[[Any, Optional[CompiledScaler]], bool]] = None) -> Dict[str, Any]:
+    """Write a fitted estimator (and optional StandardScaler) as a compiled model directory
+
+    The directory is written next to `path` and swapped in with renames, so
+    processes that already mapped the previous export keep reading it intact.
+    With `verify`, the staged export is loaded back and only moved into place
+    if verify(model, scaler) passes; otherwise the previous export is kept and
+    ValueError is raised.
+    """
+    compiled = compile_estimator(estimator)
+    arrays = compiled.arrays()
+    if scaler is not None:
+        arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+        arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'kind': compiled.kind,
+        'estimator': compiled.estimator_name,
+        'source': source,
+        'model': compiled.manifest(),
+        'arrays': {name: {'dtype': str(array.dtype), 'shape': list(array.shape)}
+                   for name, array in arrays.items()},
+        'metadata': metadata or {}
+    }
+
+    staging = f'{path}.tmp-{os.getpid()}'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array))
+    with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, default=_json_default)
+
+    if verify is not None:
+        staged_model, staged_scaler, _ = load_compiled_model(staging)
+        if not verify(staged_model, staged_scaler):
+            shutil.rmtree(staging, ignore_errors=True)
+            raise ValueError(f"{compiled.estimator_name} export failed verification, kept the previous export")
+
+    retired = f'{path}.old-{os.getpid()}'
+    if os.path.exists(path):
+        os.rename(path, retired)
+    os.rename(staging, path)
+    shutil.rmtree(retired, ignore_errors=True)
+    return manifest
+
+def load_compiled_model(path: str) -> Tuple[Any, Optional[CompiledScaler], Dict[str, Any]]:
+    """Memory-map a compiled model directory
+
+    Returns (model, scaler or None, manifest).
+    """
+    with open(os.path.join(path, 'manifest.json'), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME or manifest.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled model format in {path}")
+
+    arrays = {}
+    for name, spec in manifest['arrays'].items():
+        array = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        if str(array.dtype) != spec['dtype'] or list(array.shape) != spec['shape']:
+            raise ValueError(f"Array {name} in {path} does not match its manifest")
+        arrays[name] = array
+
+    model = COMPILED_KINDS[manifest['kind']].from_arrays(arrays, manifest['model'])
+    model.estimator_name = manifest['estimator']
+    scaler = None
+    if 'scaler_mean' in arrays:
+        scaler = CompiledScaler(arrays['scaler_mean'], arrays['scaler_scale'])
+    return model, scaler, manifest
@@ -0,0 +1,170 @@
+"""
+Local earthquake event store
+
+Every event the USGS poller sees is kept in a SQLite file so custom windows
+("last 72h within 2000 km") can be answered without calling upstream:
+
+    events         -> one row per USGS event id, replaced when `updated` moves
+    events_rtree   -> R-tree over (time, latitude, longitude) for range lookups
+
+R-tree coordinates are 32-bit floats rounded outwards, so the index only
+narrows the candidates; the exact time, magnitude and distance checks run on
+the stored values.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from geodesy import haversine_distances, radius_bounds
+
+EVENT_COLUMNS = ('id', 'magnitude', 'depth', 'latitude', 'longitude', 'place', 'time', 'updated', 'tsunami_flag')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    magnitude REAL,
+    depth REAL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    place TEXT,
+    time INTEGER NOT NULL,
+    updated INTEGER,
+    tsunami_flag INTEGER
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree(
+    rowid, min_time, max_time, min_lat, max_lat, min_lon, max_lon
+);
+"""
+
+class EarthquakeStore:
+    """SQLite event store with an R-tree index over time and location
+
+    One connection per process, opened lazily so forked workers each get their
+    own; WAL mode lets several workers write the same events concurrently.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def upsert(self, earthquakes: Iterable[Dict[str, Any]]) -> int:
+        """Insert new events and replace stored ones whose `updated` changed"""
+        rows = [tuple(eq.get(column) for column in EVENT_COLUMNS) for eq in earthquakes
+                if eq.get('id') and eq.get('time') is not None
+                and eq.get('latitude') is not None and eq.get('longitude') is not None]
+        if not rows:
+            return 0
+
+        with self._lock, self.connection as connection:
+            connection.executemany(f"""
+                INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})
+                ON CONFLICT(id) DO UPDATE SET
+                    magnitude = excluded.magnitude, depth = excluded.depth,
+                    latitude = excluded.latitude, longitude = excluded.longitude,
+                    place = excluded.place, time = excluded.time,
+                    updated = excluded.updated, tsunami_flag = excluded.tsunami_flag
+                WHERE excluded.updated IS NOT events.updated
+            """, rows)
+            connection.executemany("""
+                INSERT OR REPLACE INTO events_rtree
+                SELECT rowid, time, time, latitude, latitude, longitude, longitude FROM events WHERE id = ?
+            """, [(row[0],) for row in rows])
+        return len(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def search(self, start_ms: int, end_ms: int,
+               latitude: Optional[float] = None, longitude: Optional[float] = None,
+               radius_km: Optional[float] = None,
+               bbox: Optional[Tuple[float, float, float, float]] = None,
+               min_magnitude: Optional[float] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Events in [start_ms, end_ms], newest first
+
+        Optionally limited to radius_km around (latitude, longitude), and/or to a
+        (min_lat, max_lat, min_lon, max_lon) box; a box with min_lon > max_lon
+        crosses the antimeridian. Events within a radius get a `distance_km`.
+        """
+        if radius_km is not None:
+            lat_range, lon_ranges = radius_bounds(latitude, longitude, radius_km)
+        else:
+            lat_range, lon_ranges = (-90.0, 90.0), [(-180.0, 180.0)]
+
+        if bbox is not None:
+            min_lat, max_lat, min_lon, max_lon = bbox
+            lat_range = (max(lat_range[0], min_lat), min(lat_range[1], max_lat))
+            box_lon_ranges = [(min_lon, max_lon)] if min_lon <= max_lon else [(min_lon, 180.0), (-180.0, max_lon)]
+            lon_ranges = [(max(a, c), min(b, d)) for a, b in lon_ranges for c, d in box_lon_ranges
+                          if max(a, c) <= min(b, d)]
+
+        if lat_range[0] > lat_range[1] or not lon_ranges:
+            return []
+
+        lon_clause = ' OR '.join('(r.max_lon >= ? AND r.min_lon <= ?)' for _ in lon_ranges)
+        query = f"""
+            SELECT {', '.join('e.' + column for column in EVENT_COLUMNS)}
+            FROM events_rtree r JOIN events e ON e.rowid = r.rowid
+            WHERE r.max_time >= ? AND r.min_time <= ? AND r.max_lat >= ? AND r.min_lat <= ?
+              AND ({lon_clause})
+              AND e.time BETWEEN ? AND ?
+        """
+        params: List[Any] = [start_ms, end_ms, lat_range[0], lat_range[1]]
+        for west, east in lon_ranges:
+            params += [west, east]
+        params += [start_ms, end_ms]
+
+        if bbox is not None:
+            query += " AND e.latitude BETWEEN ? AND ?"
+            params += [lat_range[0], lat_range[1]]
+            query += " AND (" + ' OR '.join('e.longitude BETWEEN ? AND ?' for _ in lon_ranges) + ")"
+            for west, east in lon_ranges:
+                params += [west, east]
+        if min_magnitude is not None:
+            query += " AND e.magnitude >= ?"
+            params.append(min_magnitude)
+        query += " ORDER BY e.time DESC"
+        if limit is not None and radius_km is None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self.connection.execute(query, params).fetchall()
+        events = [dict(zip(EVENT_COLUMNS, row)) for row in rows]
+
+        if radius_km is not None and events:
+            distances = haversine_distances(np.array([eq['latitude'] for eq in events], dtype=float),
+                                            np.array([eq['longitude'] for eq in events], dtype=float),
+                                            latitude, longitude)
+            events = [{**eq, 'distance_km': round(distance, 2)}
+                      for eq, distance in zip(events, distances.tolist()) if distance <= radius_km]
+            if limit is not None:
+                events = events[:limit]
+
+        return events
@@ -11,10 +11,22 @@ This script runs every hour to:
 Usage:
     python flood_alert_monitor.py --lat <latitude> --lon <longitude>
     python flood_alert_monitor.py --config config.json
+    python flood_alert_monitor.py --config config.json --concurrency 32 --location-timeout 30
+
+Locations are checked concurrently by a bounded worker pool. The config file may
+also set "max_concurrency" and "location_timeout_seconds" at the top level.
+
+Alerts are appended to flood_alerts_log.jsonl (one JSON object per line, rotated
+by size). Use --list-alerts with --name/--since/--until to read them back.
+Website delivery runs on a background queue that retries with backoff; alerts not
+yet delivered are kept in flood_alerts_outbox.jsonl and resent on the next start.
 
 Environment Variables Required:
     OPENWEATHER_API_KEY: Your OpenWeatherMap API key
     WEBSITE_ALERT_ENDPOINT: URL endpoint to send alerts to your website
+
+Optional:
+    WEBSITE_ALERT_BATCH_SIZE: Alerts per POST (default 1; >1 sends {"alerts": [...]})
 """
 
 import os
@@ -22,16 +34,24 @@ import sys
 import json
 import pickle
 import requests
+from requests.adapters import HTTPAdapter
 import argparse
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import numpy as np
 import schedule
 import time
 from dataclasses import dataclass
 from pathlib import Path
 
+import rainfall_climatology
+from compiled_models import file_fingerprint, load_compiled_model
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -78,19 +98,318 @@ class FloodAlert:
     alert_id: str
     message: str
 
+def local_time(value: datetime) -> datetime:
+    """Naive local time, the way alert timestamps are logged; aware times are converted"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def parse_local_time(text: str) -> datetime:
+    """argparse type for --since/--until: ISO time, naive local or with an offset"""
+    try:
+        return local_time(datetime.fromisoformat(text))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO time: {text!r}")
+
+class AlertJournal:
+    """Append-only JSON Lines alert journal
+    
+    Each alert is one line appended to `path`, so logging costs O(1) regardless of
+    history and a crash can at most leave a truncated last line (skipped on read).
+    fsync is batched: every `fsync_every` records, after `fsync_interval` seconds,
+    or on flush(). Once the file passes `max_bytes` it is rotated to path.1,
+    path.2, ... keeping `backups` old files.
+    """
+    
+    def __init__(self, path: str = 'flood_alerts_log.jsonl', max_bytes: int = 10 * 1024 * 1024,
+                 backups: int = 5, fsync_every: int = 32, fsync_interval: float = 5.0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.lock = threading.Lock()
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self._migrate_legacy_log(self.path.parent / 'flood_alerts_log.json')
+        self.file = open(self.path, 'a', encoding='utf-8')
+    
+    def _migrate_legacy_log(self, legacy_file: Path):
+        """Import the old single-document JSON log once, then set it aside"""
+        if self.path.exists() or not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                alerts = json.load(f).get('alerts', [])
+            with open(self.path, 'w', encoding='utf-8') as f:
+                for record in alerts:
+                    f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            legacy_file.rename(legacy_file.with_suffix('.json.migrated'))
+            logger.info(f"Migrated {len(alerts)} alerts from {legacy_file} to {self.path}")
+        except Exception as e:
+            logger.error(f"Could not migrate legacy alert log {legacy_file}: {e}")
+    
+    def append(self, record: Dict[str, Any]):
+        """Append one alert record"""
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.unsynced += 1
+            if (self.unsynced >= self.fsync_every or
+                    time.monotonic() - self.last_sync >= self.fsync_interval):
+                self._sync()
+            if self.file.tell() >= self.max_bytes:
+                self._rotate()
+    
+    def flush(self):
+        """Write and fsync everything appended so far"""
+        with self.lock:
+            self._sync()
+    
+    def close(self):
+        with self.lock:
+            self._sync()
+            self.file.close()
+    
+    def _sync(self):
+        self.file.flush()
+        if self.unsynced:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+    
+    def _rotate(self):
+        self._sync()
+        self.file.close()
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.file = open(self.path, 'a', encoding='utf-8')
+    
+    def files(self) -> List[Path]:
+        """Journal files from oldest to newest"""
+        rotated = [self.path.with_name(f"{self.path.name}.{index}") for index in range(self.backups, 0, -1)]
+        return [path for path in rotated + [self.path] if path.exists()]
+    
+    def iter_alerts(self, location: Optional[str] = None, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Stream alerts oldest first, optionally filtered by location name and time range"""
+        start = local_time(start) if start is not None else None
+        end = local_time(end) if end is not None else None
+        with self.lock:
+            self.file.flush()
+            files = self.files()
+        
+        for path in files:
+            try:
+                f = open(path, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                continue  # Rotated past the last backup since it was listed
+            with f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Truncated line from an interrupted write
+                    
+                    if location is not None and record.get('location', {}).get('name') != location:
+                        continue
+                    if start is not None or end is not None:
+                        timestamp = local_time(datetime.fromisoformat(record['timestamp']))
+                        if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+                            continue
+                    yield record
+
+# Acknowledged records the outbox may hold before it is rewritten (also never fewer than pending)
+OUTBOX_COMPACT_MIN_RECORDS = 256
+
+class AlertDeliveryQueue:
+    """Background delivery of alerts to the website endpoint
+    
+    Alerts are written to an outbox file before they are queued, so anything not
+    yet delivered survives a restart. Deliveries are recorded by appending
+    {"ack": [alert_id, ...]} lines, and the file is only rewritten when the queue
+    empties or acknowledged records make up most of it, so draining a backlog
+    stays linear in its size. A worker thread POSTs alerts over a pooled
+    session, retrying failures with exponential backoff. With batch_size > 1 up to
+    that many alerts are sent in one request as {"alerts": [...]}; the default of 1
+    posts each alert on its own, which is what the website route accepts today.
+    """
+    
+    def __init__(self, endpoint: str, outbox_path: str = 'flood_alerts_outbox.jsonl',
+                 batch_size: int = 1, timeout: float = 10.0,
+                 backoff_initial: float = 2.0, backoff_max: float = 300.0):
+        self.endpoint = endpoint
+        self.outbox_path = Path(outbox_path)
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.failures = 0
+        self.acked_records = 0   # Acknowledged alerts still taking space in the outbox
+        
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=2))
+        self.session.mount('http://', HTTPAdapter(pool_maxsize=2))
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'User-Agent': 'WaveGuard-FloodMonitor/1.0'
+        })
+        
+        self.pending = deque(self._load_outbox())
+        if self.pending:
+            logger.info(f"Loaded {len(self.pending)} undelivered alert(s) from {self.outbox_path}")
+        
+        self.worker = threading.Thread(target=self._run, name='alert-delivery', daemon=True)
+        self.worker.start()
+    
+    def _load_outbox(self) -> List[Dict[str, Any]]:
+        """Alerts in the outbox that have no acknowledgement line after them"""
+        if not self.outbox_path.exists():
+            return []
+        alerts: Dict[str, Dict[str, Any]] = {}
+        with open(self.outbox_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Truncated line from an interrupted write
+                if 'ack' in record:
+                    for alert_id in record['ack']:
+                        if alerts.pop(alert_id, None) is not None:
+                            self.acked_records += 1
+                else:
+                    alerts[record['alert_id']] = record
+        return list(alerts.values())
+    
+    def _acknowledge(self, batch: List[Dict[str, Any]]):
+        """Record delivered alerts, compacting the outbox when it is mostly acknowledged
+        
+        Caller holds the condition. Acks are not fsync'd: one lost in a crash only
+        means that alert is delivered again after the restart.
+        """
+        self.acked_records += len(batch)
+        if not self.pending or self.acked_records >= max(OUTBOX_COMPACT_MIN_RECORDS, len(self.pending)):
+            self._save_outbox()
+            return
+        with open(self.outbox_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'ack': [alert['alert_id'] for alert in batch]}, separators=(',', ':')) + '\n')
+    
+    def _save_outbox(self):
+        """Rewrite the outbox with what is still pending (caller holds the condition)"""
+        temp_path = self.outbox_path.with_name(self.outbox_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for alert in self.pending:
+                f.write(json.dumps(alert, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.outbox_path)
+        self.acked_records = 0
+    
+    def enqueue(self, alert_data: Dict[str, Any]):
+        """Persist an alert to the outbox and hand it to the delivery thread"""
+        with self.condition:
+            with open(self.outbox_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(alert_data, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending.append(alert_data)
+            self.condition.notify()
+    
+    def wait_until_empty(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued alert is delivered, or until timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending, timeout)
+    
+    def close(self, timeout: float = 10.0):
+        """Give the worker a moment to drain, then stop it; leftovers stay in the outbox"""
+        self.wait_until_empty(timeout)
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.worker.join(timeout)
+        self.session.close()
+    
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.stopping)
+                if self.stopping:
+                    return
+                batch = [self.pending[index] for index in range(min(self.batch_size, len(self.pending)))]
+            
+            delivered = self._post(batch)
+            
+            with self.condition:
+                if delivered:
+                    for _ in batch:
+                        self.pending.popleft()
+                    self._acknowledge(batch)
+                    self.failures = 0
+                    self.condition.notify_all()
+                    continue
+                
+                self.failures += 1
+                delay = min(self.backoff_max, self.backoff_initial * 2 ** (self.failures - 1))
+                logger.warning(f"Retrying {len(self.pending)} undelivered alert(s) in {delay:.0f}s")
+                self.condition.wait_for(lambda: self.stopping, delay)
+    
+    def _post(self, batch: List[Dict[str, Any]]) -> bool:
+        """POST one batch; True when it can leave the queue"""
+        payload = batch[0] if self.batch_size == 1 else {'alerts': batch}
+        alert_ids = ', '.join(alert['alert_id'] for alert in batch)
+        try:
+            response = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+            if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+                # Retrying will not make the endpoint accept it
+                logger.error(f"Website rejected alert(s) {alert_ids} with HTTP {response.status_code}; dropping")
+                return True
+            response.raise_for_status()
+            logger.info(f"Successfully sent alert(s) {alert_ids} to website")
+            return True
+        except requests.RequestException as e:
+            logger.error(f"Failed to send alert(s) {alert_ids} to website: {e}")
+            return False
+
 class FloodMonitor:
     """Main flood monitoring class"""
     
-    def __init__(self, config_file: Optional[str] = None):
+    def __init__(self, config_file: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 location_timeout: Optional[float] = None):
         self.config_file = config_file
         self.locations: List[LocationConfig] = []
         self.flood_model = None
         self.openweather_api_key = os.getenv('OPENWEATHER_API_KEY')
         self.website_alert_endpoint = os.getenv('WEBSITE_ALERT_ENDPOINT', 'http://localhost:3000/api/flood-alerts')
+        self.max_concurrency = 16
+        self.location_timeout = 30.0
+        self.alert_journal = AlertJournal()
         
         # Load configuration
         self._load_config()
         
+        # Command line settings win over the config file
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if location_timeout is not None:
+            self.location_timeout = location_timeout
+        
+        # Pooled HTTP session shared by the worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Worker threads reused by every cycle (created lazily on first submit)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, self.max_concurrency), thread_name_prefix='flood-monitor')
+        
         # Load the flood prediction model
         self._load_flood_model()
         
@@ -98,6 +417,12 @@ class FloodMonitor:
             logger.error("OPENWEATHER_API_KEY environment variable not set!")
             logger.info("Please set your OpenWeatherMap API key in the environment or .env file")
             sys.exit(1)
+        
+        # Started only once the configuration is valid: it opens the outbox and runs a thread
+        self.alert_queue = AlertDeliveryQueue(
+            self.website_alert_endpoint,
+            batch_size=int(os.getenv('WEBSITE_ALERT_BATCH_SIZE', '1'))
+        )
     
     def _load_config(self):
         """Load monitoring configuration"""
@@ -116,6 +441,9 @@ class FloodMonitor:
                     )
                     self.locations.append(location)
                 
+                self.max_concurrency = config_data.get('max_concurrency', self.max_concurrency)
+                self.location_timeout = config_data.get('location_timeout_seconds', self.location_timeout)
+                
                 logger.info(f"Loaded {len(self.locations)} locations from config file")
             except Exception as e:
                 logger.error(f"Error loading config file: {e}")
@@ -124,8 +452,25 @@ class FloodMonitor:
             logger.info("No config file provided, will use command line arguments")
     
     def _load_flood_model(self):
-        """Load the trained flood prediction model"""
+        """Load the trained flood prediction model
+        
+        The compiled export (models/compiled/flood, see compile_models.py) is a
+        plain coefficient scorer that loads without scikit-learn; the pickle is
+        used when the export is missing or was made from a different pickle.
+        """
         model_path = Path(__file__).parent / "models" / "best_flood_prediction_lr_model.pkl"
+        compiled_path = Path(__file__).parent / "models" / "compiled" / "flood"
+        
+        if (compiled_path / "manifest.json").exists():
+            try:
+                model, _, manifest = load_compiled_model(str(compiled_path))
+                if not model_path.exists() or manifest.get('source') == file_fingerprint(str(model_path)):
+                    self.flood_model = model
+                    logger.info(f"Successfully loaded compiled flood prediction model from {compiled_path}")
+                    return
+                logger.info("Compiled flood model is out of date, loading the pickle")
+            except Exception as e:
+                logger.warning(f"Could not load compiled flood model, falling back to pickle: {e}")
         
         try:
             with open(model_path, 'rb') as f:
@@ -139,7 +484,8 @@ class FloodMonitor:
             logger.error(f"Error loading flood model: {e}")
             sys.exit(1)
     
-    def fetch_weather_data(self, latitude: float, longitude: float) -> Optional[WeatherData]:
+    def fetch_weather_data(self, latitude: float, longitude: float,
+                           timeout: float = 10) -> Optional[WeatherData]:
         """Fetch current weather data from OpenWeatherMap API"""
         try:
             url = "https://api.openweathermap.org/data/2.5/weather"
@@ -151,7 +497,7 @@ class FloodMonitor:
             }
             
             logger.debug(f"Fetching weather data for ({latitude}, {longitude})")
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -179,7 +525,8 @@ class FloodMonitor:
             logger.error(f"Error processing weather data: {e}")
             return None
     
-    def fetch_forecast_data(self, latitude: float, longitude: float) -> Optional[Dict]:
+    def fetch_forecast_data(self, latitude: float, longitude: float,
+                            timeout: float = 10) -> Optional[Dict]:
         """Fetch weather forecast data for rainfall estimation"""
         try:
             url = "https://api.openweathermap.org/data/2.5/forecast"
@@ -192,7 +539,7 @@ class FloodMonitor:
             }
             
             logger.debug(f"Fetching forecast data for ({latitude}, {longitude})")
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -226,58 +573,48 @@ class FloodMonitor:
                                 current_forecast: Optional[Dict] = None) -> List[float]:
         """Estimate monthly rainfall data for the flood model"""
         current_month = datetime.now().month
-        abs_lat = abs(latitude)
-        
-        # Base rainfall patterns by latitude (climatological estimates)
-        if abs_lat < 23.5:  # Tropical
-            base_monthly = [180, 160, 200, 220, 250, 280, 300, 290, 270, 240, 200, 190]
-        elif abs_lat < 40:  # Subtropical
-            base_monthly = [80, 70, 90, 110, 130, 120, 100, 90, 85, 95, 85, 80]
-        else:  # Temperate
-            base_monthly = [50, 45, 60, 70, 80, 85, 90, 85, 75, 65, 55, 50]
-        
-        # Adjust based on longitude (oceanic influence)
-        oceanic_factor = 1.2 if abs(longitude) > 20 else 0.8
-        
-        monthly_rainfall = []
-        for i, base_rain in enumerate(base_monthly):
-            # Apply geographical adjustments
-            adjusted_rain = base_rain * oceanic_factor
-            
-            # If we have forecast data and this is the current month, use it
-            if current_forecast and i == (current_month - 1):
-                forecast_rainfall = current_forecast.get('total_forecast_rainfall', 0)
-                if forecast_rainfall > 0:
-                    # Extrapolate 5-day forecast to monthly estimate
-                    estimated_monthly = (forecast_rainfall / 5) * 30
-                    adjusted_rain = max(adjusted_rain, estimated_monthly)
-            
-            monthly_rainfall.append(round(adjusted_rain, 1))
+        
+        # Climatological normals for the location's grid cell
+        monthly_rainfall = rainfall_climatology.monthly_rainfall(latitude, longitude)[0].tolist()
+        
+        # If we have forecast data, use it for the current month
+        if current_forecast:
+            forecast_rainfall = current_forecast.get('total_forecast_rainfall', 0)
+            if forecast_rainfall > 0:
+                # Extrapolate 5-day forecast to monthly estimate
+                estimated_monthly = (forecast_rainfall / 5) * 30
+                monthly_rainfall[current_month - 1] = round(
+                    max(monthly_rainfall[current_month - 1], estimated_monthly), 1
+                )
         
         return monthly_rainfall
     
     def predict_flood_probability(self, monthly_rainfall: List[float]) -> float:
         """Use the ML model to predict flood probability"""
+        return float(self.predict_flood_probabilities([monthly_rainfall])[0])
+    
+    def predict_flood_probabilities(self, rainfall_rows: List[List[float]]) -> np.ndarray:
+        """Score many locations' monthly rainfall in one model call"""
         try:
             current_year = datetime.now().year
             
             # Prepare features: [YEAR, JAN, FEB, MAR, APR, MAY, JUN, JUL, AUG, SEP, OCT, NOV, DEC]
-            features = np.array([current_year] + monthly_rainfall).reshape(1, -1)
+            rainfall = np.asarray(rainfall_rows, dtype=np.float64).reshape(len(rainfall_rows), 12)
+            features = np.column_stack([np.full(len(rainfall), current_year, dtype=np.float64), rainfall])
             
             # Make prediction
             if hasattr(self.flood_model, 'predict_proba'):
                 proba = self.flood_model.predict_proba(features)
-                flood_probability = float(proba[0][1]) if len(proba[0]) > 1 else float(np.max(proba))
+                flood_probability = proba[:, 1] if proba.shape[1] > 1 else proba.max(axis=1)
             else:
                 # If model doesn't have predict_proba, use predict and assume binary output
-                prediction = self.flood_model.predict(features)[0]
-                flood_probability = float(prediction)
+                flood_probability = np.asarray(self.flood_model.predict(features), dtype=np.float64)
             
-            return max(0.0, min(1.0, flood_probability))  # Ensure it's between 0 and 1
+            return np.clip(flood_probability, 0.0, 1.0)  # Ensure it's between 0 and 1
             
         except Exception as e:
             logger.error(f"Error predicting flood probability: {e}")
-            return 0.0
+            return np.zeros(len(rainfall_rows))
     
     def determine_risk_level(self, probability: float) -> str:
         """Determine risk level based on flood probability"""
@@ -296,7 +633,8 @@ class FloodMonitor:
                           weather_data: WeatherData, rainfall_data: List[float]) -> FloodAlert:
         """Create a flood alert object"""
         risk_level = self.determine_risk_level(flood_probability)
-        alert_id = f"FLOOD_{location.location_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # The outbox and its acks are keyed by alert_id, so it must be unique even within a second
+        alert_id = f"FLOOD_{location.location_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
         
         # Create alert message
         message = f"""
@@ -333,7 +671,7 @@ This alert was generated automatically by WaveGuard AI monitoring system.
         )
     
     def send_alert_to_website(self, alert: FloodAlert) -> bool:
-        """Send alert to the website endpoint"""
+        """Queue alert for delivery to the website endpoint"""
         try:
             alert_data = {
                 'alert_id': alert.alert_id,
@@ -358,35 +696,16 @@ This alert was generated automatically by WaveGuard AI monitoring system.
                 'severity': alert.risk_level.lower()
             }
             
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'WaveGuard-FloodMonitor/1.0'
-            }
-            
-            logger.info(f"Sending flood alert to website: {self.website_alert_endpoint}")
-            response = requests.post(
-                self.website_alert_endpoint,
-                json=alert_data,
-                headers=headers,
-                timeout=10
-            )
-            
-            response.raise_for_status()
-            logger.info(f"Successfully sent alert {alert.alert_id} to website")
+            self.alert_queue.enqueue(alert_data)
             return True
             
-        except requests.RequestException as e:
-            logger.error(f"Failed to send alert to website: {e}")
-            return False
         except Exception as e:
-            logger.error(f"Error sending alert to website: {e}")
+            logger.error(f"Error queueing alert for website: {e}")
             return False
     
     def log_alert_locally(self, alert: FloodAlert):
         """Log alert to local file for record keeping"""
         try:
-            log_file = Path("flood_alerts_log.json")
-            
             alert_record = {
                 'alert_id': alert.alert_id,
                 'timestamp': alert.timestamp.isoformat(),
@@ -406,45 +725,55 @@ This alert was generated automatically by WaveGuard AI monitoring system.
                 }
             }
             
-            # Append to existing log file or create new one
-            if log_file.exists():
-                with open(log_file, 'r') as f:
-                    log_data = json.load(f)
-            else:
-                log_data = {'alerts': []}
-            
-            log_data['alerts'].append(alert_record)
-            
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            self.alert_journal.append(alert_record)
             
-            logger.info(f"Logged alert {alert.alert_id} to local file")
+            logger.info(f"Logged alert {alert.alert_id} to {self.alert_journal.path}")
             
         except Exception as e:
             logger.error(f"Error logging alert locally: {e}")
     
-    def monitor_location(self, location: LocationConfig):
-        """Monitor a single location for flood risk"""
+    def collect_location_inputs(self, location: LocationConfig) -> Optional[Tuple[WeatherData, List[float]]]:
+        """Fetch weather and forecast for one location within location_timeout seconds
+        
+        Returns the current weather and the 12 monthly rainfall values to score, or
+        None when the location could not be checked this cycle. Each request's
+        timeout is cut to the time left; run_monitoring_cycle enforces the overall
+        deadline, since a timeout only bounds each socket connect or read.
+        """
         try:
             logger.info(f"Monitoring flood risk for {location.location_name} ({location.latitude}, {location.longitude})")
+            deadline = time.monotonic() + self.location_timeout
             
             # Fetch current weather data
-            weather_data = self.fetch_weather_data(location.latitude, location.longitude)
+            weather_data = self.fetch_weather_data(
+                location.latitude, location.longitude, timeout=self._remaining(deadline)
+            )
             if not weather_data:
                 logger.warning(f"Could not fetch weather data for {location.location_name}")
-                return
+                return None
             
             # Fetch forecast data
-            forecast_data = self.fetch_forecast_data(location.latitude, location.longitude)
+            if self._remaining(deadline) <= 0:
+                logger.warning(f"Timed out monitoring {location.location_name} after {self.location_timeout}s")
+                return None
+            forecast_data = self.fetch_forecast_data(
+                location.latitude, location.longitude, timeout=self._remaining(deadline)
+            )
             
             # Estimate monthly rainfall
             monthly_rainfall = self.estimate_monthly_rainfall(
                 location.latitude, location.longitude, forecast_data
             )
+            return weather_data, monthly_rainfall
             
-            # Predict flood probability
-            flood_probability = self.predict_flood_probability(monthly_rainfall)
-            
+        except Exception as e:
+            logger.error(f"Error monitoring location {location.location_name}: {e}")
+            return None
+    
+    def evaluate_location(self, location: LocationConfig, flood_probability: float,
+                          weather_data: WeatherData, monthly_rainfall: List[float]):
+        """Apply the location's alert threshold to a scored probability"""
+        try:
             logger.info(f"Flood probability for {location.location_name}: {flood_probability:.1%}")
             
             # Check if alert threshold is exceeded
@@ -458,11 +787,11 @@ This alert was generated automatically by WaveGuard AI monitoring system.
                 # Log alert locally
                 self.log_alert_locally(alert)
                 
-                # Send alert to website
+                # Queue alert for the website
                 if self.send_alert_to_website(alert):
-                    logger.info(f"Alert {alert.alert_id} successfully sent to website")
+                    logger.info(f"Alert {alert.alert_id} queued for delivery to website")
                 else:
-                    logger.error(f"Failed to send alert {alert.alert_id} to website")
+                    logger.error(f"Failed to queue alert {alert.alert_id} for website")
                 
                 # Print alert to console
                 print("\n" + "="*60)
@@ -476,14 +805,79 @@ This alert was generated automatically by WaveGuard AI monitoring system.
         except Exception as e:
             logger.error(f"Error monitoring location {location.location_name}: {e}")
     
-    def run_monitoring_cycle(self):
-        """Run one complete monitoring cycle for all locations"""
-        logger.info("Starting flood monitoring cycle...")
+    def monitor_location(self, location: LocationConfig):
+        """Monitor a single location for flood risk within location_timeout seconds"""
+        inputs = self.collect_location_inputs(location)
+        if inputs is None:
+            return
+        weather_data, monthly_rainfall = inputs
+        flood_probability = self.predict_flood_probability(monthly_rainfall)
+        self.evaluate_location(location, flood_probability, weather_data, monthly_rainfall)
+    
+    def _remaining(self, deadline: float) -> float:
+        """Seconds left before a location's deadline, capped at the usual 10s request timeout"""
+        return min(10.0, deadline - time.monotonic())
+    
+    def run_monitoring_cycle(self, locations: Optional[List[LocationConfig]] = None):
+        """Run one monitoring cycle
         
-        for location in self.locations:
-            self.monitor_location(location)
+        Weather is fetched for up to max_concurrency locations at a time, then every
+        location is scored in a single model call before thresholds are applied.
+        A location still fetching location_timeout seconds after it started is
+        skipped for this cycle; its thread finishes once its request timeout (cut
+        to the same deadline) expires and then goes back to the shared pool.
+        """
+        locations = self.locations if locations is None else locations
+        logger.info(f"Starting flood monitoring cycle for {len(locations)} location(s) "
+                    f"(concurrency: {self.max_concurrency})...")
+        started = time.monotonic()
+        
+        collected: List[Tuple[LocationConfig, WeatherData, List[float]]] = []
+        started_at: Dict[int, float] = {}
+        
+        def collect(index: int, location: LocationConfig):
+            started_at[index] = time.monotonic()
+            return self.collect_location_inputs(location)
+        
+        futures = {self.pool.submit(collect, index, location): index for index, location in enumerate(locations)}
+        pending = set(futures)
+        try:
+            while pending:
+                deadlines = [started_at[futures[f]] + self.location_timeout
+                             for f in pending if futures[f] in started_at]
+                timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else self.location_timeout
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    pending.discard(future)
+                    location = locations[futures[future]]
+                    try:
+                        inputs = future.result()
+                    except Exception as e:
+                        logger.error(f"Error monitoring location {location.location_name}: {e}")
+                        continue
+                    if inputs is not None:
+                        collected.append((location, *inputs))
+                
+                now = time.monotonic()
+                for future in [f for f in pending if futures[f] in started_at
+                               and now - started_at[futures[f]] >= self.location_timeout]:
+                    pending.discard(future)
+                    logger.warning(f"Timed out monitoring {locations[futures[future]].location_name} "
+                                   f"after {self.location_timeout}s")
+        finally:
+            # Drop locations that never started; timed-out fetches are left to their request timeout
+            for future in pending:
+                future.cancel()
+        
+        if collected:
+            probabilities = self.predict_flood_probabilities([rainfall for _, _, rainfall in collected])
+            for (location, weather_data, monthly_rainfall), flood_probability in zip(collected, probabilities):
+                self.evaluate_location(location, float(flood_probability), weather_data, monthly_rainfall)
         
-        logger.info("Completed flood monitoring cycle")
+        self.alert_journal.flush()
+        logger.info(f"Completed flood monitoring cycle in {time.monotonic() - started:.1f}s "
+                    f"({len(collected)} of {len(locations)} location(s) scored)")
     
     def start_monitoring(self):
         """Start the continuous monitoring process"""
@@ -492,11 +886,13 @@ This alert was generated automatically by WaveGuard AI monitoring system.
         logger.info(f"Alert threshold: {self.locations[0].alert_threshold:.1%} if locations exist")
         logger.info(f"Website endpoint: {self.website_alert_endpoint}")
         
-        # Schedule monitoring for each location
+        # Schedule one concurrent cycle per distinct check interval
+        locations_by_interval: Dict[int, List[LocationConfig]] = {}
         for location in self.locations:
-            schedule.every(location.check_interval_hours).hours.do(
-                self.monitor_location, location
-            )
+            locations_by_interval.setdefault(location.check_interval_hours, []).append(location)
+        
+        for interval_hours, locations in locations_by_interval.items():
+            schedule.every(interval_hours).hours.do(self.run_monitoring_cycle, locations)
         
         # Run initial check immediately
         self.run_monitoring_cycle()
@@ -509,6 +905,10 @@ This alert was generated automatically by WaveGuard AI monitoring system.
                 time.sleep(60)  # Check every minute for scheduled jobs
         except KeyboardInterrupt:
             logger.info("Flood monitor stopped by user")
+        finally:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.alert_journal.close()
+            self.alert_queue.close()
 
 def create_sample_config():
     """Create a sample configuration file"""
@@ -554,6 +954,11 @@ def main():
     parser.add_argument('--threshold', type=float, default=0.64, help='Alert threshold (default: 0.64)')
     parser.add_argument('--create-config', action='store_true', help='Create sample configuration file')
     parser.add_argument('--test', action='store_true', help='Run single test cycle instead of continuous monitoring')
+    parser.add_argument('--list-alerts', action='store_true', help='Print logged alerts (filter with --name/--since/--until)')
+    parser.add_argument('--since', type=parse_local_time, help='Only list alerts at or after this ISO time (local unless it has an offset)')
+    parser.add_argument('--until', type=parse_local_time, help='Only list alerts at or before this ISO time (local unless it has an offset)')
+    parser.add_argument('--concurrency', type=int, help='Locations checked in parallel (default: 16)')
+    parser.add_argument('--location-timeout', type=float, help='Seconds allowed per location check (default: 30)')
     
     args = parser.parse_args()
     
@@ -561,11 +966,20 @@ def main():
         create_sample_config()
         return
     
+    if args.list_alerts:
+        journal = AlertJournal()
+        name = args.name if args.name != 'Unknown Location' else None
+        for record in journal.iter_alerts(location=name, start=args.since, end=args.until):
+            print(json.dumps(record))
+        journal.close()
+        return
+    
     # Initialize monitor
     if args.config:
-        monitor = FloodMonitor(config_file=args.config)
+        monitor = FloodMonitor(config_file=args.config, max_concurrency=args.concurrency,
+                               location_timeout=args.location_timeout)
     else:
-        monitor = FloodMonitor()
+        monitor = FloodMonitor(max_concurrency=args.concurrency, location_timeout=args.location_timeout)
         
         # Add location from command line arguments
         if args.lat is not None and args.lon is not None:
@@ -589,6 +1003,8 @@ def main():
     if args.test:
         print("Running test monitoring cycle...")
         monitor.run_monitoring_cycle()
+        monitor.pool.shutdown(wait=False, cancel_futures=True)
+        monitor.alert_queue.close(timeout=30)
         print("Test completed.")
     else:
         monitor.start_monitoring()
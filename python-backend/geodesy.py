@@ -0,0 +1,79 @@
+"""
+Great-circle helpers shared by the API and the earthquake store
+
+Distances use the haversine formula on a sphere of EARTH_RADIUS_KM. Scalar and
+vectorized versions give the same results; the bounding helpers only narrow
+candidates before an exact distance check.
+"""
+
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+# Earth radius in kilometers
+EARTH_RADIUS_KM = 6371
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculate the great circle distance between two points in kilometers"""
+    # Convert latitude and longitude from degrees to radians
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    
+    # Haversine formula
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    
+    return c * EARTH_RADIUS_KM
+
+def haversine_distances(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized haversine_distance; arguments broadcast like NumPy arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    
+    return 2 * np.arcsin(np.sqrt(a)) * EARTH_RADIUS_KM
+
+def max_longitude_offset(latitude, radius_km: float):
+    """Largest longitude difference (degrees) of a point within radius_km; 180 when the circle reaches a pole"""
+    latitude = np.asarray(latitude, dtype=float)
+    angular_deg = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = np.maximum(np.cos(np.radians(latitude)), 1e-12)
+    max_dlon = np.degrees(np.arcsin(np.minimum(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / cos_lat)))
+    return np.where(np.abs(latitude) + angular_deg >= 90, 180.0, max_dlon)
+
+def within_bounding_box(center_lat, center_lon, lats, lons, radius_km: float) -> np.ndarray:
+    """Cheap pre-filter: False only for points that are certainly farther than radius_km
+    
+    Uses the lat/lon bounding box of the circle around the center. The longitude
+    bound is dropped when the circle reaches a pole. Arguments broadcast.
+    """
+    center_lat = np.asarray(center_lat, dtype=float)
+    angular_deg = math.degrees(radius_km / EARTH_RADIUS_KM)
+    
+    dlat = np.abs(np.asarray(lats, dtype=float) - center_lat)
+    dlon = np.abs((np.asarray(lons, dtype=float) - center_lon + 180) % 360 - 180)
+    max_dlon = max_longitude_offset(center_lat, radius_km)
+    
+    # Small margin so rounding never drops a point right on the edge
+    return (dlat <= angular_deg + 1e-6) & (dlon <= max_dlon + 1e-6)
+
+def radius_bounds(latitude: float, longitude: float,
+                  radius_km: float) -> Tuple[Tuple[float, float], List[Tuple[float, float]]]:
+    """Latitude range and longitude ranges (split at the antimeridian) covering a circle"""
+    angular_deg = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lat_range = (max(-90.0, latitude - angular_deg), min(90.0, latitude + angular_deg))
+    
+    max_dlon = float(max_longitude_offset(latitude, radius_km))
+    if max_dlon >= 180:
+        return lat_range, [(-180.0, 180.0)]
+    
+    west, east = longitude - max_dlon, longitude + max_dlon
+    if west < -180:
+        return lat_range, [(west + 360, 180.0), (-180.0, east)]
+    if east > 180:
+        return lat_range, [(west, 180.0), (-180.0, east - 360)]
+    return lat_range, [(west, east)]
@@ -3,21 +3,38 @@ WaveGuard ML API - Main Backend Server for Next.js Application
 Provides tsunami and cyclone prediction endpoints for frontend integration.
 """
 
+import asyncio
+import io
+import json
 import pickle
 import numpy as np
 import os
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
 import uvicorn
-import requests
-import math
+import httpx
 import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import rainfall_climatology
+from usgs_geojson import FeatureCollectionParser
+from caching import SingleFlight, TTLCache, grid_cell
+from earthquake_store import EarthquakeStore
+from prefork import read_shared_feed, run_preforked, share_feed
+from geodesy import haversine_distance, haversine_distances, within_bounding_box
+from compiled_models import (CompiledScaler, compile_estimator, export_compiled_model, export_lock,
+                             file_fingerprint, load_compiled_model)
 
 # Load environment variables
 load_dotenv('.env.model')
@@ -57,6 +74,21 @@ app.add_middleware(
 models = {}
 model_metadata = {}
 
+# Memory-mapped array exports of the models (compile_models.py): name -> (model, scaler, manifest)
+compiled_artifacts: Dict[str, Tuple[Any, Any, Dict[str, Any]]] = {}
+
+# Rewrite stale exports after unpickling, so later workers and restarts can map them
+COMPILE_MODELS_ON_LOAD = os.getenv("COMPILE_MODELS_ON_LOAD", "true").lower() == "true"
+
+# Set when a prefork parent loaded the models before starting its workers
+models_preloaded = False
+
+# Tsunami predictions shared across requests: event id -> (updated, prediction, probability)
+TSUNAMI_PREDICTION_CACHE_SIZE = int(os.getenv("TSUNAMI_PREDICTION_CACHE_SIZE", "20000"))
+tsunami_prediction_cache: 'OrderedDict[str, Tuple[Any, bool, float]]' = OrderedDict()
+# Feed refreshes score in a worker thread while requests read the cache on the event loop
+tsunami_prediction_lock = threading.Lock()
+
 # USGS API endpoints
 USGS_FEEDS = {
     'past_hour_m45': 'https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/4.5_hour.geojson',
@@ -67,12 +99,165 @@ USGS_FEEDS = {
     'past_month_m45': 'https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/4.5_month.geojson'
 }
 
+# Background refresh interval per USGS feed in seconds (short windows change more often)
+USGS_FEED_REFRESH_SECONDS = {
+    'past_hour_m45': 60,
+    'past_day_m45': 120,
+    'past_hour_m25': 60,
+    'past_day_all': 120,
+    'past_week_m45': 600,
+    'past_month_m45': 1800
+}
+USGS_POLLER_ENABLED = os.getenv("USGS_POLLER_ENABLED", "true").lower() == "true"
+
+@dataclass(frozen=True)
+class FeedDelta:
+    """Events that changed between two publishes of a feed, matched by USGS id and `updated`"""
+    added: Tuple[Dict[str, Any], ...] = ()
+    updated: Tuple[Dict[str, Any], ...] = ()
+    removed: Tuple[str, ...] = ()
+    
+    @property
+    def changed(self) -> Tuple[Dict[str, Any], ...]:
+        return self.added + self.updated
+    
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+    
+    def counts(self) -> Dict[str, int]:
+        return {"added": len(self.added), "updated": len(self.updated), "removed": len(self.removed)}
+
+def diff_feed(previous: Dict[str, Dict[str, Any]], earthquakes: Tuple[Dict[str, Any], ...]) -> FeedDelta:
+    """Added, updated and removed events relative to the previous snapshot's id index
+    
+    Events without an id cannot be matched across refreshes (events_by_id skips
+    them too), so they are left out rather than reported as added every time.
+    """
+    added, updated = [], []
+    seen = set()
+    
+    for eq in earthquakes:
+        if not eq['id']:
+            continue
+        seen.add(eq['id'])
+        before = previous.get(eq['id'])
+        if before is None:
+            added.append(eq)
+        elif before is not eq and before.get('updated') != eq.get('updated'):
+            updated.append(eq)
+    
+    removed = tuple(event_id for event_id in previous if event_id not in seen)
+    return FeedDelta(tuple(added), tuple(updated), removed)
+
+@dataclass(frozen=True)
+class FeedSnapshot:
+    """Immutable parsed USGS feed published by the background poller
+    
+    `version` only moves when the events change, and `delta` holds what changed
+    since the previous version.
+    """
+    feed_type: str
+    earthquakes: Tuple[Dict[str, Any], ...]
+    metadata: Dict[str, Any]
+    fetched_at: datetime
+    version: int = 0
+    delta: FeedDelta = FeedDelta()
+    events_by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict, repr=False, compare=False)
+    # HTTP validators of the response the events came from, for conditional refreshes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    
+    @property
+    def age_seconds(self) -> float:
+        return (datetime.now() - self.fetched_at).total_seconds()
+    
+    def to_feed_data(self) -> Dict[str, Any]:
+        """Same shape as fetch_usgs_earthquake_data, plus snapshot freshness"""
+        return {
+            'status': 'success',
+            'count': len(self.earthquakes),
+            'earthquakes': list(self.earthquakes),
+            'metadata': self.metadata,
+            'feed_type': self.feed_type,
+            'fetched_at': self.fetched_at.isoformat(),
+            'snapshot_age_seconds': round(self.age_seconds, 1)
+        }
+
+# Latest snapshot per feed type and the poller tasks keeping them fresh
+feed_snapshots: Dict[str, FeedSnapshot] = {}
+usgs_poller_tasks: List[asyncio.Task] = []
+
+# Prefork mode: only the 'poller' worker fetches USGS; it writes every publish to the
+# share directory and the 'follower' workers publish the same snapshots from there
+usgs_feed_share_dir: Optional[str] = None
+usgs_feed_role = 'poller'
+USGS_FEED_FOLLOW_SECONDS = 2
+shared_feed_stamps: Dict[str, Dict[str, Any]] = {}
+
+# Per feed: upstream responses, how many were 304 Not Modified, and bytes received
+usgs_transfer_stats: Dict[str, Dict[str, int]] = {}
+
+# Every event the poller sees is kept here for custom time/space windows (empty path disables)
+EARTHQUAKE_STORE_PATH = os.getenv("EARTHQUAKE_STORE_PATH",
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "earthquakes.sqlite"))
+earthquake_store = EarthquakeStore(EARTHQUAKE_STORE_PATH) if EARTHQUAKE_STORE_PATH else None
+MAX_EVENT_STORE_WINDOW_HOURS = 24 * 365
+
+# Set (and replaced) whenever a feed is published, waking its risk stream subscribers
+feed_update_events: Dict[str, asyncio.Event] = {}
+
+# Risk streams send an SSE comment this often so proxies keep idle connections open
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+# Open streams never finish on their own, so shutdown stops waiting for them after this
+GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "10"))
+tsunami_stream_subscribers = 0
+
+# Largest scenario batch accepted by /predict/flood/batch
+MAX_FLOOD_BATCH_ROWS = int(os.getenv("MAX_FLOOD_BATCH_ROWS", "100000"))
+
 # OpenWeatherMap API configuration
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5"
 OPENWEATHER_ONECALL_URL = "https://api.openweathermap.org/data/3.0/onecall"
 
-def fetch_usgs_earthquake_data(feed_type: str = 'past_day_m45') -> Dict[str, Any]:
+# OpenWeatherMap response cache: coordinates snap to a grid cell so nearby users share a call
+OPENWEATHER_CACHE_GRID_DEG = float(os.getenv("OPENWEATHER_CACHE_GRID_DEG", "0.1"))
+OPENWEATHER_CURRENT_TTL_SECONDS = int(os.getenv("OPENWEATHER_CURRENT_TTL_SECONDS", "600"))
+OPENWEATHER_FORECAST_TTL_SECONDS = int(os.getenv("OPENWEATHER_FORECAST_TTL_SECONDS", "1800"))
+OPENWEATHER_CACHE_MAX_BYTES = int(os.getenv("OPENWEATHER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Shared async HTTP clients, one per upstream host so each has its own keep-alive pool
+UPSTREAM_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+UPSTREAM_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("UPSTREAM_MAX_CONNECTIONS_PER_HOST", "20")),
+    max_keepalive_connections=10,
+    keepalive_expiry=30.0
+)
+http_clients: Dict[str, httpx.AsyncClient] = {}
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    """Get the pooled client for an upstream ('usgs' or 'openweather')"""
+    client = http_clients.get(upstream)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=UPSTREAM_TIMEOUT,
+            limits=UPSTREAM_LIMITS,
+            headers={'User-Agent': 'WaveGuard-API/1.0', 'Accept-Encoding': 'gzip'}
+        )
+        http_clients[upstream] = client
+    return client
+
+upstream_calls = SingleFlight()
+
+weather_cache = TTLCache(OPENWEATHER_CACHE_MAX_BYTES)
+
+async def close_http_clients():
+    """Close all pooled upstream connections"""
+    for client in http_clients.values():
+        await client.aclose()
+    http_clients.clear()
+
+async def fetch_usgs_earthquake_data(feed_type: str = 'past_day_m45') -> Dict[str, Any]:
     """Fetch earthquake data from USGS feed APIs"""
     try:
         if feed_type not in USGS_FEEDS:
@@ -81,39 +266,55 @@ def fetch_usgs_earthquake_data(feed_type: str = 'past_day_m45') -> Dict[str, Any
         url = USGS_FEEDS[feed_type]
         logger.info(f"Fetching earthquake data from: {url}")
         
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Extract earthquake features
-        earthquakes = []
-        for feature in data.get('features', []):
-            props = feature.get('properties', {})
-            geom = feature.get('geometry', {})
-            coords = geom.get('coordinates', [0, 0, 0])
+        # Conditional GET: an unchanged feed comes back as an empty 304
+        previous = feed_snapshots.get(feed_type)
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers['If-None-Match'] = previous.etag
+            if previous.last_modified:
+                headers['If-Modified-Since'] = previous.last_modified
+        
+        # The body is parsed as it streams in, straight into typed columns
+        async with get_http_client('usgs').stream('GET', url, headers=headers) as response:
+            stats = usgs_transfer_stats.setdefault(feed_type, {'responses': 0, 'not_modified': 0, 'bytes_received': 0})
+            stats['responses'] += 1
             
-            earthquake = {
-                'id': feature.get('id'),
-                'magnitude': props.get('mag'),
-                'depth': coords[2] if len(coords) > 2 else 0,
-                'latitude': coords[1],
-                'longitude': coords[0],
-                'place': props.get('place'),
-                'time': props.get('time'),
-                'tsunami_flag': props.get('tsunami', 0)
-            }
-            earthquakes.append(earthquake)
+            if response.status_code == 304 and previous is not None:
+                stats['not_modified'] += 1
+                return {
+                    'status': 'success',
+                    'not_modified': True,
+                    'count': len(previous.earthquakes),
+                    'earthquakes': list(previous.earthquakes),
+                    'metadata': previous.metadata,
+                    'feed_type': feed_type,
+                    'etag': response.headers.get('ETag', previous.etag),
+                    'last_modified': response.headers.get('Last-Modified', previous.last_modified)
+                }
+            
+            response.raise_for_status()
+            
+            parser = FeatureCollectionParser()
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+            members, columns = parser.close()
+            stats['bytes_received'] += response.num_bytes_downloaded
+        
+        # Events whose `updated` is unchanged keep the previous snapshot's dict
+        earthquakes = columns.to_events(previous.events_by_id if previous is not None else None)
         
         return {
             'status': 'success',
             'count': len(earthquakes),
             'earthquakes': earthquakes,
-            'metadata': data.get('metadata', {}),
-            'feed_type': feed_type
+            'metadata': members.get('metadata', {}),
+            'feed_type': feed_type,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"USGS API request failed: {e}")
         return {
             'status': 'error',
@@ -130,7 +331,205 @@ def fetch_usgs_earthquake_data(feed_type: str = 'past_day_m45') -> Dict[str, Any
             'earthquakes': []
         }
 
-def fetch_openweather_current(lat: float, lon: float) -> Dict[str, Any]:
+def publish_feed_snapshot(feed_type: str, earthquake_data: Dict[str, Any],
+                          fetched_at: Optional[datetime] = None) -> FeedSnapshot:
+    """Publish a freshly fetched feed for request handlers to read
+    
+    Callers score the delta beforehand with score_feed_refresh (off the event
+    loop); here only removed events are evicted, and stream subscribers are only
+    woken when there is a delta. A 304 Not Modified refresh
+    skips the diff altogether.
+    """
+    previous = feed_snapshots.get(feed_type)
+    fetched_at = fetched_at or datetime.now()
+    not_modified = previous is not None and earthquake_data.get('not_modified', False)
+    earthquakes = previous.earthquakes if not_modified else tuple(earthquake_data['earthquakes'])
+    delta = FeedDelta() if not_modified else diff_feed(previous.events_by_id if previous is not None else {},
+                                                       earthquakes)
+    
+    if previous is not None and not delta:
+        # Nothing changed: keep the version and delta, just refresh the fetch time and validators
+        snapshot = FeedSnapshot(feed_type, previous.earthquakes, earthquake_data.get('metadata', {}),
+                                fetched_at, previous.version, previous.delta, previous.events_by_id,
+                                earthquake_data.get('etag', previous.etag),
+                                earthquake_data.get('last_modified', previous.last_modified))
+        feed_snapshots[feed_type] = snapshot
+        return snapshot
+    
+    snapshot = FeedSnapshot(
+        feed_type=feed_type,
+        earthquakes=earthquakes,
+        metadata=earthquake_data.get('metadata', {}),
+        fetched_at=fetched_at,
+        version=previous.version + 1 if previous is not None else 1,
+        delta=delta,
+        events_by_id={eq['id']: eq for eq in earthquakes if eq['id']},
+        etag=earthquake_data.get('etag'),
+        last_modified=earthquake_data.get('last_modified')
+    )
+    
+    feed_snapshots[feed_type] = snapshot
+    
+    # Drop predictions for events that have left every feed
+    with tsunami_prediction_lock:
+        for event_id in delta.removed:
+            if not any(event_id in other.events_by_id for other in feed_snapshots.values()):
+                tsunami_prediction_cache.pop(event_id, None)
+    
+    if previous is not None:
+        logger.info(f"🔄 {feed_type} v{snapshot.version}: {len(delta.added)} added, "
+                    f"{len(delta.updated)} updated, {len(delta.removed)} removed")
+    
+    update = feed_update_events.pop(feed_type, None)
+    if update is not None:
+        update.set()
+    return snapshot
+
+def feed_update_event(feed_type: str) -> asyncio.Event:
+    """Event set by the next publish of this feed"""
+    update = feed_update_events.get(feed_type)
+    if update is None:
+        update = feed_update_events[feed_type] = asyncio.Event()
+    return update
+
+async def refresh_feed_snapshot(feed_type: str) -> Dict[str, Any]:
+    """Fetch a USGS feed and publish it; a failed fetch keeps the previous snapshot"""
+    return await upstream_calls.do(('usgs', feed_type), lambda: fetch_and_publish_feed(feed_type))
+
+def score_feed_refresh(feed_type: str, earthquakes: List[Dict[str, Any]]):
+    """Score the events a refresh adds or updates, so user requests only read cached predictions
+    
+    Runs in a worker thread before the refresh is published; a large first
+    snapshot would otherwise hold up every request on the event loop.
+    """
+    if 'tsunami' not in models:
+        return
+    previous = feed_snapshots.get(feed_type)
+    delta = diff_feed(previous.events_by_id if previous is not None else {}, earthquakes)
+    scorable = [eq for eq in delta.changed if is_scorable_earthquake(eq)]
+    get_tsunami_predictions(scorable, models['tsunami'], model_metadata['tsunami'])
+
+async def fetch_and_publish_feed(feed_type: str) -> Dict[str, Any]:
+    earthquake_data = await fetch_usgs_earthquake_data(feed_type)
+    
+    if earthquake_data['status'] == 'error':
+        return earthquake_data
+    
+    if not earthquake_data.get('not_modified'):
+        await asyncio.to_thread(score_feed_refresh, feed_type, earthquake_data['earthquakes'])
+    
+    previous = feed_snapshots.get(feed_type)
+    snapshot = publish_feed_snapshot(feed_type, earthquake_data)
+    
+    # Only fetched feeds are stored (not ones followed from another worker), off the event loop
+    version_moved = previous is None or snapshot.version != previous.version
+    if earthquake_store is not None and version_moved and snapshot.delta.changed:
+        try:
+            await asyncio.to_thread(earthquake_store.upsert, snapshot.delta.changed)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store {feed_type} events: {e}")
+    
+    if usgs_feed_share_dir is not None:
+        try:
+            await asyncio.to_thread(share_feed, usgs_feed_share_dir, feed_type, f"{os.getpid()}:{snapshot.version}",
+                                    snapshot.fetched_at.isoformat(), snapshot.metadata,
+                                    list(snapshot.earthquakes) if version_moved else None)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not share {feed_type} snapshot with the other workers: {e}")
+    
+    return snapshot.to_feed_data()
+
+async def load_shared_feed(feed_type: str) -> bool:
+    """Publish the poller worker's latest snapshot of a feed; False if there was nothing new"""
+    known = shared_feed_stamps.get(feed_type) if feed_type in feed_snapshots else None
+    shared = await asyncio.to_thread(read_shared_feed, usgs_feed_share_dir, feed_type, known)
+    if shared is None:
+        return False
+    
+    stamp, earthquakes = shared
+    earthquake_data = {'status': 'success', 'metadata': stamp['metadata']}
+    if earthquakes is None:
+        earthquake_data['not_modified'] = True
+    else:
+        earthquake_data['earthquakes'] = earthquakes
+        await asyncio.to_thread(score_feed_refresh, feed_type, earthquakes)
+    publish_feed_snapshot(feed_type, earthquake_data, fetched_at=datetime.fromisoformat(stamp['fetched_at']))
+    shared_feed_stamps[feed_type] = stamp
+    return True
+
+async def get_usgs_feed(feed_type: str) -> Dict[str, Any]:
+    """Read the latest feed snapshot without network I/O
+    
+    Falls back to fetching upstream only when nothing has been published yet, or
+    when the poller is disabled and the snapshot is older than its refresh interval.
+    """
+    if feed_type not in USGS_FEEDS:
+        return {
+            'status': 'error',
+            'message': f"Invalid feed type. Available: {list(USGS_FEEDS.keys())}",
+            'count': 0,
+            'earthquakes': []
+        }
+    
+    snapshot = feed_snapshots.get(feed_type)
+    if snapshot is None and usgs_feed_role == 'follower' and await load_shared_feed(feed_type):
+        snapshot = feed_snapshots[feed_type]
+    if snapshot is None or (not usgs_poller_tasks and
+                            snapshot.age_seconds > USGS_FEED_REFRESH_SECONDS[feed_type]):
+        return await refresh_feed_snapshot(feed_type)
+    
+    return snapshot.to_feed_data()
+
+async def search_stored_earthquakes(window_hours: float, latitude: Optional[float] = None,
+                              longitude: Optional[float] = None, radius_km: Optional[float] = None,
+                              bbox: Optional[Tuple[float, float, float, float]] = None,
+                              min_magnitude: Optional[float] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Query the local event store; same shape as get_usgs_feed"""
+    if earthquake_store is None:
+        return {
+            'status': 'error',
+            'message': "Local earthquake store is disabled (EARTHQUAKE_STORE_PATH is empty)",
+            'count': 0,
+            'earthquakes': []
+        }
+    
+    now = datetime.now()
+    end_ms = int(now.timestamp() * 1000)
+    earthquakes = await asyncio.to_thread(earthquake_store.search, end_ms - int(window_hours * 3600 * 1000), end_ms,
+                                          latitude, longitude, radius_km, bbox, min_magnitude, limit)
+    return {
+        'status': 'success',
+        'count': len(earthquakes),
+        'earthquakes': earthquakes,
+        'metadata': {'window_hours': window_hours, 'radius_km': radius_km},
+        'feed_type': 'local_store',
+        'fetched_at': now.isoformat(),
+        'snapshot_age_seconds': 0.0
+    }
+
+async def poll_usgs_feed(feed_type: str, interval_seconds: int):
+    """Keep one USGS feed snapshot fresh for the lifetime of the app"""
+    while True:
+        try:
+            result = await refresh_feed_snapshot(feed_type)
+            if result['status'] == 'error':
+                logger.warning(f"USGS poller for {feed_type} kept previous snapshot: {result['message']}")
+        except Exception as e:
+            logger.error(f"USGS poller for {feed_type} failed: {e}")
+        
+        await asyncio.sleep(interval_seconds)
+
+async def follow_shared_feed(feed_type: str):
+    """Keep one feed snapshot in step with the poller worker (prefork mode)"""
+    while True:
+        try:
+            await load_shared_feed(feed_type)
+        except Exception as e:
+            logger.error(f"Could not load shared {feed_type} snapshot: {e}")
+        
+        await asyncio.sleep(USGS_FEED_FOLLOW_SECONDS)
+
+async def fetch_openweather_current(lat: float, lon: float) -> Dict[str, Any]:
     """Fetch current weather data from OpenWeatherMap API"""
     try:
         if not OPENWEATHER_API_KEY:
@@ -145,7 +544,7 @@ def fetch_openweather_current(lat: float, lon: float) -> Dict[str, Any]:
         }
         
         logger.info(f"Fetching current weather for ({lat}, {lon})")
-        response = requests.get(url, params=params, timeout=10)
+        response = await get_http_client('openweather').get(url, params=params)
         response.raise_for_status()
         
         data = response.json()
@@ -169,7 +568,7 @@ def fetch_openweather_current(lat: float, lon: float) -> Dict[str, Any]:
             'timestamp': datetime.now().isoformat()
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"OpenWeatherMap API request failed: {e}")
         return {
             'status': 'error',
@@ -182,7 +581,7 @@ def fetch_openweather_current(lat: float, lon: float) -> Dict[str, Any]:
             'message': f"Error processing weather data: {str(e)}"
         }
 
-def fetch_openweather_forecast(lat: float, lon: float, days: int = 5) -> Dict[str, Any]:
+async def fetch_openweather_forecast(lat: float, lon: float, days: int = 5) -> Dict[str, Any]:
     """Fetch weather forecast from OpenWeatherMap API"""
     try:
         if not OPENWEATHER_API_KEY:
@@ -199,7 +598,7 @@ def fetch_openweather_forecast(lat: float, lon: float, days: int = 5) -> Dict[st
         }
         
         logger.info(f"Fetching {days}-day forecast for ({lat}, {lon})")
-        response = requests.get(url, params=params, timeout=10)
+        response = await get_http_client('openweather').get(url, params=params)
         response.raise_for_status()
         
         data = response.json()
@@ -243,7 +642,7 @@ def fetch_openweather_forecast(lat: float, lon: float, days: int = 5) -> Dict[st
             'timestamp': datetime.now().isoformat()
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"OpenWeatherMap forecast request failed: {e}")
         return {
             'status': 'error',
@@ -256,64 +655,79 @@ def fetch_openweather_forecast(lat: float, lon: float, days: int = 5) -> Dict[st
             'message': f"Error processing forecast data: {str(e)}"
         }
 
+async def load_cached_weather(key: Tuple, ttl_seconds: float,
+                              fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Serve a weather response from the cache, or fetch it once and cache successes"""
+    cached = weather_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    async def fetch_and_store():
+        result = await fetch()
+        if result['status'] == 'success':
+            weather_cache.set(key, result, ttl_seconds)
+        return result
+    
+    return await upstream_calls.do(key, fetch_and_store)
+
+async def load_current_weather(lat: float, lon: float) -> Dict[str, Any]:
+    """Current weather for the grid cell containing (lat, lon)
+    
+    The cell is only the cache key; the response reports the caller's coordinates.
+    """
+    cell_lat, cell_lon = grid_cell(lat, lon, OPENWEATHER_CACHE_GRID_DEG)
+    result = await load_cached_weather(
+        ('openweather_current', cell_lat, cell_lon), OPENWEATHER_CURRENT_TTL_SECONDS,
+        lambda: fetch_openweather_current(cell_lat, cell_lon)
+    )
+    if result['status'] == 'success':
+        result = {**result, 'coordinates': {'lat': lat, 'lon': lon}}
+    return result
+
+async def load_weather_forecast(lat: float, lon: float, days: int = 5) -> Dict[str, Any]:
+    """Weather forecast for the grid cell containing (lat, lon)"""
+    cell_lat, cell_lon = grid_cell(lat, lon, OPENWEATHER_CACHE_GRID_DEG)
+    return await load_cached_weather(
+        ('openweather_forecast', cell_lat, cell_lon, days), OPENWEATHER_FORECAST_TTL_SECONDS,
+        lambda: fetch_openweather_forecast(cell_lat, cell_lon, days)
+    )
+
 def get_historical_rainfall_estimates(lat: float, lon: float, current_month: int, current_year: int) -> List[float]:
     """Get estimated historical rainfall data for the flood model
     
     Since OpenWeatherMap doesn't provide comprehensive historical data for free,
     this function provides estimates based on geographic patterns and current conditions.
     For production use, consider upgrading to a paid weather API with historical data.
-    """
-    # Base rainfall patterns by latitude (simplified climatology)
-    abs_lat = abs(lat)
-    
-    # Tropical regions (high rainfall)
-    if abs_lat < 23.5:
-        base_monthly = [180, 160, 200, 220, 250, 280, 300, 290, 270, 240, 200, 190]
-    # Subtropical regions (moderate rainfall with seasonal variation)
-    elif abs_lat < 40:
-        base_monthly = [80, 70, 90, 110, 130, 120, 100, 90, 85, 95, 85, 80]
-    # Temperate regions (lower rainfall, seasonal)
-    else:
-        base_monthly = [50, 45, 60, 70, 80, 85, 90, 85, 75, 65, 55, 50]
-    
-    # Adjust based on longitude (continental vs oceanic influences)
-    oceanic_factor = 1.2 if abs(lon) > 20 else 0.8  # Simplified oceanic influence
-    
-    # Apply random variation to simulate real-world variability
-    monthly_rainfall = []
-    for i, base_rain in enumerate(base_monthly):
-        # Add seasonal and random variation
-        variation = random.uniform(0.7, 1.3)
-        adjusted_rain = base_rain * oceanic_factor * variation
-        monthly_rainfall.append(round(adjusted_rain, 1))
     
-    return monthly_rainfall
+    Values come from the shared climatology table with a ±30% variation seeded by
+    grid cell and year, so repeated requests for a location give the same estimate.
+    """
+    return rainfall_climatology.monthly_rainfall(lat, lon, year=current_year, variation=0.3)[0].tolist()
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate the great circle distance between two points in kilometers"""
-    # Convert latitude and longitude from degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    # Radius of earth in kilometers
-    r = 6371
-    
-    return c * r
+# User risk zones ordered by severity, and the distance beyond which risk is always "No Risk"
+RISK_ZONE_LEVELS = {"No Risk": 0, "Low Risk": 1, "Medium Risk": 2, "High Risk": 3}
+RISK_ZONE_NAMES = list(RISK_ZONE_LEVELS)
+RISK_ZONE_MAX_DISTANCE_KM = 1000
 
-def classify_user_risk_zone(earthquake_lat: float, earthquake_lon: float, 
-                           user_lat: float, user_lon: float, 
-                           tsunami_predicted: bool, tsunami_probability: float) -> Dict[str, Any]:
-    """Classify user risk zone based on distance from earthquake epicenter"""
-    
-    # Calculate distance between earthquake and user
-    distance_km = haversine_distance(earthquake_lat, earthquake_lon, user_lat, user_lon)
+def classify_risk_levels(distances_km: np.ndarray, tsunami_predicted: np.ndarray,
+                         tsunami_probability: np.ndarray) -> np.ndarray:
+    """Vectorized risk zone level (index into RISK_ZONE_NAMES) for each earthquake"""
+    p = np.asarray(tsunami_probability, dtype=float)
+    d = np.asarray(distances_km, dtype=float)
+    
+    levels = np.select(
+        [d <= 100, d <= 500, d <= RISK_ZONE_MAX_DISTANCE_KM],   # Within 100km, 100-500km, 500-1000km
+        [np.where(p >= 0.7, 3, 2), np.where(p >= 0.8, 2, 1), np.where(p >= 0.8, 1, 0)],
+        default=0                                               # > 1000km
+    )
     
     # If no tsunami is predicted, risk is minimal regardless of distance
+    dangerous = np.asarray(tsunami_predicted, dtype=bool) & (p >= 0.3)
+    return np.where(dangerous, levels, 0)
+
+def describe_risk_zone(level: int, distance_km: float,
+                       tsunami_predicted: bool, tsunami_probability: float) -> Dict[str, Any]:
+    """Build the per-earthquake risk zone payload returned to users"""
     if not tsunami_predicted or tsunami_probability < 0.3:
         return {
             'risk_zone': 'No Risk',
@@ -321,31 +735,42 @@ def classify_user_risk_zone(earthquake_lat: float, earthquake_lon: float,
             'reasoning': 'No tsunami predicted for this earthquake'
         }
     
-    # Risk zones based on distance and tsunami probability
-    if distance_km <= 100:  # Within 100km
-        if tsunami_probability >= 0.7:
-            risk_zone = 'High Risk'
-        else:
-            risk_zone = 'Medium Risk'
-    elif distance_km <= 500:  # 100-500km
-        if tsunami_probability >= 0.8:
-            risk_zone = 'Medium Risk'
-        else:
-            risk_zone = 'Low Risk'
-    elif distance_km <= 1000:  # 500-1000km
-        if tsunami_probability >= 0.8:
-            risk_zone = 'Low Risk'
-        else:
-            risk_zone = 'No Risk'
-    else:  # > 1000km
-        risk_zone = 'No Risk'
-    
     return {
-        'risk_zone': risk_zone,
+        'risk_zone': RISK_ZONE_NAMES[level],
         'distance_km': round(distance_km, 2),
         'reasoning': f'Distance: {round(distance_km, 2)}km, Tsunami probability: {round(tsunami_probability * 100, 1)}%'
     }
 
+def classify_user_risk_zone(earthquake_lat: float, earthquake_lon: float, 
+                           user_lat: float, user_lon: float, 
+                           tsunami_predicted: bool, tsunami_probability: float) -> Dict[str, Any]:
+    """Classify user risk zone based on distance from earthquake epicenter"""
+    distance_km = haversine_distance(earthquake_lat, earthquake_lon, user_lat, user_lon)
+    level = classify_risk_levels([distance_km], [tsunami_predicted], [tsunami_probability])[0]
+    return describe_risk_zone(int(level), distance_km, tsunami_predicted, tsunami_probability)
+
+def classify_user_risk_zones(earthquake_lats: np.ndarray, earthquake_lons: np.ndarray,
+                             user_lat: float, user_lon: float, tsunami_predicted: np.ndarray,
+                             tsunami_probability: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distances and risk levels from one user to every earthquake in a single pass
+    
+    Only earthquakes with a predicted tsunami inside the bounding box of the
+    1000 km risk radius are classified; everything else is "No Risk".
+    """
+    tsunami_predicted = np.asarray(tsunami_predicted, dtype=bool)
+    tsunami_probability = np.asarray(tsunami_probability, dtype=float)
+    
+    distances = haversine_distances(earthquake_lats, earthquake_lons, user_lat, user_lon)
+    candidates = (tsunami_predicted & (tsunami_probability >= 0.3) &
+                  within_bounding_box(user_lat, user_lon, earthquake_lats, earthquake_lons,
+                                      RISK_ZONE_MAX_DISTANCE_KM))
+    
+    levels = np.zeros(len(distances), dtype=int)
+    levels[candidates] = classify_risk_levels(
+        distances[candidates], tsunami_predicted[candidates], tsunami_probability[candidates]
+    )
+    return distances, levels
+
 def get_models_path():
     """Dynamically find models directory"""
     # Try multiple possible locations for models
@@ -364,62 +789,231 @@ def get_models_path():
     logger.warning("Models directory not found in any expected location")
     return "models"  # Default fallback
 
+def load_compiled_artifacts(models_path: str):
+    """Memory-map the compiled model exports in models/compiled, if any"""
+    compiled_dir = os.path.join(models_path, "compiled")
+    compiled_artifacts.clear()
+    if not os.path.isdir(compiled_dir):
+        logger.info("No compiled models found (run compile_models.py to create them)")
+        return
+    
+    for name in sorted(os.listdir(compiled_dir)):
+        path = os.path.join(compiled_dir, name)
+        if '.' in name or not os.path.exists(os.path.join(path, "manifest.json")):
+            continue  # Lock files and exports still being written
+        try:
+            started = time.perf_counter()
+            compiled_artifacts[name] = load_compiled_model(path)
+            logger.info(f"✅ Compiled {name} model mapped in {(time.perf_counter() - started) * 1000:.1f} ms")
+        except Exception as e:
+            logger.warning(f"⚠️ Compiled {name} model could not be loaded: {e}")
+
+def matches_estimator(native, estimator, n_probe: int = 4096) -> bool:
+    """Check a native evaluator reproduces the estimator's outputs on random rows"""
+    probe = np.random.default_rng(0).normal(scale=2.0, size=(n_probe, estimator.n_features_in_))
+    if hasattr(estimator, 'predict_proba') != hasattr(native, 'predict_proba'):
+        return False
+    if hasattr(estimator, 'predict_proba'):
+        return np.allclose(native.predict_proba(probe), estimator.predict_proba(probe), rtol=0, atol=1e-9)
+    return np.allclose(native.predict(probe), estimator.predict(probe), rtol=1e-12, atol=1e-9)
+
+def export_check(estimator, scaler=None) -> Callable[[Any, Any], bool]:
+    """`verify` for export_compiled_model: the staged export must reproduce the estimator and scaler"""
+    def verify(model, exported_scaler) -> bool:
+        if scaler is not None and (exported_scaler is None or
+                                   not np.array_equal(exported_scaler.mean_, scaler.mean_) or
+                                   not np.array_equal(exported_scaler.scale_, scaler.scale_)):
+            return False
+        return matches_estimator(model, estimator)
+    return verify
+
+def native_model(name: str, estimator):
+    """NumPy evaluator for a fitted forest or linear model, or the estimator itself
+    
+    The compiled export is preferred; if it is missing or stale the estimator is
+    compiled in memory instead (forests to node arrays, linear models to their
+    coef_/intercept_). Either way it has to match sklearn before use.
+    """
+    candidates = []
+    if name in compiled_artifacts:
+        candidates.append(('compiled export', lambda: compiled_artifacts[name][0]))
+    candidates.append(('in-memory compile', lambda: compile_estimator(estimator)))
+    
+    for source, build in candidates:
+        try:
+            native = build()
+            if matches_estimator(native, estimator):
+                logger.info(f"✅ Native {name} evaluator verified against sklearn ({source})")
+                return native
+            logger.warning(f"⚠️ Native {name} evaluator from {source} disagrees with sklearn")
+        except Exception as e:
+            logger.warning(f"⚠️ Native {name} evaluator from {source} failed: {e}")
+    
+    return estimator
+
+def native_scaler(name: str, scaler):
+    """In-place StandardScaler from the compiled export or the fitted scaler
+    
+    The exported mean_/scale_ are only used when they equal the fitted scaler's,
+    so a stale export can't change results. Scalers that can't be compiled are
+    returned as they are.
+    """
+    compiled = compiled_artifacts.get(name, (None, None, None))[1]
+    if (compiled is not None and np.array_equal(compiled.mean_, scaler.mean_)
+            and np.array_equal(compiled.scale_, scaler.scale_)):
+        return compiled
+    try:
+        return CompiledScaler.from_scaler(scaler)
+    except (AttributeError, ValueError) as e:
+        logger.warning(f"⚠️ Keeping sklearn scaler for {name}: {e}")
+        return scaler
+
+def refresh_compiled_export(name: str, models_path: str, estimator, model, scaler,
+                            metadata: Dict[str, Any], source: Dict[str, Any]):
+    """Write the export for a freshly unpickled model and map it
+    
+    The export is only stamped with the pickle's fingerprint once it reproduces
+    the estimator. Returns the mapped (model, scaler), or the in-memory ones if
+    the export can't be written or verified (read-only deploys, for example).
+    Workers starting together serialize on a lock and the later ones just map
+    what the first wrote.
+    """
+    path = os.path.join(models_path, "compiled", name)
+    try:
+        with export_lock(path):
+            try:
+                current = load_compiled_model(path)
+            except (OSError, ValueError, KeyError):
+                current = None
+            if current is None or current[2].get('source') != source:
+                export_compiled_model(path, model, scaler, metadata, source=source,
+                                      verify=export_check(estimator, scaler))
+                current = load_compiled_model(path)
+                logger.info(f"💾 Compiled {name} export refreshed at {path}")
+        compiled_artifacts[name] = current
+        return current[0], current[1]
+    except Exception as e:
+        logger.warning(f"⚠️ Could not refresh compiled {name} export: {e}")
+        return model, scaler
+
+def load_shared_model(name: str, models_path: str, pickle_path: str,
+                      unpack: Callable[[Any], Tuple[Any, Any, Dict[str, Any]]]):
+    """(model, scaler, metadata) for one model, preferring its memory-mapped export
+    
+    An export made from the pickle as it is now is used as is: no unpickling and
+    no scikit-learn import, and the arrays stay in pages shared by every worker.
+    Otherwise the pickle is loaded, `unpack` splits it into (estimator, scaler,
+    metadata), and the verified native model is written back as the new export.
+    """
+    source = file_fingerprint(pickle_path)
+    artifact = compiled_artifacts.get(name)
+    if artifact is not None and artifact[2].get('source') == source:
+        model, scaler, manifest = artifact
+        logger.info(f"✅ {name} model mapped from its compiled export")
+        return model, scaler, manifest['metadata']
+    
+    with open(pickle_path, 'rb') as f:
+        estimator, scaler, metadata = unpack(pickle.load(f))
+    model = native_model(name, estimator)
+    if scaler is not None:
+        scaler = native_scaler(name, scaler)
+    
+    compiled = model is not estimator and (scaler is None or isinstance(scaler, CompiledScaler))
+    if COMPILE_MODELS_ON_LOAD and compiled:
+        model, scaler = refresh_compiled_export(name, models_path, estimator, model, scaler, metadata, source)
+    return model, scaler, metadata
+
+def unpack_tsunami_pickle(tsunami_data: Dict[str, Any]) -> Tuple[Any, Any, Dict[str, Any]]:
+    return tsunami_data['model'], tsunami_data['scaler'], {
+        'model_name': tsunami_data.get('model_name', 'Tsunami Predictor'),
+        'feature_columns': list(tsunami_data['feature_columns']),
+        'label_encoders': {column: encoder.classes_.tolist()
+                           for column, encoder in tsunami_data.get('label_encoders', {}).items()},
+        'performance_metrics': tsunami_data.get('performance_metrics', {})
+    }
+
+FLOOD_FEATURE_COLUMNS = ['YEAR', 'JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+                         'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+def unpack_cyclone_pickle(model) -> Tuple[Any, Any, Dict[str, Any]]:
+    return model, None, {'model_name': 'Cyclone Intensity Predictor',
+                         'feature_columns': ['PRESSURE', 'WIND_SPEED']}
+
+def unpack_flood_pickle(model) -> Tuple[Any, Any, Dict[str, Any]]:
+    return model, None, {'model_name': 'Flood Prediction Model',
+                         'feature_columns': FLOOD_FEATURE_COLUMNS}
+
+# Model pickles in the models directory and how each splits into (estimator, scaler, metadata)
+MODEL_PICKLES = {
+    'tsunami': ('tsunami_predictor_model.pkl', unpack_tsunami_pickle),
+    'cyclone': ('cyclone_intensity_predictor_improved.pkl', unpack_cyclone_pickle),
+    'flood': ('best_flood_prediction_lr_model.pkl', unpack_flood_pickle)
+}
+
 def load_models():
     """Load ML models at startup"""
     try:
         models_path = get_models_path()
         logger.info(f"Loading models from: {models_path}")
         
+        # Land/sea mask used by tsunami feature engineering
+        load_ocean_mask(models_path)
+        
+        # Array exports of the models below
+        load_compiled_artifacts(models_path)
+        
         # Load tsunami predictor
-        tsunami_path = os.path.join(models_path, "tsunami_predictor_model.pkl")
+        tsunami_path = os.path.join(models_path, MODEL_PICKLES['tsunami'][0])
         if os.path.exists(tsunami_path):
-            with open(tsunami_path, 'rb') as f:
-                tsunami_data = pickle.load(f)
-                models['tsunami'] = tsunami_data['model']
-                model_metadata['tsunami'] = {
-                    'scaler': tsunami_data['scaler'],
-                    'feature_columns': tsunami_data['feature_columns'],
-                    'label_encoders': tsunami_data.get('label_encoders', {}),
-                    'model_name': tsunami_data.get('model_name', 'Tsunami Predictor'),
-                    'performance': tsunami_data.get('performance_metrics', {})
-                }
-                logger.info("✅ Tsunami predictor loaded successfully")
+            model, scaler, metadata = load_shared_model('tsunami', models_path, tsunami_path,
+                                                        MODEL_PICKLES['tsunami'][1])
+            models['tsunami'] = model
+            with tsunami_prediction_lock:
+                tsunami_prediction_cache.clear()  # Cached predictions belong to the old model
+            model_metadata['tsunami'] = {
+                'scaler': scaler,
+                'feature_columns': metadata['feature_columns'],
+                'label_encoders': metadata.get('label_encoders', {}),
+                'model_name': metadata.get('model_name', 'Tsunami Predictor'),
+                'performance': metadata.get('performance_metrics', {})
+            }
+            logger.info("✅ Tsunami predictor loaded successfully")
         else:
             logger.warning(f"Tsunami model not found at: {tsunami_path}")
         
         # Load cyclone predictor (with error handling)
-        cyclone_path = os.path.join(models_path, "cyclone_intensity_predictor_improved.pkl")
+        cyclone_path = os.path.join(models_path, MODEL_PICKLES['cyclone'][0])
         if os.path.exists(cyclone_path):
             try:
-                with open(cyclone_path, 'rb') as f:
-                    cyclone_data = pickle.load(f)
-                    models['cyclone'] = cyclone_data
-                    logger.info("✅ Cyclone intensity predictor loaded")
+                models['cyclone'], _, _ = load_shared_model('cyclone', models_path, cyclone_path,
+                                                            MODEL_PICKLES['cyclone'][1])
+                logger.info("✅ Cyclone intensity predictor loaded")
             except Exception as e:
                 logger.warning(f"⚠️ Cyclone model format issue: {e}")
         else:
             logger.warning(f"Cyclone model not found at: {cyclone_path}")
         
         # Load flood predictor
-        flood_path = os.path.join(models_path, "best_flood_prediction_lr_model.pkl")
+        flood_path = os.path.join(models_path, MODEL_PICKLES['flood'][0])
         if os.path.exists(flood_path):
             try:
-                with open(flood_path, 'rb') as f:
-                    flood_model = pickle.load(f)
-                    models['flood'] = flood_model
-                    model_metadata['flood'] = {
-                        'model_name': 'Flood Prediction Model',
-                        'model_type': 'Logistic Regression',
-                        'feature_columns': ['YEAR', 'JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 
-                                          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'],
-                        'features_description': 'Year and monthly rainfall data (mm)',
-                        'target': 'Flood occurrence probability'
-                    }
-                    logger.info("✅ Flood predictor loaded successfully")
+                models['flood'], _, _ = load_shared_model('flood', models_path, flood_path,
+                                                          MODEL_PICKLES['flood'][1])
+                model_metadata['flood'] = {
+                    'model_name': 'Flood Prediction Model',
+                    'model_type': 'Logistic Regression',
+                    'feature_columns': FLOOD_FEATURE_COLUMNS,
+                    'features_description': 'Year and monthly rainfall data (mm)',
+                    'target': 'Flood occurrence probability'
+                }
+                logger.info("✅ Flood predictor loaded successfully")
             except Exception as e:
                 logger.warning(f"⚠️ Flood model loading error: {e}")
         else:
             logger.warning(f"Flood model not found at: {flood_path}")
+        
+        # Set up here so a prefork parent shares it (or its memory map) with its workers
+        rainfall_climatology.climatology_table()
                 
     except Exception as e:
         logger.error(f"❌ Error loading models: {e}")
@@ -471,6 +1065,10 @@ class UserLocationInput(BaseModel):
     latitude: float = Field(..., ge=-90.0, le=90.0, description="User latitude in degrees")
     longitude: float = Field(..., ge=-180.0, le=180.0, description="User longitude in degrees")
     feed_type: Optional[str] = Field('past_day_m45', description="USGS feed type to check")
+    window_hours: Optional[float] = Field(None, gt=0, le=MAX_EVENT_STORE_WINDOW_HOURS,
+                                          description="Check stored events from the last N hours instead of a feed")
+    radius_km: Optional[float] = Field(None, gt=0, le=20000,
+                                       description="Only check stored events within this distance")
 
 class CycloneRiskInput(BaseModel):
     """Cyclone risk assessment input"""
@@ -527,6 +1125,36 @@ class UserRiskAssessment(BaseModel):
     feed_info: Dict[str, Any]
     timestamp: str
 
+class BatchUserLocation(BaseModel):
+    """One user location in a batch; the feed is chosen once for the whole batch"""
+    model_config = ConfigDict(extra='forbid')
+    
+    latitude: float = Field(..., ge=-90.0, le=90.0, description="User latitude in degrees")
+    longitude: float = Field(..., ge=-180.0, le=180.0, description="User longitude in degrees")
+
+class BatchUserLocationInput(BaseModel):
+    """Many user locations assessed against one USGS feed snapshot"""
+    locations: List[BatchUserLocation] = Field(..., min_length=1, max_length=100000,
+                                               description="User locations")
+    feed_type: Optional[str] = Field('past_day_m45', description="USGS feed type to check")
+
+class UserRiskSummary(BaseModel):
+    """Compact per-user tsunami risk summary"""
+    user_location: Dict[str, float]
+    highest_risk: str
+    overall_status: str
+    nearest_dangerous_event: Optional[Dict[str, Any]] = Field(
+        None, description="Closest event that puts this user in a risk zone, if any")
+
+class BatchRiskAssessment(BaseModel):
+    """Batch tsunami risk assessment response"""
+    user_count: int
+    earthquake_count: int
+    dangerous_earthquake_count: int
+    results: List[UserRiskSummary]
+    feed_info: Dict[str, Any]
+    timestamp: str
+
 class FloodRiskInput(BaseModel):
     """Flood risk assessment input"""
     latitude: float = Field(..., ge=-90.0, le=90.0, description="User latitude in degrees")
@@ -541,6 +1169,20 @@ class FloodPredictionInput(BaseModel):
     monthly_rainfall: List[float] = Field(..., min_length=12, max_length=12, 
                                         description="Monthly rainfall data in mm [Jan, Feb, ..., Dec]")
 
+class FloodBatchPredictionInput(BaseModel):
+    """Batch flood prediction input, one [YEAR, JAN, ..., DEC] row per scenario"""
+    rows: List[List[float]] = Field(..., min_length=1,
+                                    description="Scenario rows: year followed by 12 monthly rainfall values in mm")
+
+class FloodBatchPredictionResponse(BaseModel):
+    """Columnar batch flood prediction response, in input row order"""
+    count: int
+    predictions: List[bool]
+    flood_probabilities: List[float]
+    risk_levels: List[str]
+    model_used: str
+    timestamp: str
+
 class RainfallData(BaseModel):
     """Rainfall data structure"""
     monthly_totals: List[float] = Field(..., description="Monthly rainfall totals in mm")
@@ -570,6 +1212,56 @@ class FloodAssessment(BaseModel):
     timestamp: str = Field(..., description="Assessment timestamp")
 
 # Utility functions
+
+# Land/sea raster loaded by load_models: bit-packed rows from 90N southwards, columns
+# from 180W eastwards (8 cells per byte, MSB first), bit set = ocean
+ocean_mask: Optional[np.ndarray] = None
+
+# Major continental boundaries (simplified) as (min_lat, max_lat, min_lon, max_lon),
+# only used when the land/sea mask is missing
+CONTINENTAL_REGIONS = [
+    (25, 70, -160, -50),   # North America
+    (35, 75, -10, 180),    # Europe/Asia
+    (-35, 35, -20, 55),    # Africa
+    (-45, -10, 110, 155),  # Australia
+    (-55, 15, -85, -30),   # South America
+]
+
+def load_ocean_mask(models_path: str):
+    """Memory-map the bit-packed land/sea mask built by build_land_mask.py"""
+    global ocean_mask
+    mask_path = os.path.join(models_path, "ocean_mask.npy")
+    
+    if os.path.exists(mask_path):
+        ocean_mask = np.load(mask_path, mmap_mode='r')
+        rows, packed_cols = ocean_mask.shape
+        logger.info(f"✅ Land/sea mask loaded ({rows}x{packed_cols * 8} cells, {180 / rows:g}° grid)")
+    else:
+        ocean_mask = None
+        logger.warning(f"Land/sea mask not found at: {mask_path}, using continental boxes")
+
+def is_oceanic_locations(latitudes, longitudes) -> np.ndarray:
+    """Vectorized O(1) ocean lookup per point (1 = oceanic, 0 = continental)"""
+    latitude = np.asarray(latitudes, dtype=float)
+    longitude = np.asarray(longitudes, dtype=float)
+    
+    if ocean_mask is None:
+        # Oceanic unless the point falls inside one of the continental boxes
+        is_continental = np.zeros(latitude.shape, dtype=bool)
+        for min_lat, max_lat, min_lon, max_lon in CONTINENTAL_REGIONS:
+            is_continental |= ((latitude >= min_lat) & (latitude <= max_lat) &
+                               (longitude >= min_lon) & (longitude <= max_lon))
+        return (~is_continental).astype(int)
+    
+    rows, packed_cols = ocean_mask.shape
+    cols = packed_cols * 8
+    cell_deg = 180 / rows
+    
+    row = np.clip(np.floor((90 - latitude) / cell_deg).astype(int), 0, rows - 1)
+    col = np.floor((longitude + 180) / cell_deg).astype(int) % cols
+    
+    return (ocean_mask[row, col >> 3] >> (7 - (col & 7))) & 1
+
 def engineer_tsunami_features(input_data: TsunamiInput) -> List[float]:
     """Convert simple earthquake parameters to full feature set"""
     
@@ -584,23 +1276,8 @@ def engineer_tsunami_features(input_data: TsunamiInput) -> List[float]:
     is_major_eq = 1 if eq_magnitude >= 7.0 else 0
     is_shallow = 1 if eq_depth <= 70 else 0
     
-    # Oceanic detection (simplified geographic heuristic)
-    def is_oceanic_location(lat, lon):
-        # Major continental boundaries (simplified)
-        continental_regions = [
-            (25, 70, -160, -50),   # North America
-            (35, 75, -10, 180),    # Europe/Asia
-            (-35, 35, -20, 55),    # Africa
-            (-45, -10, 110, 155),  # Australia
-            (-55, 15, -85, -30),   # South America
-        ]
-        
-        for min_lat, max_lat, min_lon, max_lon in continental_regions:
-            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
-                return 0  # Continental
-        return 1  # Oceanic
-    
-    is_oceanic_flag = is_oceanic_location(latitude, longitude)
+    # Oceanic detection from the land/sea mask
+    is_oceanic_flag = int(is_oceanic_locations([latitude], [longitude])[0])
     
     # Simplified categorical encodings
     risk_zone_encoded = min(4, max(0, int(eq_magnitude - 4)))  # 0-4 scale
@@ -621,6 +1298,108 @@ def engineer_tsunami_features(input_data: TsunamiInput) -> List[float]:
         depth_category_encoded
     ]
 
+def engineer_tsunami_features_batch(magnitudes: np.ndarray, depths: np.ndarray,
+                                    latitudes: np.ndarray, longitudes: np.ndarray,
+                                    scaler=None) -> np.ndarray:
+    """Vectorized engineer_tsunami_features: one feature row per earthquake
+    
+    Produces exactly the same columns as engineer_tsunami_features, written straight
+    into one preallocated matrix. With a scaler the matrix is standardized in place,
+    giving the model input without the copy a separate scaler.transform makes.
+    """
+    eq_magnitude = np.asarray(magnitudes, dtype=float)
+    eq_depth = np.asarray(depths, dtype=float)
+    latitude = np.asarray(latitudes, dtype=float)
+    longitude = np.asarray(longitudes, dtype=float)
+    
+    features = np.empty((len(eq_magnitude), 11))
+    features[:, 0] = eq_magnitude
+    features[:, 1] = eq_depth
+    features[:, 2] = latitude
+    features[:, 3] = longitude
+    np.square(eq_magnitude, out=features[:, 4])
+    features[:, 5] = eq_magnitude >= 7.0
+    features[:, 6] = eq_depth <= 70
+    features[:, 7] = is_oceanic_locations(latitude, longitude)
+    # int() truncates towards zero, so mirror it with trunc before clipping to 0-4
+    np.clip(np.trunc(eq_magnitude - 4), 0, 4, out=features[:, 8])   # risk_zone_encoded
+    features[:, 9] = features[:, 8]                                 # mag_category_encoded
+    features[:, 10] = eq_depth > 70                                 # depth_category_encoded
+    
+    if scaler is not None:
+        features = scaler.transform(features, copy=False)
+    return features
+
+def predict_proba_batch(model, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Score a feature matrix with a single predict_proba call
+    
+    Returns (predictions, positive_class_probabilities). Predictions are taken from the
+    class probabilities (argmax over classes_), which is how sklearn classifiers predict.
+    Models without predict_proba get a probability of 0.
+    """
+    if len(features) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=float)
+    
+    if not hasattr(model, 'predict_proba'):
+        return model.predict(features), np.zeros(len(features), dtype=float)
+    
+    proba = model.predict_proba(features)
+    predictions = model.classes_[np.argmax(proba, axis=1)]
+    probabilities = proba[:, 1] if proba.shape[1] > 1 else np.max(proba, axis=1)
+    
+    return predictions, probabilities
+
+def is_scorable_earthquake(eq: Dict[str, Any]) -> bool:
+    """Check a feed earthquake has the data and bounds TsunamiInput requires"""
+    return (all([eq['magnitude'], eq['latitude'], eq['longitude']])
+            and 1.0 <= eq['magnitude'] <= 10.0 and abs(eq['depth']) <= 700.0)
+
+def get_tsunami_predictions(earthquakes: List[Dict[str, Any]], model,
+                            metadata: Dict[str, Any]) -> List[Tuple[bool, float]]:
+    """Get (tsunami_prediction, tsunami_probability) for each feed earthquake
+    
+    Predictions only depend on the event, so they are cached by USGS event id and
+    reused until the event's `updated` timestamp changes. Only events missing from
+    the cache go through the model, in one batch. The cache is LRU: hits move to
+    the end, and the least recently used events are evicted past
+    TSUNAMI_PREDICTION_CACHE_SIZE.
+    """
+    results: List[Optional[Tuple[bool, float]]] = []
+    misses = []
+    
+    with tsunami_prediction_lock:
+        for i, eq in enumerate(earthquakes):
+            cached = tsunami_prediction_cache.get(eq['id']) if eq['id'] else None
+            if cached and cached[0] == eq.get('updated'):
+                tsunami_prediction_cache.move_to_end(eq['id'])
+                results.append((cached[1], cached[2]))
+            else:
+                results.append(None)
+                misses.append(i)
+    
+    if misses:
+        features = engineer_tsunami_features_batch(
+            [earthquakes[i]['magnitude'] for i in misses],
+            [abs(earthquakes[i]['depth']) for i in misses],  # Ensure positive depth
+            [earthquakes[i]['latitude'] for i in misses],
+            [earthquakes[i]['longitude'] for i in misses],
+            scaler=metadata['scaler']
+        )
+        predictions, probabilities = predict_proba_batch(model, features)
+        
+        with tsunami_prediction_lock:
+            for i, prediction, probability in zip(misses, predictions.tolist(), probabilities.tolist()):
+                eq = earthquakes[i]
+                results[i] = (bool(prediction), probability)
+                if eq['id']:
+                    tsunami_prediction_cache[eq['id']] = (eq.get('updated'), bool(prediction), probability)
+                    tsunami_prediction_cache.move_to_end(eq['id'])
+            
+            while len(tsunami_prediction_cache) > TSUNAMI_PREDICTION_CACHE_SIZE:
+                tsunami_prediction_cache.popitem(last=False)
+    
+    return results
+
 def determine_risk_level(confidence: float) -> str:
     """Determine risk level from prediction confidence"""
     if confidence >= 0.7:
@@ -630,6 +1409,48 @@ def determine_risk_level(confidence: float) -> str:
     else:
         return "Low"
 
+def determine_risk_levels(confidences: np.ndarray) -> np.ndarray:
+    """Vectorized determine_risk_level"""
+    return np.select([confidences >= 0.7, confidences >= 0.3], ["High", "Medium"], default="Low")
+
+def summarize_tsunami_risk(max_risk_level: str) -> Tuple[str, List[str]]:
+    """Overall status and recommendations for a user's highest risk zone"""
+    if max_risk_level == "High Risk":
+        overall_status = "High Alert"
+        recommendations = [
+            "⚠️ HIGH TSUNAMI RISK detected nearby",
+            "Move to higher ground immediately",
+            "Stay away from coastal areas",
+            "Monitor emergency broadcasts",
+            "Have emergency supplies ready"
+        ]
+    elif max_risk_level == "Medium Risk":
+        overall_status = "Elevated Alert"
+        recommendations = [
+            "⚠️ MODERATE TSUNAMI RISK detected",
+            "Stay alert and avoid beaches",
+            "Monitor official tsunami warnings",
+            "Be prepared to evacuate if advised",
+            "Keep emergency kit accessible"
+        ]
+    elif max_risk_level == "Low Risk":
+        overall_status = "Advisory"
+        recommendations = [
+            "Low tsunami risk detected",
+            "Stay informed about updates",
+            "Normal activities can continue",
+            "Be aware of tsunami evacuation routes"
+        ]
+    else:
+        overall_status = "All Clear"
+        recommendations = [
+            "No significant tsunami risk detected",
+            "Continue normal activities",
+            "Stay informed about earthquake alerts"
+        ]
+    
+    return overall_status, recommendations
+
 def generate_simulated_weather_data(lat: float, lon: float) -> WeatherData:
     """Generate realistic weather data based on location (simulation for demo)"""
     
@@ -854,6 +1675,26 @@ def prepare_flood_features(year: int, monthly_rainfall: List[float]) -> np.ndarr
     features = [year] + monthly_rainfall
     return np.array(features).reshape(1, -1)
 
+def prepare_flood_feature_matrix(rows) -> np.ndarray:
+    """Validate an N x 13 [YEAR, JAN, ..., DEC] flood feature matrix"""
+    try:
+        features = np.asarray(rows, dtype=float)
+    except ValueError:
+        raise ValueError("Every row needs 13 values: [YEAR, JAN, ..., DEC]")
+    
+    if features.ndim != 2 or features.shape[1] != 13:
+        raise ValueError(f"Expected N x 13 rows of [YEAR, JAN, ..., DEC], got shape {features.shape}")
+    if len(features) > MAX_FLOOD_BATCH_ROWS:
+        raise ValueError(f"Batch too large: {len(features)} rows (max {MAX_FLOOD_BATCH_ROWS})")
+    
+    bad_rows = np.flatnonzero(
+        ~np.isfinite(features).all(axis=1) | (features[:, 0] < 1900) | (features[:, 0] > 2100)
+    )
+    if len(bad_rows):
+        raise ValueError(f"Rows need a year in 1900-2100 and finite rainfall; invalid rows: {bad_rows[:10].tolist()}")
+    
+    return features
+
 def analyze_rainfall_patterns(monthly_rainfall: List[float]) -> RainfallData:
     """Analyze rainfall patterns and provide insights"""
     month_names = ['January', 'February', 'March', 'April', 'May', 'June',
@@ -1061,7 +1902,42 @@ async def get_model_info():
             "note": "Feature requirements under analysis"
         }
     
-    return {"models": info, "total_loaded": len(models)}
+    info_compiled = {
+        name: {
+            "estimator": manifest['estimator'],
+            "kind": manifest['kind'],
+            "arrays": manifest['arrays']
+        }
+        for name, (_, _, manifest) in compiled_artifacts.items()
+    }
+    
+    return {"models": info, "compiled": info_compiled, "total_loaded": len(models)}
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters and sizes for the shared response and prediction caches"""
+    stored_events = await asyncio.to_thread(earthquake_store.count) if earthquake_store is not None else 0
+    return {
+        "openweather": {
+            **weather_cache.stats(),
+            "grid_resolution_deg": OPENWEATHER_CACHE_GRID_DEG,
+            "current_ttl_seconds": OPENWEATHER_CURRENT_TTL_SECONDS,
+            "forecast_ttl_seconds": OPENWEATHER_FORECAST_TTL_SECONDS
+        },
+        "tsunami_predictions": {
+            "entries": len(tsunami_prediction_cache),
+            "max_entries": TSUNAMI_PREDICTION_CACHE_SIZE
+        },
+        "usgs_feeds": {
+            feed_type: {"count": len(snapshot.earthquakes), "age_seconds": round(snapshot.age_seconds, 1),
+                        "version": snapshot.version, "last_change": snapshot.delta.counts(),
+                        **usgs_transfer_stats.get(feed_type, {})}
+            for feed_type, snapshot in feed_snapshots.items()
+        },
+        "tsunami_risk_streams": tsunami_stream_subscribers,
+        "earthquake_store": {"path": EARTHQUAKE_STORE_PATH,
+                             "events": stored_events}
+    }
 
 @app.post("/predict/tsunami", response_model=PredictionResponse)
 async def predict_tsunami(
@@ -1072,13 +1948,11 @@ async def predict_tsunami(
     try:
         model, metadata = model_data
         
-        # Engineer features from simple input
-        features = engineer_tsunami_features(input_data)
-        features_array = np.array(features).reshape(1, -1)
-        
-        # Scale features using saved scaler
-        scaler = metadata['scaler']
-        features_scaled = scaler.transform(features_array)
+        # Engineer and scale features from simple input in one step
+        features_scaled = engineer_tsunami_features_batch(
+            [input_data.magnitude], [input_data.depth], [input_data.latitude], [input_data.longitude],
+            scaler=metadata['scaler']
+        )
         
         # Make prediction
         prediction = model.predict(features_scaled)
@@ -1105,7 +1979,7 @@ async def predict_tsunami(
                 "depth": input_data.depth,
                 "latitude": input_data.latitude,
                 "longitude": input_data.longitude,
-                "engineered_features_count": len(features)
+                "engineered_features_count": features_scaled.shape[1]
             },
             timestamp=datetime.now().isoformat()
         )
@@ -1193,6 +2067,122 @@ async def predict_cyclone(
         logger.error(f"Cyclone prediction error: {e}")
         raise HTTPException(status_code=400, detail=f"Prediction failed: {str(e)}")
 
+def build_user_risk_assessment(latitude: float, longitude: float, feed_type: str,
+                               earthquake_data: Dict[str, Any], model, metadata) -> UserRiskAssessment:
+    """Tsunami risk for one user location against a fetched feed"""
+    earthquakes = earthquake_data['earthquakes']
+    
+    # Handle case when no earthquakes are found
+    if earthquake_data['count'] == 0:
+        return UserRiskAssessment(
+            user_location={
+                "latitude": latitude,
+                "longitude": longitude
+            },
+            earthquake_count=0,
+            earthquakes_analyzed=[],
+            highest_risk={
+                "risk_zone": "No Risk",
+                "distance_km": 0,
+                "reasoning": "No recent earthquakes found in the selected timeframe"
+            },
+            overall_status="All Clear",
+            recommendations=[
+                "No recent significant earthquakes detected",
+                "Continue normal activities",
+                "Stay informed about earthquake alerts"
+            ],
+            feed_info={
+                "feed_type": feed_type,
+                "source": "USGS",
+                "last_updated": earthquake_data['fetched_at'],
+                "snapshot_age_seconds": earthquake_data['snapshot_age_seconds']
+            },
+            timestamp=datetime.now().isoformat()
+        )
+    
+    # Analyze each earthquake for tsunami risk
+    analyzed_earthquakes = []
+    max_risk_level = "No Risk"
+    max_risk_earthquake = None
+    
+    # Predictions come from the shared cache; only new or updated events are scored
+    valid_earthquakes = [eq for eq in earthquakes if is_scorable_earthquake(eq)]
+    tsunami_predictions = get_tsunami_predictions(valid_earthquakes, model, metadata)
+    
+    # Distances and risk zones from the user to every earthquake in one pass
+    distances, levels = classify_user_risk_zones(
+        [eq['latitude'] for eq in valid_earthquakes],
+        [eq['longitude'] for eq in valid_earthquakes],
+        latitude, longitude,
+        [prediction for prediction, _ in tsunami_predictions],
+        [probability for _, probability in tsunami_predictions]
+    )
+    
+    for eq, (tsunami_prediction, tsunami_probability), distance_km, level in zip(
+        valid_earthquakes, tsunami_predictions, distances.tolist(), levels.tolist()
+    ):
+        risk_assessment = describe_risk_zone(level, distance_km, tsunami_prediction, tsunami_probability)
+        
+        # Track the highest risk earthquake
+        if level > RISK_ZONE_LEVELS[max_risk_level]:
+            max_risk_level = risk_assessment['risk_zone']
+            max_risk_earthquake = {
+                **risk_assessment,
+                'earthquake': {
+                    'id': eq['id'],
+                    'magnitude': eq['magnitude'],
+                    'depth': eq['depth'],
+                    'latitude': eq['latitude'],
+                    'longitude': eq['longitude'],
+                    'place': eq['place'],
+                    'tsunami_prediction': bool(tsunami_prediction),
+                    'tsunami_probability': tsunami_probability
+                }
+            }
+        
+        # Add to analyzed earthquakes
+        analyzed_earthquakes.append({
+            'earthquake': {
+                'id': eq['id'],
+                'magnitude': eq['magnitude'],
+                'depth': eq['depth'],
+                'latitude': eq['latitude'],
+                'longitude': eq['longitude'],
+                'place': eq['place']
+            },
+            'tsunami_prediction': bool(tsunami_prediction),
+            'tsunami_probability': round(tsunami_probability, 3),
+            'user_risk': risk_assessment
+        })
+    
+    # Determine overall status
+    overall_status, recommendations = summarize_tsunami_risk(max_risk_level)
+    
+    return UserRiskAssessment(
+        user_location={
+            "latitude": latitude,
+            "longitude": longitude
+        },
+        earthquake_count=len(analyzed_earthquakes),
+        earthquakes_analyzed=analyzed_earthquakes,
+        highest_risk=max_risk_earthquake or {
+            "risk_zone": "No Risk",
+            "distance_km": 0,
+            "reasoning": "No earthquakes with tsunami potential found"
+        },
+        overall_status=overall_status,
+        recommendations=recommendations,
+        feed_info={
+            "feed_type": feed_type,
+            "source": "USGS",
+            "total_earthquakes_in_feed": earthquake_data['count'],
+            "last_updated": earthquake_data['fetched_at'],
+            "snapshot_age_seconds": earthquake_data['snapshot_age_seconds']
+        },
+        timestamp=datetime.now().isoformat()
+    )
+
 @app.post("/assess/tsunami-risk", response_model=UserRiskAssessment)
 async def assess_tsunami_risk(
     user_input: UserLocationInput,
@@ -1202,167 +2192,118 @@ async def assess_tsunami_risk(
     try:
         model, metadata = model_data
         
+        if user_input.window_hours is not None or user_input.radius_km is not None:
+            # Custom window: answered from the local event store, no upstream call
+            earthquake_data = await search_stored_earthquakes(user_input.window_hours or 24,
+                                                              user_input.latitude, user_input.longitude,
+                                                              user_input.radius_km)
+            if earthquake_data['status'] == 'error':
+                raise HTTPException(status_code=503, detail=earthquake_data['message'])
+            
+            return build_user_risk_assessment(user_input.latitude, user_input.longitude, 'local_store',
+                                              earthquake_data, model, metadata)
+        
         # Fetch recent earthquake data from USGS
-        earthquake_data = fetch_usgs_earthquake_data(user_input.feed_type) # type: ignore
+        earthquake_data = await get_usgs_feed(user_input.feed_type) # type: ignore
         
         if earthquake_data['status'] == 'error':
             raise HTTPException(status_code=503, detail=f"USGS API error: {earthquake_data['message']}")
         
-        earthquakes = earthquake_data['earthquakes']
-        
-        # Handle case when no earthquakes are found
-        if earthquake_data['count'] == 0:
-            return UserRiskAssessment(
-                user_location={
-                    "latitude": user_input.latitude,
-                    "longitude": user_input.longitude
-                },
-                earthquake_count=0,
-                earthquakes_analyzed=[],
-                highest_risk={
-                    "risk_zone": "No Risk",
-                    "distance_km": 0,
-                    "reasoning": "No recent earthquakes found in the selected timeframe"
-                },
-                overall_status="All Clear",
-                recommendations=[
-                    "No recent significant earthquakes detected",
-                    "Continue normal activities",
-                    "Stay informed about earthquake alerts"
-                ],
-                feed_info={
-                    "feed_type": user_input.feed_type,
-                    "source": "USGS",
-                    "last_updated": datetime.now().isoformat()
-                },
-                timestamp=datetime.now().isoformat()
-            )
+        return build_user_risk_assessment(user_input.latitude, user_input.longitude,
+                                          user_input.feed_type, earthquake_data, model, metadata) # type: ignore
         
-        # Analyze each earthquake for tsunami risk
-        analyzed_earthquakes = []
-        max_risk_level = "No Risk"
-        max_risk_earthquake = None
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Risk assessment error: {e}")
+        raise HTTPException(status_code=500, detail=f"Risk assessment failed: {str(e)}")
+
+@app.post("/assess/tsunami-risk/batch", response_model=BatchRiskAssessment)
+async def assess_tsunami_risk_batch(
+    batch_input: BatchUserLocationInput,
+    model_data: tuple = Depends(get_tsunami_model)
+):
+    """Assess tsunami risk for many user locations against one feed snapshot
+    
+    Only earthquakes with a predicted tsunami can put a user at risk, so the
+    user x earthquake distance matrix is built for those alone, in chunks.
+    """
+    try:
+        model, metadata = model_data
         
-        for eq in earthquakes:
-            # Skip earthquakes with invalid data
-            if not all([eq['magnitude'], eq['latitude'], eq['longitude']]):
-                continue
-                
-            # Create TsunamiInput for this earthquake
-            eq_input = TsunamiInput(
-                magnitude=eq['magnitude'],
-                depth=abs(eq['depth']),  # Ensure positive depth
-                latitude=eq['latitude'],
-                longitude=eq['longitude']
-            )
-            
-            # Engineer features and make prediction
-            features = engineer_tsunami_features(eq_input)
-            features_array = np.array(features).reshape(1, -1)
-            features_scaled = metadata['scaler'].transform(features_array)
-            
-            # Get tsunami prediction
-            tsunami_prediction = model.predict(features_scaled)[0]
-            tsunami_probability = 0.0
-            
-            if hasattr(model, 'predict_proba'):
-                proba = model.predict_proba(features_scaled)
-                tsunami_probability = float(proba[0][1]) if len(proba[0]) > 1 else float(np.max(proba))
+        earthquake_data = await get_usgs_feed(batch_input.feed_type) # type: ignore
+        
+        if earthquake_data['status'] == 'error':
+            raise HTTPException(status_code=503, detail=f"USGS API error: {earthquake_data['message']}")
+        
+        valid_earthquakes = [eq for eq in earthquake_data['earthquakes'] if is_scorable_earthquake(eq)]
+        tsunami_predictions = get_tsunami_predictions(valid_earthquakes, model, metadata)
+        
+        dangerous = [
+            (eq, probability) for eq, (prediction, probability) in zip(valid_earthquakes, tsunami_predictions)
+            if prediction and probability >= 0.3
+        ]
+        eq_lats = np.array([eq['latitude'] for eq, _ in dangerous], dtype=float)
+        eq_lons = np.array([eq['longitude'] for eq, _ in dangerous], dtype=float)
+        eq_probabilities = np.array([probability for _, probability in dangerous], dtype=float)
+        
+        user_lats = np.array([loc.latitude for loc in batch_input.locations], dtype=float)
+        user_lons = np.array([loc.longitude for loc in batch_input.locations], dtype=float)
+        
+        results = []
+        chunk_size = 4096  # Bounds the distance matrix to chunk_size x dangerous events
+        
+        for start in range(0, len(user_lats), chunk_size):
+            chunk_lats = user_lats[start:start + chunk_size]
+            chunk_lons = user_lons[start:start + chunk_size]
             
-            # Calculate user risk zone
-            risk_assessment = classify_user_risk_zone(
-                eq['latitude'], eq['longitude'],
-                user_input.latitude, user_input.longitude,
-                bool(tsunami_prediction), tsunami_probability
-            )
+            if dangerous:
+                distances = haversine_distances(eq_lats[None, :], eq_lons[None, :],
+                                                chunk_lats[:, None], chunk_lons[:, None])
+                levels = classify_risk_levels(distances, np.ones(distances.shape, dtype=bool),
+                                              np.broadcast_to(eq_probabilities, distances.shape))
+                highest_levels = levels.max(axis=1).tolist()
+                # Nearest among the events that actually put the user at risk
+                risk_distances = np.where(levels > 0, distances, np.inf)
+                nearest = [int(j) if highest > 0 else None
+                           for j, highest in zip(risk_distances.argmin(axis=1).tolist(), highest_levels)]
+            else:
+                highest_levels = [0] * len(chunk_lats)
+                nearest = [None] * len(chunk_lats)
             
-            # Track the highest risk earthquake
-            risk_levels = {"No Risk": 0, "Low Risk": 1, "Medium Risk": 2, "High Risk": 3}
-            if risk_levels.get(risk_assessment['risk_zone'], 0) > risk_levels.get(max_risk_level, 0):
-                max_risk_level = risk_assessment['risk_zone']
-                max_risk_earthquake = {
-                    **risk_assessment,
-                    'earthquake': {
+            for i, (lat, lon) in enumerate(zip(chunk_lats.tolist(), chunk_lons.tolist())):
+                highest_risk = RISK_ZONE_NAMES[highest_levels[i]]
+                nearest_event = None
+                
+                if nearest[i] is not None:
+                    eq, probability = dangerous[nearest[i]]
+                    nearest_event = {
                         'id': eq['id'],
                         'magnitude': eq['magnitude'],
-                        'depth': eq['depth'],
-                        'latitude': eq['latitude'],
-                        'longitude': eq['longitude'],
                         'place': eq['place'],
-                        'tsunami_prediction': bool(tsunami_prediction),
-                        'tsunami_probability': tsunami_probability
+                        'distance_km': round(float(distances[i, nearest[i]]), 2),
+                        'risk_zone': RISK_ZONE_NAMES[levels[i, nearest[i]]],
+                        'tsunami_probability': round(probability, 3)
                     }
-                }
-            
-            # Add to analyzed earthquakes
-            analyzed_earthquakes.append({
-                'earthquake': {
-                    'id': eq['id'],
-                    'magnitude': eq['magnitude'],
-                    'depth': eq['depth'],
-                    'latitude': eq['latitude'],
-                    'longitude': eq['longitude'],
-                    'place': eq['place']
-                },
-                'tsunami_prediction': bool(tsunami_prediction),
-                'tsunami_probability': round(tsunami_probability, 3),
-                'user_risk': risk_assessment
-            })
-        
-        # Determine overall status
-        if max_risk_level == "High Risk":
-            overall_status = "High Alert"
-            recommendations = [
-                "⚠️ HIGH TSUNAMI RISK detected nearby",
-                "Move to higher ground immediately",
-                "Stay away from coastal areas",
-                "Monitor emergency broadcasts",
-                "Have emergency supplies ready"
-            ]
-        elif max_risk_level == "Medium Risk":
-            overall_status = "Elevated Alert"
-            recommendations = [
-                "⚠️ MODERATE TSUNAMI RISK detected",
-                "Stay alert and avoid beaches",
-                "Monitor official tsunami warnings",
-                "Be prepared to evacuate if advised",
-                "Keep emergency kit accessible"
-            ]
-        elif max_risk_level == "Low Risk":
-            overall_status = "Advisory"
-            recommendations = [
-                "Low tsunami risk detected",
-                "Stay informed about updates",
-                "Normal activities can continue",
-                "Be aware of tsunami evacuation routes"
-            ]
-        else:
-            overall_status = "All Clear"
-            recommendations = [
-                "No significant tsunami risk detected",
-                "Continue normal activities",
-                "Stay informed about earthquake alerts"
-            ]
-        
-        return UserRiskAssessment(
-            user_location={
-                "latitude": user_input.latitude,
-                "longitude": user_input.longitude
-            },
-            earthquake_count=len(analyzed_earthquakes),
-            earthquakes_analyzed=analyzed_earthquakes,
-            highest_risk=max_risk_earthquake or {
-                "risk_zone": "No Risk",
-                "distance_km": 0,
-                "reasoning": "No earthquakes with tsunami potential found"
-            },
-            overall_status=overall_status,
-            recommendations=recommendations,
+                
+                results.append(UserRiskSummary(
+                    user_location={"latitude": lat, "longitude": lon},
+                    highest_risk=highest_risk,
+                    overall_status=summarize_tsunami_risk(highest_risk)[0],
+                    nearest_dangerous_event=nearest_event
+                ))
+        
+        return BatchRiskAssessment(
+            user_count=len(results),
+            earthquake_count=len(valid_earthquakes),
+            dangerous_earthquake_count=len(dangerous),
+            results=results,
             feed_info={
-                "feed_type": user_input.feed_type,
+                "feed_type": batch_input.feed_type,
                 "source": "USGS",
                 "total_earthquakes_in_feed": earthquake_data['count'],
-                "last_updated": datetime.now().isoformat()
+                "last_updated": earthquake_data['fetched_at'],
+                "snapshot_age_seconds": earthquake_data['snapshot_age_seconds']
             },
             timestamp=datetime.now().isoformat()
         )
@@ -1370,8 +2311,114 @@ async def assess_tsunami_risk(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Risk assessment error: {e}")
-        raise HTTPException(status_code=500, detail=f"Risk assessment failed: {str(e)}")
+        logger.error(f"Batch risk assessment error: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch risk assessment failed: {str(e)}")
+
+def risk_change_key(assessment: UserRiskAssessment) -> Tuple:
+    """What has to change before a stream subscriber is sent a new assessment"""
+    highest_risk = assessment.highest_risk
+    return (assessment.overall_status, highest_risk.get('risk_zone'),
+            highest_risk.get('earthquake', {}).get('id'))
+
+def delta_may_change_risk(delta: FeedDelta, latitude: float, longitude: float,
+                          current_level: int, current_event_id: Optional[str], model, metadata) -> bool:
+    """Whether a feed delta could change a user's highest risk
+    
+    Only the changed events are classified. The highest risk can move if its
+    event was updated or removed, or if a changed event reaches its level (an
+    equal level counts, since the earlier event in the feed wins ties).
+    """
+    if current_event_id is not None and (current_event_id in delta.removed or
+                                         any(eq['id'] == current_event_id for eq in delta.updated)):
+        return True
+    
+    changed = [eq for eq in delta.changed if is_scorable_earthquake(eq)]
+    if not changed:
+        return False
+    
+    tsunami_predictions = get_tsunami_predictions(changed, model, metadata)
+    _, levels = classify_user_risk_zones(
+        [eq['latitude'] for eq in changed], [eq['longitude'] for eq in changed],
+        latitude, longitude,
+        [prediction for prediction, _ in tsunami_predictions],
+        [probability for _, probability in tsunami_predictions]
+    )
+    highest = int(levels.max())
+    return highest > 0 and highest >= current_level
+
+def format_sse(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+@app.get("/stream/tsunami-risk")
+async def stream_tsunami_risk(
+    latitude: float = Query(..., ge=-90.0, le=90.0, description="User latitude in degrees"),
+    longitude: float = Query(..., ge=-180.0, le=180.0, description="User longitude in degrees"),
+    feed_type: str = Query('past_day_m45', description="USGS feed type to check"),
+    model_data: tuple = Depends(get_tsunami_model)
+):
+    """Server-Sent Events stream of tsunami risk for one user location
+    
+    The current assessment (same body as /assess/tsunami-risk) is sent as a
+    `risk` event on connect. After that each new feed version's delta is
+    checked against the location, and a new `risk` event is sent only when the
+    overall status, highest risk zone or highest risk earthquake changes.
+    """
+    if feed_type not in USGS_FEEDS:
+        raise HTTPException(status_code=400, detail=f"Invalid feed type. Available: {list(USGS_FEEDS.keys())}")
+    
+    model, metadata = model_data
+    
+    async def risk_events():
+        global tsunami_stream_subscribers
+        tsunami_stream_subscribers += 1
+        last_version = None
+        last_key = None
+        unavailable_sent = False
+        
+        try:
+            while True:
+                # Taken before reading the feed so a publish in between isn't missed
+                update = feed_update_event(feed_type)
+                earthquake_data = await get_usgs_feed(feed_type)
+                
+                if earthquake_data['status'] == 'error':
+                    if last_key is None and not unavailable_sent:
+                        unavailable_sent = True
+                        yield format_sse(json.dumps({"detail": f"USGS API error: {earthquake_data['message']}"}),
+                                         event="unavailable")
+                elif feed_snapshots[feed_type].version != last_version:
+                    snapshot = feed_snapshots[feed_type]
+                    # The delta covers everything only when this is the next version after the last one seen
+                    unaffected = (last_key is not None and snapshot.version == last_version + 1 and
+                                  len(snapshot.earthquakes) > 0 and
+                                  not delta_may_change_risk(snapshot.delta, latitude, longitude,
+                                                            RISK_ZONE_LEVELS[last_key[1]], last_key[2],
+                                                            model, metadata))
+                    last_version = snapshot.version
+                    if not unaffected:
+                        assessment = build_user_risk_assessment(latitude, longitude, feed_type,
+                                                                earthquake_data, model, metadata)
+                        key = risk_change_key(assessment)
+                        if key != last_key:
+                            last_key = key
+                            yield format_sse(assessment.model_dump_json(), event="risk",
+                                             event_id=str(snapshot.version))
+                
+                try:
+                    await asyncio.wait_for(update.wait(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            tsunami_stream_subscribers -= 1
+    
+    return StreamingResponse(risk_events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.post("/assess/cyclone-risk", response_model=CycloneAssessment)
 async def assess_cyclone_risk(input_data: CycloneRiskInput):
@@ -1410,13 +2457,47 @@ async def assess_cyclone_risk(input_data: CycloneRiskInput):
         logger.error(f"Cyclone risk assessment error: {e}")
         raise HTTPException(status_code=500, detail=f"Cyclone risk assessment failed: {str(e)}")
 
+@app.get("/earthquakes/search")
+async def search_earthquakes(
+    hours: float = Query(24, gt=0, le=MAX_EVENT_STORE_WINDOW_HOURS, description="Window ending now, in hours"),
+    latitude: Optional[float] = Query(None, ge=-90.0, le=90.0, description="Center latitude for radius_km"),
+    longitude: Optional[float] = Query(None, ge=-180.0, le=180.0, description="Center longitude for radius_km"),
+    radius_km: Optional[float] = Query(None, gt=0, le=20000, description="Search radius around the center"),
+    min_latitude: Optional[float] = Query(None, ge=-90.0, le=90.0),
+    max_latitude: Optional[float] = Query(None, ge=-90.0, le=90.0),
+    min_longitude: Optional[float] = Query(None, ge=-180.0, le=180.0),
+    max_longitude: Optional[float] = Query(None, ge=-180.0, le=180.0),
+    min_magnitude: Optional[float] = Query(None, description="Smallest magnitude to return"),
+    limit: int = Query(1000, gt=0, le=20000)
+):
+    """Search every earthquake the feed poller has stored, by time window, radius and/or box
+    
+    Served from the local store only, so windows beyond the USGS feeds (e.g. the
+    last 72h within 2000 km) need no upstream call. A box with min_longitude >
+    max_longitude crosses the antimeridian.
+    """
+    if radius_km is not None and (latitude is None or longitude is None):
+        raise HTTPException(status_code=400, detail="radius_km needs latitude and longitude")
+    
+    box = (min_latitude, max_latitude, min_longitude, max_longitude)
+    if any(v is not None for v in box) and any(v is None for v in box):
+        raise HTTPException(status_code=400, detail="A bounding box needs all four of min/max latitude and longitude")
+    
+    earthquake_data = await search_stored_earthquakes(hours, latitude, longitude, radius_km,
+                                                      box if box[0] is not None else None, # type: ignore
+                                                      min_magnitude, limit)
+    if earthquake_data['status'] == 'error':
+        raise HTTPException(status_code=503, detail=earthquake_data['message'])
+    
+    return earthquake_data
+
 @app.get("/earthquakes/{feed_type}")
 async def get_earthquake_feed(feed_type: str):
     """Get recent earthquake data from USGS feeds"""
     if feed_type not in USGS_FEEDS:
         raise HTTPException(status_code=400, detail=f"Invalid feed type. Available: {list(USGS_FEEDS.keys())}")
     
-    earthquake_data = fetch_usgs_earthquake_data(feed_type)
+    earthquake_data = await get_usgs_feed(feed_type)
     
     if earthquake_data['status'] == 'error':
         raise HTTPException(status_code=503, detail=earthquake_data['message'])
@@ -1465,6 +2546,61 @@ async def predict_flood(
         logger.error(f"Flood prediction error: {e}")
         raise HTTPException(status_code=400, detail=f"Prediction failed: {str(e)}")
 
+def predict_flood_batch(model, features: np.ndarray) -> FloodBatchPredictionResponse:
+    """Score a validated flood feature matrix with one vectorized predict_proba call"""
+    predictions, probabilities = predict_proba_batch(model, features)
+    
+    return FloodBatchPredictionResponse(
+        count=len(features),
+        predictions=predictions.astype(bool).tolist(),
+        flood_probabilities=probabilities.tolist(),
+        risk_levels=determine_risk_levels(probabilities).tolist(),
+        model_used="flood_predictor",
+        timestamp=datetime.now().isoformat()
+    )
+
+@app.post("/predict/flood/batch", response_model=FloodBatchPredictionResponse)
+async def predict_flood_batch_json(
+    input_data: FloodBatchPredictionInput,
+    model = Depends(get_flood_model)
+):
+    """Predict flood occurrence for many rainfall scenarios at once"""
+    try:
+        return predict_flood_batch(model, prepare_flood_feature_matrix(input_data.rows))
+    except Exception as e:
+        logger.error(f"Batch flood prediction error: {e}")
+        raise HTTPException(status_code=400, detail=f"Prediction failed: {str(e)}")
+
+@app.post("/predict/flood/batch/binary", response_model=FloodBatchPredictionResponse)
+async def predict_flood_batch_binary(
+    request: Request,
+    model = Depends(get_flood_model)
+):
+    """Predict flood occurrence for an N x 13 matrix sent as a binary body
+    
+    Accepts a .npy file (Content-Type: application/x-npy) or raw little-endian
+    float64 values in row-major order (Content-Type: application/octet-stream).
+    """
+    try:
+        body = await request.body()
+        content_type = request.headers.get('content-type', '').split(';')[0].strip()
+        
+        if content_type == 'application/x-npy':
+            rows = np.load(io.BytesIO(body), allow_pickle=False)
+        elif content_type == 'application/octet-stream':
+            if len(body) % (13 * 8):
+                raise ValueError("Body length must be a multiple of 13 float64 values")
+            rows = np.frombuffer(body, dtype='<f8').reshape(-1, 13)
+        else:
+            raise HTTPException(status_code=415, detail="Use application/x-npy or application/octet-stream")
+        
+        return predict_flood_batch(model, prepare_flood_feature_matrix(rows))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Binary batch flood prediction error: {e}")
+        raise HTTPException(status_code=400, detail=f"Prediction failed: {str(e)}")
+
 @app.post("/assess/flood-risk", response_model=FloodAssessment)
 async def assess_flood_risk(
     input_data: FloodRiskInput,
@@ -1484,14 +2620,15 @@ async def assess_flood_risk(
         data_sources = []
         
         if OPENWEATHER_API_KEY and input_data.use_forecast:
-            # Fetch current weather
-            current_weather_result = fetch_openweather_current(input_data.latitude, input_data.longitude)
+            # Fetch current weather and forecast concurrently
+            current_weather_result, forecast_result = await asyncio.gather(
+                load_current_weather(input_data.latitude, input_data.longitude),
+                load_weather_forecast(input_data.latitude, input_data.longitude)
+            )
             if current_weather_result['status'] == 'success':
                 current_weather = current_weather_result
                 data_sources.append("OpenWeatherMap Current Weather")
             
-            # Fetch forecast data
-            forecast_result = fetch_openweather_forecast(input_data.latitude, input_data.longitude)
             if forecast_result['status'] == 'success':
                 forecast_data = forecast_result
                 data_sources.append("OpenWeatherMap 5-day Forecast")
@@ -1578,7 +2715,7 @@ async def assess_flood_risk(
 @app.get("/weather/current/{lat}/{lon}")
 async def get_current_weather(lat: float, lon: float):
     """Get current weather data for a location"""
-    weather_data = fetch_openweather_current(lat, lon)
+    weather_data = await load_current_weather(lat, lon)
     
     if weather_data['status'] == 'error':
         raise HTTPException(status_code=503, detail=weather_data['message'])
@@ -1591,7 +2728,7 @@ async def get_weather_forecast(lat: float, lon: float, days: int = 5):
     if days < 1 or days > 5:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 5")
     
-    forecast_data = fetch_openweather_forecast(lat, lon, days)
+    forecast_data = await load_weather_forecast(lat, lon, days)
     
     if forecast_data['status'] == 'error':
         raise HTTPException(status_code=503, detail=forecast_data['message'])
@@ -1603,8 +2740,42 @@ async def get_weather_forecast(lat: float, lon: float, days: int = 5):
 async def startup_event():
     """Load models when the application starts"""
     logger.info("🌊 Starting WaveGuard ML API...")
-    load_models()
+    if not models_preloaded:
+        load_models()
     logger.info(f"📊 Loaded {len(models)} models: {list(models.keys())}")
+    
+    if USGS_POLLER_ENABLED and usgs_feed_role == 'follower':
+        for feed_type in USGS_FEED_REFRESH_SECONDS:
+            usgs_poller_tasks.append(asyncio.create_task(follow_shared_feed(feed_type)))
+        logger.info(f"🛰️ Following {len(usgs_poller_tasks)} USGS feeds from the polling worker")
+    elif USGS_POLLER_ENABLED:
+        for feed_type, interval in USGS_FEED_REFRESH_SECONDS.items():
+            usgs_poller_tasks.append(asyncio.create_task(poll_usgs_feed(feed_type, interval)))
+        logger.info(f"🛰️ Polling {len(usgs_poller_tasks)} USGS feeds in the background")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background pollers and close upstream connections"""
+    for task in usgs_poller_tasks:
+        task.cancel()
+    await asyncio.gather(*usgs_poller_tasks, return_exceptions=True)
+    usgs_poller_tasks.clear()
+    await close_http_clients()
+    if earthquake_store is not None:
+        earthquake_store.close()
+
+def preload_models():
+    """Load the models in a prefork parent, so its workers share them"""
+    global models_preloaded
+    load_models()
+    models_preloaded = True
+    logger.info(f"📊 Preloaded {len(models)} models: {list(models.keys())}")
+
+def assign_worker_role(slot: int, share_dir: str):
+    """Prefork worker setup: slot 0 polls USGS, the others follow it through share_dir"""
+    global usgs_feed_share_dir, usgs_feed_role
+    usgs_feed_share_dir = share_dir
+    usgs_feed_role = 'poller' if slot == 0 else 'follower'
 
 # Main execution
 if __name__ == "__main__":
@@ -1617,10 +2788,20 @@ if __name__ == "__main__":
     logger.info(f"🔄 Reload mode: {reload}")
     logger.info(f"📚 API documentation: http://{host}:{port}/docs")
     
+    # WEB_CONCURRENCY > 1 preloads the models and forks that many workers
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if workers > 1 and not reload and hasattr(os, 'fork'):
+        run_preforked(app, host, port, workers, preload_models, assign_worker_role, GRACEFUL_SHUTDOWN_SECONDS)
+        sys.exit(0)
+    if workers > 1:
+        reason = "reload mode is on (ENVIRONMENT=development)" if reload else "os.fork is not available"
+        logger.warning(f"⚠️ WEB_CONCURRENCY={workers} ignored because {reason}; running a single process")
+    
     uvicorn.run(
         "main:app",  # Use string format for reload to work
         host=host,
         port=port,
         reload=reload,
-        log_level="info"
+        log_level="info",
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS
     )
@@ -0,0 +1,120 @@
+"""
+Preload-then-fork runner for several uvicorn workers, and the USGS snapshot share
+
+run_preforked loads everything once in the parent, binds the listening socket
+and forks the workers, so they share the parent's pages copy-on-write. Worker
+slot 0 is the only one polling USGS; it writes each published feed into the
+share directory and the other slots read it back:
+
+    <feed>.json        -> events, rewritten when the feed version moves
+    <feed>.json.stamp  -> source (pid:version), fetch time and metadata, every refresh
+"""
+
+import json
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+# Pause before replacing a worker that exited, so a crashing worker cannot spin
+WORKER_RESTART_DELAY_SECONDS = 1
+
+def write_json_atomic(path: str, data: Any):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def share_feed(share_dir: str, feed_type: str, source: str, fetched_at: str, metadata: Dict[str, Any],
+               earthquakes: Optional[List[Dict[str, Any]]] = None):
+    """Write a published feed for the other workers; events only when they changed"""
+    feed_path = os.path.join(share_dir, f"{feed_type}.json")
+    if earthquakes is not None:
+        write_json_atomic(feed_path, earthquakes)
+    write_json_atomic(f"{feed_path}.stamp", {'source': source, 'fetched_at': fetched_at, 'metadata': metadata})
+
+def read_shared_feed(share_dir: str, feed_type: str,
+                     known: Optional[Dict[str, Any]] = None) -> Optional[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]]:
+    """(stamp, events) if the shared feed changed since the `known` stamp, else None
+    
+    events is None when only the fetch time or metadata moved.
+    """
+    feed_path = os.path.join(share_dir, f"{feed_type}.json")
+    try:
+        with open(f"{feed_path}.stamp") as f:
+            stamp = json.load(f)
+        if stamp == known:
+            return None
+        if known is not None and stamp['source'] == known['source']:
+            return stamp, None
+        with open(feed_path) as f:
+            return stamp, json.load(f)
+    except FileNotFoundError:
+        return None
+
+def run_preforked(app, host: str, port: int, workers: int, preload: Callable[[], None],
+                  on_worker_start: Callable[[int, str], None], graceful_shutdown_seconds: int = 10):
+    """Run preload() once, then fork `workers` uvicorn servers on one socket
+    
+    Each child calls on_worker_start(slot, share_dir) before serving. A worker
+    that exits is replaced with a fresh fork in the same slot until the parent
+    gets SIGINT or SIGTERM, which it forwards to the workers.
+    """
+    preload()
+    
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    
+    share_dir = tempfile.mkdtemp(prefix='waveguard-feeds-')
+    children: Dict[int, int] = {}   # pid -> worker slot
+    stopping = False
+    
+    def start_worker(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            on_worker_start(slot, share_dir)
+            uvicorn.Server(uvicorn.Config(app, log_level="info",
+                                          timeout_graceful_shutdown=graceful_shutdown_seconds)).run(sockets=[sock])
+            os._exit(0)
+        children[pid] = slot
+    
+    def stop_workers(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGTERM, stop_workers)
+    for slot in range(workers):
+        start_worker(slot)
+    logger.info(f"👷 Started workers: {list(children)}")
+    
+    while children:
+        pid, status = os.wait()
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        logger.warning(f"⚠️ Worker {pid} exited with code {os.waitstatus_to_exitcode(status)}, restarting it")
+        time.sleep(WORKER_RESTART_DELAY_SECONDS)
+        if not stopping:
+            start_worker(slot)
+    
+    sock.close()
+    shutil.rmtree(share_dir, ignore_errors=True)
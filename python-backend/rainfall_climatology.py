@@ -0,0 +1,120 @@
+"""
+Monthly rainfall climatology shared by the API and the flood monitor
+
+The table holds 12 monthly rainfall normals (mm) for every cell of a global
+grid, built once from the latitude-band patterns the flood model was tuned on:
+
+    rows    -> latitude from 90N down to 90S
+    columns -> longitude from 180W eastwards
+    depth   -> months January..December
+
+The generated table is never materialized: it is a per-row monthly pattern
+times a per-column factor (about 20 KB rather than 12 MB per process), indexed
+as if it were the full array. If models/rainfall_climatology.npy exists (same
+layout, float32) it is memory-mapped instead, so real gridded normals can be
+dropped in without code changes and every process shares the same pages.
+Lookups are vectorized over any number of points.
+"""
+
+import os
+import numpy as np
+
+GRID_DEG = 0.5
+
+# Monthly normals (mm) by latitude band
+TROPICAL_MONTHLY = [180, 160, 200, 220, 250, 280, 300, 290, 270, 240, 200, 190]
+SUBTROPICAL_MONTHLY = [80, 70, 90, 110, 130, 120, 100, 90, 85, 95, 85, 80]
+TEMPERATE_MONTHLY = [50, 45, 60, 70, 80, 85, 90, 85, 75, 65, 55, 50]
+
+# Simplified oceanic influence: |lon| > 20 is treated as oceanic
+OCEANIC_FACTOR = 1.2
+CONTINENTAL_FACTOR = 0.8
+
+_table = None
+
+class FactoredTable:
+    """(rows, cols, 12) table stored as row_monthly (rows, 12) x col_factor (cols,)"""
+
+    def __init__(self, row_monthly: np.ndarray, col_factor: np.ndarray):
+        self.row_monthly = row_monthly
+        self.col_factor = col_factor
+        self.shape = (len(row_monthly), len(col_factor), 12)
+
+    def __getitem__(self, index):
+        row, col = index
+        return self.row_monthly[row] * self.col_factor[col][..., None]
+
+def factored_climatology(grid_deg: float = GRID_DEG) -> FactoredTable:
+    """The latitude-band patterns on the grid, without building the full table"""
+    rows = int(round(180 / grid_deg))
+    cols = int(round(360 / grid_deg))
+    cell_lats = 90 - (np.arange(rows) + 0.5) * grid_deg
+    cell_lons = -180 + (np.arange(cols) + 0.5) * grid_deg
+
+    abs_lat = np.abs(cell_lats)
+    band = np.select(
+        [abs_lat < 23.5, abs_lat < 40],
+        [0, 1],
+        default=2
+    )
+    band_monthly = np.array([TROPICAL_MONTHLY, SUBTROPICAL_MONTHLY, TEMPERATE_MONTHLY], dtype=np.float32)
+    oceanic_factor = np.where(np.abs(cell_lons) > 20, OCEANIC_FACTOR, CONTINENTAL_FACTOR).astype(np.float32)
+
+    return FactoredTable(band_monthly[band], oceanic_factor)
+
+def build_climatology_table(grid_deg: float = GRID_DEG) -> np.ndarray:
+    """The full (rows, cols, 12) array, e.g. as a starting point for a .npy drop-in"""
+    table = factored_climatology(grid_deg)
+    return table.row_monthly[:, None, :] * table.col_factor[None, :, None]
+
+def climatology_table() -> np.ndarray:
+    """The shared table, loaded or built on first use"""
+    global _table
+    if _table is None:
+        table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'rainfall_climatology.npy')
+        if os.path.exists(table_path):
+            _table = np.load(table_path, mmap_mode='r')
+        else:
+            _table = factored_climatology()
+    return _table
+
+def cell_indices(latitudes, longitudes):
+    """Row and column of the grid cell containing each point"""
+    table = climatology_table()
+    rows, cols = table.shape[:2]
+    cell_deg = 180 / rows
+    latitude = np.asarray(latitudes, dtype=float)
+    longitude = np.asarray(longitudes, dtype=float)
+
+    row = np.clip(np.floor((90 - latitude) / cell_deg).astype(np.int64), 0, rows - 1)
+    col = np.floor((longitude + 180) / cell_deg).astype(np.int64) % cols
+    return row, col
+
+def _unit_noise(keys: np.ndarray) -> np.ndarray:
+    """Deterministic uniform [0, 1) values from uint64 keys (splitmix64 finalizer)"""
+    z = keys.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+def monthly_rainfall(latitudes, longitudes, year: int = 0, variation: float = 0.0,
+                     seed: int = 0) -> np.ndarray:
+    """Monthly rainfall estimates (N, 12) in mm for N points
+
+    With variation > 0 each value is scaled by a factor in [1 - variation,
+    1 + variation] that depends only on the grid cell, year, month and seed, so
+    the same location always gets the same estimate for a given year.
+    """
+    row, col = cell_indices(np.atleast_1d(latitudes), np.atleast_1d(longitudes))
+    rainfall = np.asarray(climatology_table()[row, col], dtype=np.float64)
+
+    if variation:
+        cols = climatology_table().shape[1]
+        cell = row * cols + col
+        months = np.arange(12, dtype=np.int64)
+        keys = ((cell[:, None] * 4099 + year) * 12 + months[None, :]) * 1000003 + seed
+        factor = 1 + variation * (2 * _unit_noise(keys) - 1)
+        rainfall = rainfall * factor
+
+    return np.round(rainfall, 1)
@@ -0,0 +1,16 @@
+"""
+Unit tests for the backend modules; no server, network or model files needed
+
+Run from python-backend:
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep main.py from polling USGS or opening the default event store on import
+os.environ.setdefault('USGS_POLLER_ENABLED', 'false')
+os.environ.setdefault('EARTHQUAKE_STORE_PATH', '')
@@ -0,0 +1,149 @@
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+import flood_alert_monitor
+from flood_alert_monitor import AlertDeliveryQueue, FloodMonitor, LocationConfig, WeatherData
+
+def alert(i):
+    return {'alert_id': f'alert-{i}', 'location': {'name': 'Mumbai'}, 'flood_probability': 0.9}
+
+class FakeEndpoint:
+    """Stands in for AlertDeliveryQueue._post; fails the first `failures` calls"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+        self.delivered = []
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            self.calls.append([a['alert_id'] for a in batch])
+            if self.failures > 0:
+                self.failures -= 1
+                return False
+            self.delivered.extend(a['alert_id'] for a in batch)
+            return True
+
+def make_queue(monkeypatch, path, endpoint, **kwargs):
+    monkeypatch.setattr(AlertDeliveryQueue, '_post', lambda queue, batch: endpoint(batch))
+    return AlertDeliveryQueue('http://example.invalid/alerts', outbox_path=str(path),
+                              backoff_initial=0.01, backoff_max=0.05, **kwargs)
+
+def outbox_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+def test_retries_with_backoff_until_delivered(tmp_path, monkeypatch):
+    endpoint = FakeEndpoint(failures=3)
+    queue = make_queue(monkeypatch, tmp_path / 'outbox.jsonl', endpoint)
+    queue.enqueue(alert(1))
+
+    assert queue.wait_until_empty(5)
+    queue.close()
+    assert endpoint.calls == [['alert-1']] * 4
+    assert endpoint.delivered == ['alert-1']
+    assert queue.failures == 0
+    assert outbox_lines(tmp_path / 'outbox.jsonl') == []
+
+def test_batches_keep_order(tmp_path, monkeypatch):
+    endpoint = FakeEndpoint()
+    queue = make_queue(monkeypatch, tmp_path / 'outbox.jsonl', endpoint, batch_size=4)
+    with queue.condition:   # hold the worker off until all ten are queued
+        for i in range(10):
+            queue.pending.append(alert(i))
+    with queue.condition:
+        queue.condition.notify()
+
+    assert queue.wait_until_empty(5)
+    queue.close()
+    assert [len(batch) for batch in endpoint.calls] == [4, 4, 2]
+    assert endpoint.delivered == [f'alert-{i}' for i in range(10)]
+
+def test_undelivered_alerts_survive_a_restart(tmp_path, monkeypatch):
+    outbox = tmp_path / 'outbox.jsonl'
+    down = FakeEndpoint(failures=10 ** 6)
+    queue = make_queue(monkeypatch, outbox, down)
+    for i in range(3):
+        queue.enqueue(alert(i))
+    queue.close(timeout=0.2)
+    assert [record['alert_id'] for record in outbox_lines(outbox)] == ['alert-0', 'alert-1', 'alert-2']
+
+    up = FakeEndpoint()
+    restarted = make_queue(monkeypatch, outbox, up)
+    assert restarted.wait_until_empty(5)
+    restarted.close()
+    assert up.delivered == ['alert-0', 'alert-1', 'alert-2']
+    assert outbox_lines(outbox) == []
+
+def test_acknowledged_alerts_are_not_resent(tmp_path, monkeypatch):
+    outbox = tmp_path / 'outbox.jsonl'
+    with open(outbox, 'w') as f:
+        for i in range(4):
+            f.write(json.dumps(alert(i)) + '\n')
+        f.write(json.dumps({'ack': ['alert-0', 'alert-2']}) + '\n')
+        f.write('{"alert_id": "alert-9", "loc')   # interrupted write
+
+    endpoint = FakeEndpoint()
+    queue = make_queue(monkeypatch, outbox, endpoint)
+    assert queue.wait_until_empty(5)
+    queue.close()
+    assert endpoint.delivered == ['alert-1', 'alert-3']
+
+def test_acks_are_appended_until_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(flood_alert_monitor, 'OUTBOX_COMPACT_MIN_RECORDS', 4)
+    outbox = tmp_path / 'outbox.jsonl'
+    endpoint = FakeEndpoint()
+    queue = make_queue(monkeypatch, outbox, endpoint)
+    with queue.condition:
+        for i in range(10):
+            queue.pending.append(alert(i))
+        queue._save_outbox()
+
+        # Deliver by hand so the outbox can be inspected between acks
+        for expected_acks in (1, 2, 3, 4):
+            queue._acknowledge([queue.pending.popleft()])
+            lines = outbox_lines(outbox)
+            assert sum('ack' in line for line in lines) == expected_acks
+            assert len(lines) == 10 + expected_acks
+
+        # Fifth ack: as many acknowledged records as pending ones, so the outbox is rewritten
+        queue._acknowledge([queue.pending.popleft()])
+        assert outbox_lines(outbox) == list(queue.pending)
+        assert queue.acked_records == 0
+
+        queue.pending.clear()
+    queue.close(timeout=0.1)
+
+def delivery_threads():
+    return [thread for thread in threading.enumerate() if thread.name == 'alert-delivery']
+
+def test_misconfigured_monitor_starts_no_delivery_queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('OPENWEATHER_API_KEY', raising=False)
+    before = len(delivery_threads())
+
+    with pytest.raises(SystemExit):
+        FloodMonitor()
+
+    assert len(delivery_threads()) == before
+    assert not (tmp_path / 'flood_alerts_outbox.jsonl').exists()
+
+def test_alerts_in_the_same_second_get_distinct_ids(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('OPENWEATHER_API_KEY', 'test-key')
+    monkeypatch.setattr(AlertDeliveryQueue, '_post', lambda queue, batch: False)
+    monitor = FloodMonitor()
+    try:
+        location = LocationConfig(latitude=19.07, longitude=72.87, location_name='Mumbai')
+        weather = WeatherData(temperature=30, humidity=90, pressure=1000, wind_speed=5, wind_direction=180,
+                              visibility=10, precipitation=20, clouds=100, description='heavy rain',
+                              timestamp=datetime.now())
+        alerts = [monitor.create_flood_alert(location, 0.9, weather, [100.0] * 12) for _ in range(5)]
+        assert len({alert.alert_id for alert in alerts}) == 5
+        assert all(alert.alert_id.startswith('FLOOD_Mumbai_') for alert in alerts)
+    finally:
+        monitor.alert_queue.close(timeout=0.1)
+        monitor.alert_journal.close()
@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from flood_alert_monitor import AlertJournal, parse_local_time
+
+def record(name, timestamp, **extra):
+    return {'alert_id': f'{name}-{timestamp.isoformat()}', 'timestamp': timestamp.isoformat(),
+            'location': {'name': name}, 'flood_probability': 0.8, **extra}
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = AlertJournal(str(tmp_path / 'alerts.jsonl'), max_bytes=600, backups=2, fsync_every=1000)
+    yield journal
+    journal.close()
+
+def test_rotation_keeps_the_newest_files(journal, tmp_path):
+    start = datetime(2026, 1, 1)
+    records = [record('Mumbai', start + timedelta(minutes=i), padding='x' * 100) for i in range(20)]
+    for item in records:
+        journal.append(item)
+
+    files = journal.files()
+    assert [path.name for path in files] == ['alerts.jsonl.2', 'alerts.jsonl.1', 'alerts.jsonl']
+    assert not (tmp_path / 'alerts.jsonl.3').exists()
+    assert all(path.stat().st_size < 600 + 300 for path in files)
+
+    kept = list(journal.iter_alerts())
+    assert kept == records[-len(kept):]   # oldest first, the oldest ones rotated away
+    assert len(kept) < len(records)
+
+def test_iter_alerts_filters_by_location_and_time(journal):
+    start = datetime(2026, 1, 1, 12)
+    for i in range(6):
+        journal.append(record('Mumbai' if i % 2 else 'Chennai', start + timedelta(hours=i)))
+
+    assert [r['location']['name'] for r in journal.iter_alerts(location='Chennai')] == ['Chennai'] * 3
+
+    window = list(journal.iter_alerts(start=start + timedelta(hours=1), end=start + timedelta(hours=3)))
+    assert [r['timestamp'] for r in window] == [(start + timedelta(hours=i)).isoformat() for i in (1, 2, 3)]
+
+    mumbai_late = list(journal.iter_alerts(location='Mumbai', start=start + timedelta(hours=2)))
+    assert [r['timestamp'] for r in mumbai_late] == [(start + timedelta(hours=i)).isoformat() for i in (3, 5)]
+
+def test_iter_alerts_accepts_aware_bounds(journal):
+    now = datetime.now().replace(microsecond=0)
+    journal.append(record('Mumbai', now - timedelta(hours=2)))
+    journal.append(record('Mumbai', now))
+
+    since = (now - timedelta(hours=1)).astimezone(timezone.utc)
+    assert [r['timestamp'] for r in journal.iter_alerts(start=since)] == [now.isoformat()]
+    assert parse_local_time(since.isoformat()) == now - timedelta(hours=1)
+
+def test_iter_alerts_skips_a_truncated_last_line(journal, tmp_path):
+    journal.append(record('Mumbai', datetime(2026, 1, 1)))
+    journal.flush()
+    with open(tmp_path / 'alerts.jsonl', 'a') as f:
+        f.write(json.dumps(record('Mumbai', datetime(2026, 1, 2)))[:25])
+
+    assert len(list(journal.iter_alerts())) == 1
+
+def test_iter_alerts_skips_a_file_rotated_away_while_listing(journal, tmp_path, monkeypatch):
+    journal.append(record('Mumbai', datetime(2026, 1, 1)))
+    listed = journal.files
+    monkeypatch.setattr(journal, 'files', lambda: [tmp_path / 'alerts.jsonl.2'] + listed())
+
+    assert [r['location']['name'] for r in journal.iter_alerts()] == ['Mumbai']
+
+def test_legacy_log_is_migrated_from_the_journal_directory(tmp_path, monkeypatch):
+    elsewhere = tmp_path / 'cwd'
+    elsewhere.mkdir()
+    (elsewhere / 'flood_alerts_log.json').write_text(json.dumps({'alerts': [record('Pune', datetime(2025, 1, 1))]}))
+    monkeypatch.chdir(elsewhere)
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    legacy = record('Mumbai', datetime(2025, 6, 1))
+    (logs / 'flood_alerts_log.json').write_text(json.dumps({'alerts': [legacy]}))
+
+    journal = AlertJournal(str(logs / 'alerts.jsonl'))
+    try:
+        assert list(journal.iter_alerts()) == [legacy]
+    finally:
+        journal.close()
+    assert (logs / 'flood_alerts_log.json.migrated').exists()
+    assert (elsewhere / 'flood_alerts_log.json').exists()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import RISK_ZONE_LEVELS, app, classify_user_risk_zone, get_tsunami_model
+
+def event(event_id, lat, lon, probability):
+    return {'id': event_id, 'magnitude': 7.0, 'depth': 20.0, 'latitude': lat, 'longitude': lon,
+            'place': event_id, 'time': 1700000000000, 'updated': 1, 'tsunami_flag': 0,
+            'probability': probability}
+
+EVENTS = [event('near-weak', 10.0, 70.0, 0.4), event('near-strong', 12.0, 72.0, 0.9),
+          event('far', -30.0, -60.0, 0.95), event('quiet', 11.0, 71.0, 0.1),
+          event('mid', 15.0, 75.0, 0.85), event('edge', 18.0, 68.0, 0.75)]
+
+@pytest.fixture
+def client(monkeypatch):
+    async def feed(feed_type):
+        return {'status': 'success', 'count': len(EVENTS), 'earthquakes': EVENTS,
+                'fetched_at': '2026-01-01T00:00:00', 'snapshot_age_seconds': 0.0}
+
+    monkeypatch.setattr(main, 'get_usgs_feed', feed)
+    monkeypatch.setattr(main, 'get_tsunami_predictions',
+                        lambda earthquakes, model, metadata: [(eq['probability'] >= 0.3, eq['probability'])
+                                                              for eq in earthquakes])
+    app.dependency_overrides[get_tsunami_model] = lambda: (None, {})
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def expected_summary(lat, lon):
+    """Highest risk and nearest at-risk event, one event at a time"""
+    zones = [(classify_user_risk_zone(eq['latitude'], eq['longitude'], lat, lon,
+                                      eq['probability'] >= 0.3, eq['probability']), eq) for eq in EVENTS]
+    at_risk = [(zone, eq) for zone, eq in zones if zone['risk_zone'] != 'No Risk']
+    highest = max((zone['risk_zone'] for zone, _ in at_risk), key=RISK_ZONE_LEVELS.get, default='No Risk')
+    nearest = min(at_risk, key=lambda item: item[0]['distance_km'])[1]['id'] if at_risk else None
+    return highest, nearest
+
+def test_batch_spanning_several_chunks_matches_single_assessments(client):
+    rng = np.random.default_rng(5)
+    users = [{'latitude': float(lat), 'longitude': float(lon)}
+             for lat, lon in zip(rng.uniform(0, 25, 4200), rng.uniform(60, 80, 4200))]
+
+    response = client.post('/assess/tsunami-risk/batch', json={'locations': users})
+    assert response.status_code == 200
+    body = response.json()
+    assert body['user_count'] == len(users)
+    assert body['dangerous_earthquake_count'] == 5
+
+    for user, result in zip(users, body['results']):
+        highest, nearest = expected_summary(user['latitude'], user['longitude'])
+        assert result['user_location'] == user
+        assert result['highest_risk'] == highest
+        assert (result['nearest_dangerous_event'] or {}).get('id') == nearest
+
+def test_unknown_location_fields_are_rejected(client):
+    response = client.post('/assess/tsunami-risk/batch',
+                           json={'locations': [{'latitude': 10, 'longitude': 70, 'feed_type': 'past_hour_all'}]})
+    assert response.status_code == 422
+
+def test_out_of_range_coordinates_are_rejected(client):
+    response = client.post('/assess/tsunami-risk/batch', json={'locations': [{'latitude': 91, 'longitude': 0}]})
+    assert response.status_code == 422
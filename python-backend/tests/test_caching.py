@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+import pytest
+
+import caching
+import main
+from caching import SingleFlight, TTLCache, grid_cell
+
+def test_concurrent_calls_share_one_fetch():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'value': len(calls)}
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do('key', fetch) for _ in range(10)))
+        assert flight.in_flight == {}
+        return results
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+def test_different_keys_and_later_calls_fetch_again():
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def run():
+        flight = SingleFlight()
+        assert await asyncio.gather(flight.do('a', lambda: fetch('a')), flight.do('b', lambda: fetch('b'))) == ['a', 'b']
+        assert await flight.do('a', lambda: fetch('a')) == 'a'
+
+    asyncio.run(run())
+    assert calls == ['a', 'b', 'a']
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    async def run():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 'done'
+
+        first = asyncio.ensure_future(flight.do('key', fetch))
+        second = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == 'done'
+        assert first.cancelled()
+        assert flight.in_flight == {}
+
+    asyncio.run(run())
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError('upstream down')
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.do('key', failing), flight.do('key', failing), return_exceptions=True)
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        with pytest.raises(RuntimeError):
+            await flight.do('key', failing)
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(caching.time, 'monotonic', clock)
+    return clock
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache(max_bytes=10_000)
+    cache.set('a', {'temp': 20}, ttl_seconds=60)
+
+    clock.now += 59
+    assert cache.get('a') == {'temp': 20}
+    clock.now += 1
+    assert cache.get('a') is None
+    assert cache.entries == {} and cache.total_bytes == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_ttl_cache_evicts_least_recently_used_past_the_byte_cap(clock):
+    value = {'payload': 'x' * 80}
+    size = len(json.dumps(value))
+    cache = TTLCache(max_bytes=3 * size)
+    for key in 'abc':
+        cache.set(key, value, ttl_seconds=60)
+    cache.get('a')
+    cache.set('d', value, ttl_seconds=60)
+
+    assert list(cache.entries) == ['c', 'a', 'd']
+    assert cache.total_bytes == 3 * size
+    assert cache.stats()['evictions'] == 1
+
+    cache.set('a', {'payload': 'y' * 80}, ttl_seconds=60)   # replacing does not double count
+    assert cache.total_bytes == 3 * size
+
+def test_ttl_cache_keeps_a_single_oversized_entry(clock):
+    cache = TTLCache(max_bytes=10)
+    cache.set('big', {'payload': 'x' * 100}, ttl_seconds=60)
+    assert cache.get('big') is not None
+
+@pytest.mark.parametrize('lat, lon, expected', [
+    (19.07, 72.87, (19.05, 72.85)),
+    (19.0, 72.8, (19.05, 72.85)),
+    (-0.01, -0.01, (-0.05, -0.05)),
+    (90.0, 0.0, (90.0, 0.05)),
+    (-90.0, 0.0, (-89.95, 0.05)),
+    (0.0, 180.0, (0.05, -179.95)),
+    (0.0, -180.0, (0.05, -179.95)),
+    (0.0, 179.99, (0.05, 179.95)),
+    (0.0, 540.0, (0.05, -179.95)),
+])
+def test_grid_cell_centers(lat, lon, expected):
+    assert grid_cell(lat, lon, 0.1) == pytest.approx(expected)
+
+def test_nearby_weather_requests_share_one_cached_fetch(monkeypatch):
+    calls = []
+
+    async def fetch_current(lat, lon):
+        calls.append((lat, lon))
+        return {'status': 'success', 'coordinates': {'lat': lat, 'lon': lon}, 'temperature': 30}
+
+    monkeypatch.setattr(main, 'fetch_openweather_current', fetch_current)
+    monkeypatch.setattr(main, 'weather_cache', TTLCache(10_000))
+    monkeypatch.setattr(main, 'OPENWEATHER_CACHE_GRID_DEG', 0.1)
+
+    async def run():
+        return await asyncio.gather(main.load_current_weather(19.071, 72.871),
+                                    main.load_current_weather(19.079, 72.879),
+                                    main.load_current_weather(19.071, 72.871))
+
+    first, second, third = asyncio.run(run())
+    assert calls == [(19.05, 72.85)]
+    assert first['coordinates'] == {'lat': 19.071, 'lon': 72.871}
+    assert second['coordinates'] == {'lat': 19.079, 'lon': 72.879}
+    assert asyncio.run(main.load_current_weather(19.0, 72.8))['temperature'] == 30
+    assert len(calls) == 1
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from compiled_models import (SMALL_BATCH_ROWS, CompiledLinearModel, CompiledLogisticModel, CompiledTreeEnsemble,
+                             compile_estimator, export_compiled_model, load_compiled_model)
+
+def training_data(n_features=6, rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, n_features))
+    y = (X[:, 0] + 0.5 * X[:, 1] ** 2 - X[:, 2] + rng.normal(scale=0.5, size=rows) > 0.5).astype(int)
+    return X, y
+
+def probe_matrix(estimator, X, seed=1):
+    """Random rows, training rows, and rows sitting exactly on split thresholds"""
+    rng = np.random.default_rng(seed)
+    probes = [rng.normal(scale=2.0, size=(300, X.shape[1])), X[:100]]
+    trees = getattr(estimator, 'estimators_', [estimator])
+    on_threshold = np.repeat(X[:1], 50, axis=0)
+    for row, tree in enumerate(trees[:50]):
+        split = np.flatnonzero(tree.tree_.feature >= 0)[0]
+        on_threshold[row, tree.tree_.feature[split]] = tree.tree_.threshold[split]
+    probes.append(on_threshold)
+    return np.vstack(probes)
+
+@pytest.mark.parametrize('estimator', [
+    RandomForestClassifier(n_estimators=30, random_state=0),
+    ExtraTreesClassifier(n_estimators=20, max_depth=8, random_state=0),
+    DecisionTreeClassifier(random_state=0),
+])
+def test_tree_ensemble_matches_sklearn(estimator):
+    X, y = training_data()
+    estimator.fit(X, y)
+    probes = probe_matrix(estimator, X)
+
+    compiled = compile_estimator(estimator)
+
+    assert isinstance(compiled, CompiledTreeEnsemble)
+    np.testing.assert_array_equal(compiled.predict_proba(probes), estimator.predict_proba(probes))
+    np.testing.assert_array_equal(compiled.predict(probes), estimator.predict(probes))
+    np.testing.assert_array_equal(compiled.predict_proba(probes, chunk_rows=7), estimator.predict_proba(probes))
+
+def test_tree_export_round_trip(tmp_path):
+    X, y = training_data()
+    estimator = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    scaler = StandardScaler().fit(X)
+    probes = probe_matrix(estimator, X)
+
+    export_compiled_model(str(tmp_path / 'forest'), estimator, scaler, {'name': 'test'})
+    model, loaded_scaler, manifest = load_compiled_model(str(tmp_path / 'forest'))
+
+    assert manifest['estimator'] == 'RandomForestClassifier'
+    assert manifest['metadata'] == {'name': 'test'}
+    np.testing.assert_array_equal(model.predict_proba(probes), estimator.predict_proba(probes))
+    np.testing.assert_array_equal(loaded_scaler.transform(probes), scaler.transform(probes))
+
+def test_failed_verification_keeps_the_previous_export(tmp_path):
+    X, y = training_data()
+    path = str(tmp_path / 'forest')
+    first = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    export_compiled_model(path, first, source={'size': 1})
+
+    second = RandomForestClassifier(n_estimators=7, random_state=1).fit(X, y)
+    with pytest.raises(ValueError):
+        export_compiled_model(path, second, source={'size': 2}, verify=lambda model, scaler: False)
+
+    model, _, manifest = load_compiled_model(path)
+    assert manifest['source'] == {'size': 1}
+    assert model.n_estimators == 5
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['forest']
+
+def test_logistic_model_matches_sklearn():
+    X, y = training_data()
+    estimator = LogisticRegression().fit(X, y)
+    rng = np.random.default_rng(2)
+    probes = np.vstack([rng.normal(scale=3.0, size=(500, X.shape[1])), np.zeros((1, X.shape[1]))])
+
+    compiled = compile_estimator(estimator)
+
+    assert isinstance(compiled, CompiledLogisticModel)
+    np.testing.assert_array_equal(compiled.decision_function(probes), estimator.decision_function(probes))
+    np.testing.assert_array_equal(compiled.predict(probes), estimator.predict(probes))
+    # Small batches go through libm exp and match scikit-learn bit for bit
+    for row in range(0, len(probes), SMALL_BATCH_ROWS):
+        batch = probes[row:row + SMALL_BATCH_ROWS]
+        np.testing.assert_array_equal(compiled.predict_proba(batch), estimator.predict_proba(batch))
+    np.testing.assert_allclose(compiled.predict_proba(probes), estimator.predict_proba(probes), rtol=0, atol=1e-15)
+
+def test_linear_model_and_round_trip(tmp_path):
+    X, y = training_data()
+    regression = LinearRegression().fit(X, X[:, 0] * 3 + y)
+    probes = np.random.default_rng(4).normal(size=(200, X.shape[1]))
+
+    compiled = compile_estimator(regression)
+    assert type(compiled) is CompiledLinearModel
+    np.testing.assert_array_equal(compiled.predict(probes), regression.predict(probes))
+
+    classifier = LogisticRegression().fit(X, y)
+    export_compiled_model(str(tmp_path / 'logistic'), classifier)
+    model, scaler, _ = load_compiled_model(str(tmp_path / 'logistic'))
+    assert scaler is None
+    np.testing.assert_array_equal(model.predict(probes), classifier.predict(probes))
+    np.testing.assert_array_equal(model.predict_proba(probes[:SMALL_BATCH_ROWS]),
+                                  classifier.predict_proba(probes[:SMALL_BATCH_ROWS]))
+
+def test_linear_model_rejects_bad_input():
+    X, y = training_data()
+    compiled = compile_estimator(LogisticRegression().fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict(X[:, :3])
+    with pytest.raises(ValueError):
+        compiled.predict(np.full((1, X.shape[1]), np.nan))
+    with pytest.raises(ValueError):
+        compile_estimator(LogisticRegression().fit(X, np.arange(len(X)) % 3))
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from earthquake_store import EarthquakeStore
+from geodesy import haversine_distance, haversine_distances, radius_bounds
+
+NOW = 1_760_000_000_000
+HOUR = 3600 * 1000
+
+def event(event_id, latitude, longitude, magnitude=5.0, hours_ago=1, updated=1):
+    return {'id': event_id, 'magnitude': magnitude, 'depth': 10.0, 'latitude': latitude, 'longitude': longitude,
+            'place': event_id, 'time': NOW - hours_ago * HOUR, 'updated': updated, 'tsunami_flag': 0}
+
+@pytest.fixture
+def store(tmp_path):
+    store = EarthquakeStore(str(tmp_path / 'events.sqlite'))
+    store.upsert([
+        event('dateline_east', 0.0, 179.8),
+        event('dateline_west', 0.0, -179.8),
+        event('fiji', -17.8, 178.0, magnitude=6.5),
+        event('tonga', -21.0, -175.0, magnitude=4.0),
+        event('greenwich', 0.0, 0.0),
+        event('north_pole_a', 89.5, 10.0),
+        event('north_pole_b', 89.6, -170.0),
+        event('svalbard', 78.2, 15.6),
+        event('south_pole', -89.9, 120.0),
+        event('old', 0.0, 179.9, hours_ago=100),
+    ])
+    yield store
+    store.close()
+
+def ids(events):
+    return sorted(eq['id'] for eq in events)
+
+def search(store, hours=24, **kwargs):
+    return store.search(NOW - hours * HOUR, NOW, **kwargs)
+
+def test_radius_search_crosses_the_antimeridian(store):
+    found = search(store, latitude=0.0, longitude=180.0, radius_km=100)
+    assert ids(found) == ['dateline_east', 'dateline_west']
+    for eq in found:
+        assert eq['distance_km'] == pytest.approx(haversine_distance(0.0, 180.0, eq['latitude'], eq['longitude']), abs=0.01)
+
+    assert ids(search(store, latitude=0.0, longitude=-179.9, radius_km=100)) == ['dateline_east', 'dateline_west']
+
+def test_radius_search_near_the_poles_ignores_longitude(store):
+    assert ids(search(store, latitude=89.9, longitude=100.0, radius_km=100)) == ['north_pole_a', 'north_pole_b']
+    assert ids(search(store, latitude=88.0, longitude=-90.0, radius_km=1400)) == \
+        ['north_pole_a', 'north_pole_b', 'svalbard']
+    assert ids(search(store, latitude=-90.0, longitude=0.0, radius_km=50)) == ['south_pole']
+
+def test_radius_results_match_a_brute_force_scan(store):
+    everything = search(store)
+    rng = np.random.default_rng(3)
+    for latitude, longitude, radius in zip(rng.uniform(-90, 90, 50), rng.uniform(-180, 180, 50),
+                                           rng.uniform(10, 5000, 50)):
+        distances = haversine_distances([eq['latitude'] for eq in everything],
+                                        [eq['longitude'] for eq in everything], latitude, longitude)
+        expected = sorted(eq['id'] for eq, d in zip(everything, distances) if d <= radius)
+        assert ids(search(store, latitude=latitude, longitude=longitude, radius_km=radius)) == expected
+
+def test_bbox_across_the_antimeridian(store):
+    # min_lon > max_lon: the box runs east from 170 over the dateline to -170
+    assert ids(search(store, bbox=(-30.0, 10.0, 170.0, -170.0))) == ['dateline_east', 'dateline_west', 'fiji', 'tonga']
+    assert ids(search(store, bbox=(-30.0, 10.0, 179.0, 180.0))) == ['dateline_east']
+    assert ids(search(store, bbox=(-30.0, 10.0, -170.0, 170.0))) == ['greenwich']
+
+def test_bbox_with_radius_and_magnitude(store):
+    found = search(store, latitude=-18.0, longitude=180.0, radius_km=1000, bbox=(-30.0, 10.0, 170.0, -170.0))
+    assert ids(found) == ['fiji', 'tonga']
+    assert ids(search(store, latitude=-18.0, longitude=180.0, radius_km=1000, min_magnitude=5.0)) == ['fiji']
+
+def test_time_window_order_and_limit(store):
+    assert 'old' not in ids(search(store))
+    assert 'old' in ids(search(store, hours=200))
+
+    store.upsert([event('newest', 1.0, 1.0, hours_ago=0)])
+    assert [eq['id'] for eq in search(store, limit=1)] == ['newest']
+    assert len(search(store, hours=200, latitude=0.0, longitude=180.0, radius_km=100, limit=2)) == 2
+
+def test_upsert_replaces_updated_events(store):
+    store.upsert([event('greenwich', 0.0, 0.0, magnitude=7.0, updated=2)])
+    store.upsert([event('greenwich', 45.0, 45.0, magnitude=1.0, updated=2)])   # same `updated`: ignored
+
+    found = search(store, latitude=0.0, longitude=0.0, radius_km=10)
+    assert [(eq['id'], eq['magnitude']) for eq in found] == [('greenwich', 7.0)]
+    assert store.count() == 10
+
+def test_radius_bounds_split_at_the_antimeridian():
+    (south, north), lon_ranges = radius_bounds(0.0, 179.5, 200)
+    assert south < 0 < north
+    assert len(lon_ranges) == 2
+    assert lon_ranges[0][1] == 180.0 and lon_ranges[1][0] == -180.0
+
+    _, lon_ranges = radius_bounds(85.0, 0.0, 600)
+    assert lon_ranges == [(-180.0, 180.0)]
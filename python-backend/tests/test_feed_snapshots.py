@@ -0,0 +1,100 @@
+import pytest
+
+import main
+from main import diff_feed, feed_update_event, publish_feed_snapshot
+
+FEED = 'past_day_all'
+
+def event(event_id, updated=1, magnitude=5.0):
+    return {'id': event_id, 'magnitude': magnitude, 'depth': 10.0, 'latitude': 10.0, 'longitude': 20.0,
+            'place': 'somewhere', 'time': 1700000000000, 'updated': updated, 'tsunami_flag': 0}
+
+def fetched(earthquakes, **extra):
+    return {'status': 'success', 'earthquakes': earthquakes, 'metadata': {'count': len(earthquakes)}, **extra}
+
+@pytest.fixture(autouse=True)
+def clean_feeds(monkeypatch):
+    monkeypatch.setattr(main, 'feed_snapshots', {})
+    monkeypatch.setattr(main, 'feed_update_events', {})
+    monkeypatch.setattr(main, 'tsunami_prediction_cache', {})
+    monkeypatch.setattr(main, 'models', {})
+
+def test_diff_feed_added_updated_removed():
+    a, b, c = event('a'), event('b'), event('c')
+    previous = {eq['id']: eq for eq in (a, b, c)}
+    b2, d = event('b', updated=2), event('d')
+
+    delta = diff_feed(previous, (a, b2, d))
+
+    assert delta.added == (d,)
+    assert delta.updated == (b2,)
+    assert delta.removed == ('c',)
+    assert delta.changed == (d, b2)
+
+def test_diff_feed_ignores_equal_updated():
+    previous = {'a': event('a')}
+    assert not diff_feed(previous, (event('a', magnitude=9.9),))
+
+def test_events_without_an_id_are_never_a_change():
+    anonymous = {**event('x'), 'id': None}
+    assert not diff_feed({}, (anonymous,))
+
+    first = publish_feed_snapshot(FEED, fetched([event('a'), anonymous]))
+    update = feed_update_event(FEED)
+    again = publish_feed_snapshot(FEED, fetched([event('a'), {**anonymous}]))
+
+    assert len(first.earthquakes) == 2
+    assert again.version == first.version
+    assert not update.is_set()
+
+def test_publish_versions_only_move_on_change():
+    first = publish_feed_snapshot(FEED, fetched([event('a'), event('b')], etag='"1"'))
+    assert first.version == 1
+    assert first.delta.counts() == {'added': 2, 'updated': 0, 'removed': 0}
+
+    same = publish_feed_snapshot(FEED, fetched([event('a'), event('b')], etag='"2"'))
+    assert same.version == 1
+    assert same.earthquakes is first.earthquakes
+    assert same.etag == '"2"'
+
+    changed = publish_feed_snapshot(FEED, fetched([event('a', updated=2), event('c')]))
+    assert changed.version == 2
+    assert [eq['id'] for eq in changed.delta.added] == ['c']
+    assert [eq['id'] for eq in changed.delta.updated] == ['a']
+    assert changed.delta.removed == ('b',)
+    assert set(changed.events_by_id) == {'a', 'c'}
+
+def test_publish_drops_predictions_for_removed_events():
+    main.tsunami_prediction_cache.update({'a': (1, False, 0.1), 'b': (1, True, 0.9)})
+    publish_feed_snapshot(FEED, fetched([event('a'), event('b')]))
+    publish_feed_snapshot('past_hour_m45', fetched([event('b')]))
+
+    publish_feed_snapshot(FEED, fetched([event('c')]))
+
+    # 'b' is still in another feed, 'a' has left every feed
+    assert set(main.tsunami_prediction_cache) == {'b'}
+
+def test_not_modified_reuses_previous_snapshot():
+    first = publish_feed_snapshot(FEED, fetched([event('a')], etag='"1"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT'))
+    update = feed_update_event(FEED)
+
+    refreshed = publish_feed_snapshot(FEED, {'status': 'success', 'not_modified': True,
+                                             'earthquakes': [], 'metadata': {'count': 1}, 'etag': '"1"'})
+
+    assert refreshed.version == first.version
+    assert refreshed.earthquakes is first.earthquakes
+    assert refreshed.events_by_id is first.events_by_id
+    assert refreshed.last_modified == first.last_modified
+    assert refreshed.fetched_at >= first.fetched_at
+    assert not update.is_set()
+
+def test_update_event_is_set_only_for_a_new_version():
+    publish_feed_snapshot(FEED, fetched([event('a')]))
+    update = feed_update_event(FEED)
+
+    publish_feed_snapshot(FEED, fetched([event('a')]))
+    assert not update.is_set()
+
+    publish_feed_snapshot(FEED, fetched([event('a'), event('b')]))
+    assert update.is_set()
+    assert feed_update_event(FEED) is not update
@@ -0,0 +1,80 @@
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import app, determine_risk_level, get_flood_model
+
+class RainfallModel:
+    """Flood probability rises with the annual rainfall total"""
+
+    classes_ = np.array([0, 1])
+
+    def predict_proba(self, features):
+        positive = np.clip(features[:, 1:].sum(axis=1) / 3000, 0, 1)
+        return np.column_stack([1 - positive, positive])
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_flood_model] = lambda: RainfallModel()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def scenarios(count=50):
+    rng = np.random.default_rng(2)
+    return np.column_stack([rng.integers(1950, 2030, count), rng.uniform(0, 400, (count, 12))])
+
+def npy(rows):
+    buffer = io.BytesIO()
+    np.save(buffer, rows)
+    return buffer.getvalue()
+
+def test_json_and_binary_bodies_score_the_same(client):
+    rows = scenarios()
+    as_json = client.post('/predict/flood/batch', json={'rows': rows.tolist()}).json()
+    as_npy = client.post('/predict/flood/batch/binary', content=npy(rows),
+                         headers={'Content-Type': 'application/x-npy'}).json()
+    as_raw = client.post('/predict/flood/batch/binary', content=rows.astype('<f8').tobytes(),
+                         headers={'Content-Type': 'application/octet-stream'}).json()
+
+    expected = RainfallModel().predict_proba(rows)[:, 1]
+    assert as_json['count'] == 50
+    np.testing.assert_allclose(as_json['flood_probabilities'], expected)
+    assert as_json['predictions'] == (expected > 0.5).tolist()
+    assert as_json['risk_levels'] == [determine_risk_level(p) for p in expected]
+    for other in (as_npy, as_raw):
+        assert {k: v for k, v in other.items() if k != 'timestamp'} == \
+               {k: v for k, v in as_json.items() if k != 'timestamp'}
+
+def test_row_limit(client, monkeypatch):
+    monkeypatch.setattr(main, 'MAX_FLOOD_BATCH_ROWS', 10)
+    response = client.post('/predict/flood/batch', json={'rows': scenarios(11).tolist()})
+    assert response.status_code == 400
+    assert 'max 10' in response.json()['detail']
+    assert client.post('/predict/flood/batch', json={'rows': scenarios(10).tolist()}).status_code == 200
+
+@pytest.mark.parametrize('rows', [
+    [[2020] + [10.0] * 11],                     # 12 values
+    [[1800] + [10.0] * 12],                     # year out of range
+    [[2020, float('nan')] + [10.0] * 11],       # not finite
+])
+def test_invalid_rows_are_rejected(client, rows):
+    body = npy(np.array(rows, dtype=float))
+    response = client.post('/predict/flood/batch/binary', content=body, headers={'Content-Type': 'application/x-npy'})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('body', [b'not a numpy file', npy(np.array([{'year': 2020}], dtype=object))])
+def test_malformed_or_pickled_npy_is_rejected(client, body):
+    response = client.post('/predict/flood/batch/binary', content=body, headers={'Content-Type': 'application/x-npy'})
+    assert response.status_code == 400
+
+def test_raw_body_must_hold_whole_rows(client):
+    response = client.post('/predict/flood/batch/binary', content=b'\0' * (13 * 8 + 8),
+                           headers={'Content-Type': 'application/octet-stream'})
+    assert response.status_code == 400
+
+def test_unknown_content_type(client):
+    response = client.post('/predict/flood/batch/binary', content=b'{}', headers={'Content-Type': 'application/json'})
+    assert response.status_code == 415
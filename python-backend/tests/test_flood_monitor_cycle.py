@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from flood_alert_monitor import AlertDeliveryQueue, FloodMonitor, LocationConfig, WeatherData
+
+WEATHER = WeatherData(temperature=30, humidity=90, pressure=1000, wind_speed=5, wind_direction=180,
+                      visibility=10, precipitation=20, clouds=100, description='heavy rain',
+                      timestamp=datetime.now())
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('OPENWEATHER_API_KEY', 'test-key')
+    monkeypatch.setattr(AlertDeliveryQueue, '_post', lambda queue, batch: True)
+    monitor = FloodMonitor(max_concurrency=4, location_timeout=0.3)
+    scored = []
+    monitor.evaluate_location = lambda location, probability, weather, rainfall: scored.append(location.location_name)
+    monitor.scored = scored
+    yield monitor
+    monitor.pool.shutdown(wait=True, cancel_futures=True)
+    monitor.alert_queue.close(timeout=0.1)
+    monitor.alert_journal.close()
+
+def locations(*names):
+    return [LocationConfig(latitude=10.0, longitude=70.0, location_name=name) for name in names]
+
+def test_slow_location_is_skipped_without_holding_up_the_cycle(monitor):
+    release = threading.Event()
+
+    def collect(location):
+        if location.location_name == 'Slow':
+            release.wait(5)
+        return WEATHER, [100.0] * 12
+
+    monitor.collect_location_inputs = collect
+    started = time.monotonic()
+    monitor.run_monitoring_cycle(locations('Fast', 'Slow', 'Also fast'))
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert sorted(monitor.scored) == ['Also fast', 'Fast']
+    assert elapsed < 2
+
+def test_cycles_reuse_the_same_worker_threads(monitor):
+    threads = set()
+
+    def collect(location):
+        threads.add(threading.current_thread().ident)
+        return WEATHER, [100.0] * 12
+
+    monitor.collect_location_inputs = collect
+    for _ in range(5):
+        monitor.run_monitoring_cycle(locations('A', 'B', 'C', 'D'))
+
+    assert len(monitor.scored) == 20
+    assert len(threads) <= monitor.max_concurrency
+
+def test_requests_are_bounded_by_the_location_deadline(monitor):
+    timeouts = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'main': {'temp': 30, 'humidity': 90, 'pressure': 1000},
+                    'weather': [{'description': 'rain'}], 'list': []}
+
+    def get(url, params=None, timeout=None):
+        timeouts.append(timeout)
+        return Response()
+
+    monitor.session.get = get
+    monitor.collect_location_inputs(locations('Mumbai')[0])
+
+    assert len(timeouts) == 2
+    assert all(timeout is not None and 0 < timeout <= monitor.location_timeout for timeout in timeouts)
+
+class RainfallModel:
+    """Flood probability rises with the annual rainfall total"""
+
+    def predict_proba(self, features):
+        positive = features[:, 1:].sum(axis=1) / 3000
+        return np.column_stack([1 - positive, positive])
+
+def test_one_model_call_scores_the_whole_cycle(monitor):
+    calls = []
+    monitor.flood_model = RainfallModel()
+    score = monitor.predict_flood_probabilities
+
+    def counted(rows):
+        calls.append(len(rows))
+        return score(rows)
+
+    rainfall = {'A': [50.0] * 12, 'B': [150.0] * 12, 'C': None, 'D': [300.0] * 12}
+    monitor.collect_location_inputs = lambda location: (
+        None if rainfall[location.location_name] is None else (WEATHER, rainfall[location.location_name])
+    )
+    monitor.predict_flood_probabilities = counted
+    probabilities = {}
+    monitor.evaluate_location = lambda location, probability, weather, rows: probabilities.update(
+        {location.location_name: probability})
+    monitor.run_monitoring_cycle(locations('A', 'B', 'C', 'D'))
+
+    assert calls == [3]
+    assert probabilities == {name: pytest.approx(monitor.predict_flood_probability(rows))
+                             for name, rows in rainfall.items() if rows is not None}
+    assert probabilities == {'A': pytest.approx(0.2), 'B': pytest.approx(0.6), 'D': pytest.approx(1.0)}
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+import main
+from main import close_http_clients, get_http_client
+
+@pytest.fixture(autouse=True)
+def clean_clients(monkeypatch):
+    monkeypatch.setattr(main, 'http_clients', {})
+
+def test_one_pooled_client_per_upstream():
+    async def scenario():
+        usgs = get_http_client('usgs')
+        assert get_http_client('usgs') is usgs
+        assert get_http_client('openweather') is not usgs
+        assert usgs.timeout == main.UPSTREAM_TIMEOUT
+        assert usgs.headers['Accept-Encoding'] == 'gzip'
+        await close_http_clients()
+
+    asyncio.run(scenario())
+    assert main.http_clients == {}
+
+def test_a_closed_client_is_replaced():
+    async def scenario():
+        client = get_http_client('usgs')
+        await client.aclose()
+        replacement = get_http_client('usgs')
+        assert replacement is not client and not replacement.is_closed
+        await close_http_clients()
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pytest
+
+import main
+from main import is_oceanic_locations, load_ocean_mask
+
+MODELS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
+@pytest.fixture(autouse=True)
+def restore_mask(monkeypatch):
+    monkeypatch.setattr(main, 'ocean_mask', None)
+
+def write_mask(directory, ocean):
+    np.save(os.path.join(directory, 'ocean_mask.npy'), np.packbits(ocean, axis=1))
+
+def test_lookups_match_the_unpacked_grid(tmp_path):
+    rng = np.random.default_rng(1)
+    ocean = rng.random((180, 360)) < 0.6   # 1 degree cells
+    write_mask(tmp_path, ocean)
+    load_ocean_mask(str(tmp_path))
+
+    lats = rng.uniform(-89.99, 89.99, 5000)
+    lons = rng.uniform(-180, 179.99, 5000)
+    expected = ocean[np.floor(90 - lats).astype(int), np.floor(lons + 180).astype(int)]
+    np.testing.assert_array_equal(is_oceanic_locations(lats, lons), expected.astype(int))
+
+def test_poles_and_antimeridian_stay_on_the_grid(tmp_path):
+    ocean = np.zeros((180, 360), dtype=bool)
+    ocean[0, 0] = ocean[-1, 5] = True   # 90N at 180W, 90S at 175W
+    write_mask(tmp_path, ocean)
+    load_ocean_mask(str(tmp_path))
+
+    assert is_oceanic_locations([90.0, -90.0, 89.5, 89.5], [-180.0, -174.5, 180.0, 179.5]).tolist() == [1, 1, 1, 0]
+
+def test_bundled_mask_spot_checks():
+    load_ocean_mask(MODELS)
+    assert main.ocean_mask is not None
+    # Tokyo, Jakarta, Delhi are land; mid-Pacific, Bay of Bengal, off Sendai are ocean
+    lats = [35.68, -6.2, 28.61, 0.0, 15.0, 38.3]
+    lons = [139.69, 106.85, 77.21, -150.0, 88.0, 142.4]
+    assert is_oceanic_locations(lats, lons).tolist() == [0, 0, 0, 1, 1, 1]
+
+def test_missing_mask_falls_back_to_continental_boxes(tmp_path):
+    load_ocean_mask(str(tmp_path))
+    assert main.ocean_mask is None
+    assert is_oceanic_locations([45.0, 0.0], [-100.0, -150.0]).tolist() == [0, 1]
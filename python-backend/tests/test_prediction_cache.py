@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import main
+from main import get_tsunami_predictions
+
+class CountingModel:
+    """predict_proba stub recording how many rows it scored"""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict_proba(self, features):
+        self.rows += len(features)
+        positive = np.full(len(features), 0.75)
+        return np.column_stack([1 - positive, positive])
+
+def event(event_id, updated=1):
+    return {'id': event_id, 'magnitude': 7.0, 'depth': 20.0, 'latitude': 38.0, 'longitude': 142.0,
+            'place': event_id, 'time': 1700000000000, 'updated': updated, 'tsunami_flag': 0}
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setattr(main, 'tsunami_prediction_cache', OrderedDict())
+    monkeypatch.setattr(main, 'TSUNAMI_PREDICTION_CACHE_SIZE', 3)
+    return CountingModel()
+
+def test_cached_events_are_not_rescored(model):
+    events = [event('a'), event('b')]
+    first = get_tsunami_predictions(events, model, {'scaler': None})
+    again = get_tsunami_predictions(events, model, {'scaler': None})
+
+    assert first == again == [(True, 0.75), (True, 0.75)]
+    assert model.rows == 2
+
+def test_updated_events_are_rescored(model):
+    get_tsunami_predictions([event('a')], model, {'scaler': None})
+    get_tsunami_predictions([event('a', updated=2)], model, {'scaler': None})
+
+    assert model.rows == 2
+    assert main.tsunami_prediction_cache['a'][0] == 2
+
+def test_eviction_is_least_recently_used(model):
+    get_tsunami_predictions([event('a'), event('b'), event('c')], model, {'scaler': None})
+    get_tsunami_predictions([event('a')], model, {'scaler': None})     # hit: 'a' becomes most recent
+    get_tsunami_predictions([event('d')], model, {'scaler': None})
+
+    assert list(main.tsunami_prediction_cache) == ['c', 'a', 'd']
+    assert model.rows == 4
+
+    get_tsunami_predictions([event('a')], model, {'scaler': None})
+    assert model.rows == 4
+
+def test_feed_refresh_scores_off_the_event_loop(model, monkeypatch):
+    scoring_threads = []
+    score = model.predict_proba
+
+    def predict_proba(features):
+        scoring_threads.append(threading.get_ident())
+        return score(features)
+
+    model.predict_proba = predict_proba
+    monkeypatch.setattr(main, 'models', {'tsunami': model})
+    monkeypatch.setattr(main, 'model_metadata', {'tsunami': {'scaler': None}})
+    monkeypatch.setattr(main, 'feed_snapshots', {})
+    monkeypatch.setattr(main, 'earthquake_store', None)
+    feed = [event('a'), event('b')]
+
+    async def fetch(feed_type):
+        return {'status': 'success', 'earthquakes': list(feed), 'metadata': {}}
+
+    monkeypatch.setattr(main, 'fetch_usgs_earthquake_data', fetch)
+
+    async def refresh():
+        await main.fetch_and_publish_feed('past_day_all')
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(refresh())
+    assert scoring_threads and loop_thread not in scoring_threads
+    assert list(main.tsunami_prediction_cache) == ['a', 'b']
+
+    feed.append(event('c'))
+    asyncio.run(refresh())
+    assert model.rows == 3   # only the added event is scored
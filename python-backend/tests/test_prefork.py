@@ -0,0 +1,92 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from prefork import read_shared_feed, share_feed
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def events(*ids):
+    return [{'id': event_id, 'updated': 1} for event_id in ids]
+
+def test_followers_read_events_only_when_the_version_moved(tmp_path):
+    share_dir = str(tmp_path)
+    assert read_shared_feed(share_dir, 'past_day_all') is None
+
+    share_feed(share_dir, 'past_day_all', '100:1', '2026-01-01T00:00:00', {'count': 2}, events('a', 'b'))
+    stamp, earthquakes = read_shared_feed(share_dir, 'past_day_all')
+    assert earthquakes == events('a', 'b')
+    assert read_shared_feed(share_dir, 'past_day_all', stamp) is None
+
+    # Same version refreshed: only the stamp moved
+    share_feed(share_dir, 'past_day_all', '100:1', '2026-01-01T00:02:00', {'count': 2})
+    newer, earthquakes = read_shared_feed(share_dir, 'past_day_all', stamp)
+    assert earthquakes is None and newer['fetched_at'] == '2026-01-01T00:02:00'
+
+    # A restarted poller starts counting again; its pid keeps the source distinct
+    share_feed(share_dir, 'past_day_all', '200:1', '2026-01-01T00:03:00', {'count': 1}, events('c'))
+    _, earthquakes = read_shared_feed(share_dir, 'past_day_all', newer)
+    assert earthquakes == events('c')
+    assert sorted(os.listdir(share_dir)) == ['past_day_all.json', 'past_day_all.json.stamp']
+
+WORKER_SCRIPT = textwrap.dedent('''
+    import os, sys
+    from prefork import run_preforked
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                await send({'type': message['type'] + '.complete'})
+                if message['type'] == 'lifespan.shutdown':
+                    return
+
+    def started(slot, share_dir):
+        with open(os.path.join(sys.argv[1], f'{slot}-{os.getpid()}'), 'w') as f:
+            f.write(share_dir)
+
+    run_preforked(app, '127.0.0.1', int(sys.argv[2]), 2, lambda: None, started, 1)
+''')
+
+def started_workers(directory):
+    return sorted(name.split('-') for name in os.listdir(directory))
+
+def wait_for(condition, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs os.fork")
+def test_exited_workers_are_replaced_in_their_slot(tmp_path):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    parent = subprocess.Popen([sys.executable, '-c', WORKER_SCRIPT, str(tmp_path), str(port)], cwd=BACKEND)
+    try:
+        assert wait_for(lambda: len(os.listdir(tmp_path)) == 2)
+        (slot0, pid0), (slot1, pid1) = started_workers(tmp_path)
+        assert (slot0, slot1) == ('0', '1')
+        share_dir = open(tmp_path / f'0-{pid0}').read()
+        assert os.path.isdir(share_dir)
+
+        os.kill(int(pid0), signal.SIGKILL)
+        assert wait_for(lambda: len(os.listdir(tmp_path)) == 3)
+        restarted = [pid for slot, pid in started_workers(tmp_path) if slot == '0' and pid != pid0]
+        assert len(restarted) == 1
+
+        parent.send_signal(signal.SIGTERM)
+        assert parent.wait(15) == 0
+        assert not os.path.exists(share_dir)
+        assert len(os.listdir(tmp_path)) == 3
+    finally:
+        if parent.poll() is None:
+            parent.kill()
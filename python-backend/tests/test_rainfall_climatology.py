@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import rainfall_climatology
+from rainfall_climatology import build_climatology_table, factored_climatology, monthly_rainfall
+
+@pytest.fixture(autouse=True)
+def generated_table(monkeypatch):
+    monkeypatch.setattr(rainfall_climatology, '_table', factored_climatology())
+
+def test_factored_table_indexes_like_the_full_array():
+    full = build_climatology_table()
+    table = factored_climatology()
+    assert table.shape == full.shape
+
+    rng = np.random.default_rng(4)
+    rows = rng.integers(0, full.shape[0], 500)
+    cols = rng.integers(0, full.shape[1], 500)
+    np.testing.assert_array_equal(table[rows, cols], full[rows, cols])
+    np.testing.assert_array_equal(table[3, 7], full[3, 7])
+
+def test_latitude_bands_and_oceanic_factor():
+    rainfall = monthly_rainfall([19.07, 30.0, 51.5, 10.0], [72.87, 100.0, -0.1, 0.0])
+    expected = np.array([rainfall_climatology.TROPICAL_MONTHLY, rainfall_climatology.SUBTROPICAL_MONTHLY,
+                         rainfall_climatology.TEMPERATE_MONTHLY, rainfall_climatology.TROPICAL_MONTHLY])
+    factors = np.array([1.2, 1.2, 0.8, 0.8])[:, None]
+    np.testing.assert_allclose(rainfall, np.round(expected * factors, 1), atol=0.051)
+
+def test_variation_is_seeded_and_bounded():
+    lats, lons = [19.07, 19.2, -33.9], [72.87, 72.9, 151.2]
+    base = monthly_rainfall(lats, lons)
+    first = monthly_rainfall(lats, lons, year=2026, variation=0.3)
+    assert np.array_equal(first, monthly_rainfall(lats, lons, year=2026, variation=0.3))
+    assert not np.array_equal(first, monthly_rainfall(lats, lons, year=2027, variation=0.3))
+    assert not np.array_equal(first, monthly_rainfall(lats, lons, year=2026, variation=0.3, seed=1))
+    assert np.all(first >= np.floor(base * 0.7 * 10) / 10) and np.all(first <= np.ceil(base * 1.3 * 10) / 10)
+    # Points in the same grid cell share an estimate
+    np.testing.assert_array_equal(first[0], first[1])
+
+def test_batch_matches_one_point_at_a_time():
+    rng = np.random.default_rng(9)
+    lats, lons = rng.uniform(-90, 90, 100), rng.uniform(-180, 180, 100)
+    batch = monthly_rainfall(lats, lons, year=2025, variation=0.3)
+    single = np.vstack([monthly_rainfall(lat, lon, year=2025, variation=0.3) for lat, lon in zip(lats, lons)])
+    np.testing.assert_array_equal(batch, single)
+
+def test_a_dropped_in_table_is_used_as_is(monkeypatch):
+    table = np.arange(4 * 8 * 12, dtype=np.float32).reshape(4, 8, 12)   # 45 degree cells
+    monkeypatch.setattr(rainfall_climatology, '_table', table)
+    np.testing.assert_array_equal(monthly_rainfall([80.0, -80.0], [-170.0, 170.0]), table[[0, 3], [0, 7]])
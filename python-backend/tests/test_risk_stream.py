@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+import main
+from main import FeedDelta, RISK_ZONE_LEVELS, delta_may_change_risk, publish_feed_snapshot
+
+FEED = 'past_day_all'
+USER = (19.07, 72.87)   # Mumbai
+
+def event(event_id, lat, lon, probability, updated=1):
+    return {'id': event_id, 'magnitude': 7.0, 'depth': 20.0, 'latitude': lat, 'longitude': lon,
+            'place': event_id, 'time': 1700000000000, 'updated': updated, 'tsunami_flag': 0,
+            'probability': probability}
+
+NEAR = event('near', 19.5, 72.5, 0.75)     # ~60 km: High Risk
+MID = event('mid', 21.0, 70.0, 0.9)        # ~370 km: Medium Risk
+FAR = event('far', -30.0, -60.0, 0.95)     # No Risk
+
+@pytest.fixture(autouse=True)
+def stub_model(monkeypatch):
+    monkeypatch.setattr(main, 'feed_snapshots', {})
+    monkeypatch.setattr(main, 'feed_update_events', {})
+    monkeypatch.setattr(main, 'get_tsunami_predictions',
+                        lambda earthquakes, model, metadata: [(eq['probability'] >= 0.3, eq['probability'])
+                                                              for eq in earthquakes])
+
+def delta(added=(), updated=(), removed=()):
+    return FeedDelta(added=tuple(added), updated=tuple(updated), removed=tuple(removed))
+
+def may_change(changes, level, event_id):
+    return delta_may_change_risk(changes, *USER, RISK_ZONE_LEVELS[level], event_id, None, {})
+
+def test_far_or_weaker_events_cannot_change_the_risk():
+    assert not may_change(delta(added=[FAR]), 'High Risk', 'near')
+    assert not may_change(delta(added=[MID]), 'High Risk', 'near')
+    assert not may_change(delta(removed=['other']), 'Medium Risk', 'mid')
+
+def test_events_reaching_the_current_level_may_change_it():
+    assert may_change(delta(added=[NEAR]), 'Medium Risk', 'mid')
+    assert may_change(delta(added=[MID]), 'Medium Risk', 'other')   # ties go to the earlier event
+    assert may_change(delta(added=[MID]), 'No Risk', None)
+
+def test_the_highest_risk_event_changing_always_counts():
+    assert may_change(delta(removed=['near']), 'High Risk', 'near')
+    assert may_change(delta(updated=[{**FAR, 'id': 'near'}]), 'High Risk', 'near')
+
+def feed(*earthquakes):
+    return {'status': 'success', 'earthquakes': list(earthquakes), 'metadata': {'count': len(earthquakes)}}
+
+def parse(message):
+    fields = dict(line.split(': ', 1) for line in message.strip().splitlines())
+    return fields.get('event'), fields.get('id'), json.loads(fields['data']) if 'data' in fields else None
+
+def test_stream_pushes_only_risk_changes(monkeypatch):
+    monkeypatch.setattr(main, 'SSE_HEARTBEAT_SECONDS', 0.2)
+    build = main.build_user_risk_assessment
+    builds = []
+    monkeypatch.setattr(main, 'build_user_risk_assessment', lambda *args: builds.append(args) or build(*args))
+
+    async def scenario():
+        publish_feed_snapshot(FEED, feed(MID))
+        response = await main.stream_tsunami_risk(latitude=USER[0], longitude=USER[1], feed_type=FEED,
+                                                  model_data=(None, {}))
+        stream = response.body_iterator
+        try:
+            name, version, body = parse(await asyncio.wait_for(stream.__anext__(), 2))
+            assert (name, version) == ('risk', '1')
+            assert body['highest_risk']['risk_zone'] == 'Medium Risk'
+            assert main.tsunami_stream_subscribers == 1
+
+            publish_feed_snapshot(FEED, feed(MID, FAR))     # cannot matter to this user
+            assert await asyncio.wait_for(stream.__anext__(), 2) == ': keep-alive\n\n'
+            assert len(builds) == 1
+
+            publish_feed_snapshot(FEED, feed(MID, FAR, NEAR))
+            name, version, body = parse(await asyncio.wait_for(stream.__anext__(), 2))
+            assert (name, version) == ('risk', '3')
+            assert body['highest_risk']['risk_zone'] == 'High Risk'
+            assert body['highest_risk']['earthquake']['id'] == 'near'
+        finally:
+            await stream.aclose()
+        assert main.tsunami_stream_subscribers == 0
+
+    asyncio.run(scenario())
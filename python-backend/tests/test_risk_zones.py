@@ -0,0 +1,55 @@
+import numpy as np
+
+from geodesy import haversine_distance, haversine_distances, within_bounding_box
+from main import RISK_ZONE_MAX_DISTANCE_KM, RISK_ZONE_NAMES, classify_user_risk_zone, classify_user_risk_zones
+
+def reference_zone(distance_km, tsunami_predicted, probability):
+    """The original per-event thresholds"""
+    if not tsunami_predicted or probability < 0.3:
+        return 'No Risk'
+    if distance_km <= 100:
+        return 'High Risk' if probability >= 0.7 else 'Medium Risk'
+    if distance_km <= 500:
+        return 'Medium Risk' if probability >= 0.8 else 'Low Risk'
+    if distance_km <= 1000:
+        return 'Low Risk' if probability >= 0.8 else 'No Risk'
+    return 'No Risk'
+
+def random_feed(rng, size, user_lat, user_lon):
+    # Half the events near the user so every distance band is exercised
+    near = size // 2
+    lats = np.concatenate([user_lat + rng.uniform(-12, 12, near), rng.uniform(-90, 90, size - near)]).clip(-90, 90)
+    lons = (np.concatenate([user_lon + rng.uniform(-12, 12, near), rng.uniform(-180, 180, size - near)])
+            + 180) % 360 - 180
+    return lats, lons, rng.random(size) < 0.7, rng.random(size)
+
+def test_vectorized_zones_match_the_per_event_classifier():
+    rng = np.random.default_rng(7)
+    for user_lat, user_lon in [(19.07, 72.87), (-33.9, 151.2), (64.1, -21.9), (0.0, 179.9), (89.5, 10.0)]:
+        lats, lons, predicted, probability = random_feed(rng, 400, user_lat, user_lon)
+        distances, levels = classify_user_risk_zones(lats, lons, user_lat, user_lon, predicted, probability)
+
+        for i in range(len(lats)):
+            single = classify_user_risk_zone(lats[i], lons[i], user_lat, user_lon,
+                                             bool(predicted[i]), float(probability[i]))
+            assert RISK_ZONE_NAMES[levels[i]] == single['risk_zone']
+            assert single['risk_zone'] == reference_zone(distances[i], predicted[i], probability[i])
+            assert round(float(distances[i]), 2) == single['distance_km']
+
+def test_vectorized_haversine_matches_scalar():
+    rng = np.random.default_rng(3)
+    lats, lons = rng.uniform(-90, 90, 200), rng.uniform(-180, 180, 200)
+    vectorized = haversine_distances(lats, lons, 35.0, 139.0)
+    scalar = [haversine_distance(lat, lon, 35.0, 139.0) for lat, lon in zip(lats, lons)]
+    np.testing.assert_allclose(vectorized, scalar, rtol=1e-12)
+
+def test_bounding_box_never_drops_a_point_inside_the_radius():
+    rng = np.random.default_rng(11)
+    for center_lat, center_lon in [(0.0, 0.0), (45.0, 179.5), (-60.0, -179.8), (85.0, 30.0), (-89.0, 0.0)]:
+        lats = rng.uniform(-90, 90, 20000)
+        lons = rng.uniform(-180, 180, 20000)
+        inside = haversine_distances(lats, lons, center_lat, center_lon) <= RISK_ZONE_MAX_DISTANCE_KM
+        kept = within_bounding_box(center_lat, center_lon, lats, lons, RISK_ZONE_MAX_DISTANCE_KM)
+        assert inside.any()
+        assert not (inside & ~kept).any()
+        assert kept.sum() < len(lats)
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+import main
+from main import TsunamiInput, engineer_tsunami_features, engineer_tsunami_features_batch
+
+MODELS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
+@pytest.fixture(autouse=True, params=['continental boxes', 'land/sea mask'])
+def ocean_lookup(request, monkeypatch):
+    monkeypatch.setattr(main, 'ocean_mask', None)
+    if request.param == 'land/sea mask':
+        main.load_ocean_mask(MODELS)
+
+def sample_events():
+    rng = np.random.default_rng(12)
+    magnitudes = np.concatenate([[1.0, 3.99, 4.0, 4.5, 6.99, 7.0, 8.0, 9.5, 10.0], rng.uniform(1, 10, 200)])
+    depths = np.concatenate([[0.0, 69.99, 70.0, 70.01, 700.0, 10.0, 35.0, 300.0, 5.0], rng.uniform(0, 700, 200)])
+    lats = np.concatenate([[0.0, 90.0, -90.0, 35.0, 25.0, -45.0, 70.0, 10.0, -10.0], rng.uniform(-90, 90, 200)])
+    lons = np.concatenate([[0.0, 180.0, -180.0, 139.0, -160.0, 110.0, -50.0, 55.0, -85.0], rng.uniform(-180, 180, 200)])
+    return magnitudes, depths, lats, lons
+
+def single_rows(magnitudes, depths, lats, lons):
+    return np.array([engineer_tsunami_features(TsunamiInput(magnitude=m, depth=d, latitude=la, longitude=lo))
+                     for m, d, la, lo in zip(magnitudes, depths, lats, lons)])
+
+def test_batch_rows_match_single_rows():
+    events = sample_events()
+    np.testing.assert_array_equal(engineer_tsunami_features_batch(*events), single_rows(*events))
+
+def test_in_place_standardization_matches_transform():
+    events = sample_events()
+    rows = single_rows(*events)
+    scaler = StandardScaler().fit(rows)
+
+    standardized = engineer_tsunami_features_batch(*events, scaler=scaler)
+    np.testing.assert_allclose(standardized, scaler.transform(rows), rtol=1e-12, atol=1e-12)
+
+def test_empty_batch():
+    assert engineer_tsunami_features_batch([], [], [], []).shape == (0, 11)
@@ -0,0 +1,69 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+
+import main
+from main import fetch_usgs_earthquake_data, publish_feed_snapshot
+
+FEED = 'past_day_all'
+ETAG = '"feed-v1"'
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+BODY = json.dumps({
+    'type': 'FeatureCollection', 'metadata': {'count': 1, 'title': 'test'},
+    'features': [{'type': 'Feature', 'id': 'us1',
+                  'properties': {'mag': 6.1, 'place': 'off Japan', 'time': 1700000000000,
+                                 'updated': 1700000100000, 'tsunami': 1},
+                  'geometry': {'type': 'Point', 'coordinates': [142.37, 38.3, 29.0]}}]
+}).encode()
+
+class USGS:
+    """Answers 304 when the client already has the current ETag"""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if request.headers.get('If-None-Match') == ETAG:
+            return httpx.Response(304, headers={'ETag': ETAG})
+        return httpx.Response(200, stream=httpx.ByteStream(gzip.compress(BODY)),
+                              headers={'Content-Encoding': 'gzip', 'Content-Type': 'application/json',
+                                       'ETag': ETAG, 'Last-Modified': LAST_MODIFIED})
+
+@pytest.fixture
+def usgs(monkeypatch):
+    server = USGS()
+    monkeypatch.setattr(main, 'feed_snapshots', {})
+    monkeypatch.setattr(main, 'feed_update_events', {})
+    monkeypatch.setattr(main, 'usgs_transfer_stats', {})
+    monkeypatch.setattr(main, 'http_clients', {'usgs': httpx.AsyncClient(transport=httpx.MockTransport(server))})
+    return server
+
+def fetch():
+    async def run():
+        return await fetch_usgs_earthquake_data(FEED)
+    return asyncio.run(run())
+
+def test_first_fetch_is_unconditional_and_gzip_decoded(usgs):
+    result = fetch()
+
+    assert 'If-None-Match' not in usgs.requests[0].headers
+    assert result['status'] == 'success' and not result.get('not_modified')
+    assert [eq['id'] for eq in result['earthquakes']] == ['us1']
+    assert (result['etag'], result['last_modified']) == (ETAG, LAST_MODIFIED)
+    assert main.usgs_transfer_stats[FEED]['bytes_received'] == len(gzip.compress(BODY))
+
+def test_unchanged_feed_comes_back_as_not_modified(usgs):
+    first = publish_feed_snapshot(FEED, fetch())
+    result = fetch()
+
+    assert usgs.requests[1].headers['If-None-Match'] == ETAG
+    assert usgs.requests[1].headers['If-Modified-Since'] == LAST_MODIFIED
+    assert result['not_modified'] and result['earthquakes'] == list(first.earthquakes)
+    assert publish_feed_snapshot(FEED, result).version == first.version
+    assert main.usgs_transfer_stats[FEED] == {'responses': 2, 'not_modified': 1,
+                                              'bytes_received': len(gzip.compress(BODY))}
@@ -0,0 +1,102 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from usgs_geojson import MISSING_TIME, FeatureCollectionParser
+
+def feature(event_id, mag, lon, lat, depth, place, time, updated, tsunami=0):
+    return {
+        'type': 'Feature',
+        'id': event_id,
+        'properties': {'mag': mag, 'place': place, 'time': time, 'updated': updated, 'tsunami': tsunami},
+        'geometry': {'type': 'Point', 'coordinates': [lon, lat, depth]}
+    }
+
+FEATURES = [
+    feature('us1', 6.1, 142.37, 38.3, 29.0, '72 km E of Ōfunato, Japan', 1700000000000, 1700000100000, 1),
+    feature('us2', None, -179.99, -15.5, None, 'Fiji region "deep"', 1700000200000, None),
+    feature('us3', 4.5, 0.0, 0.0, 10.0, None, None, 1700000300000),
+]
+
+def feed_body(features=FEATURES, **members) -> bytes:
+    document = {'type': 'FeatureCollection', 'metadata': {'count': len(features), 'title': 'test'},
+                'features': features, 'bbox': [-180, -90, 0, 180, 90, 700], **members}
+    return json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+def parse(chunks):
+    parser = FeatureCollectionParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+def assert_same_columns(a, b):
+    for name in ('ids', 'places'):
+        assert getattr(a, name).tolist() == getattr(b, name).tolist()
+    for name in ('magnitude', 'depth', 'latitude', 'longitude', 'time', 'updated', 'tsunami_flag'):
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+
+def test_parses_members_and_columns():
+    members, columns = parse([feed_body()])
+
+    assert members['metadata'] == {'count': 3, 'title': 'test'}
+    assert members['bbox'] == [-180, -90, 0, 180, 90, 700]
+    assert 'features' not in members
+    assert columns.ids.tolist() == ['us1', 'us2', 'us3']
+    assert columns.places.tolist() == ['72 km E of Ōfunato, Japan', 'Fiji region "deep"', None]
+    assert np.isnan(columns.magnitude[1]) and np.isnan(columns.depth[1])
+    assert columns.time[2] == MISSING_TIME and columns.updated[1] == MISSING_TIME
+    assert columns.tsunami_flag.tolist() == [1, 0, 0]
+
+def test_every_split_point_gives_the_same_columns():
+    body = feed_body()
+    _, expected = parse([body])
+    for split in range(1, len(body)):
+        _, columns = parse([body[:split], body[split:]])
+        assert_same_columns(columns, expected)
+
+def test_random_chunk_sizes_give_the_same_columns():
+    body = feed_body([feature(f'ev{i}', 2 + i % 5, i % 360 - 180, i % 180 - 90, i % 70, f'place {i} ü',
+                              1700000000000 + i, 1700000000000 + 2 * i) for i in range(500)])
+    _, expected = parse([body])
+    rng = random.Random(7)
+    for _ in range(20):
+        chunks, position = [], 0
+        while position < len(body):
+            size = rng.randint(1, 300)
+            chunks.append(body[position:position + size])
+            position += size
+        _, columns = parse(chunks)
+        assert_same_columns(columns, expected)
+
+@pytest.mark.parametrize('cut', [1, 40, -30, -1])
+def test_truncated_body_raises(cut):
+    body = feed_body()
+    with pytest.raises(ValueError):
+        parse([body[:cut]])
+
+def test_metadata_count_reserves_the_columns_once():
+    many = [feature(f'ev{i}', 5.0, 0, 0, 10, 'x', 1, 1) for i in range(1000)]
+    body = feed_body(many)
+    parser = FeatureCollectionParser()
+    parser.feed(body[:body.index(b'"features"')])
+    assert parser._columns.capacity == 1000
+    parser.feed(body[body.index(b'"features"'):])
+    _, columns = parser.close()
+    assert parser._columns.capacity == 1000
+    assert len(columns) == 1000
+
+def test_to_events_reuses_unchanged_events():
+    _, columns = parse([feed_body()])
+    events = columns.to_events()
+    assert events[0] == {'id': 'us1', 'magnitude': 6.1, 'depth': 29.0, 'latitude': 38.3, 'longitude': 142.37,
+                         'place': '72 km E of Ōfunato, Japan', 'time': 1700000000000,
+                         'updated': 1700000100000, 'tsunami_flag': 1}
+    assert events[1]['magnitude'] is None and events[1]['depth'] == 0 and events[1]['updated'] is None
+
+    previous = {event['id']: event for event in events}
+    previous['us3'] = {**previous['us3'], 'updated': 1}
+    again = columns.to_events(previous)
+    assert again[0] is events[0] and again[1] is events[1]
+    assert again[2] is not previous['us3'] and again[2] == events[2]
@@ -0,0 +1,248 @@
+"""
+Incremental parser for USGS GeoJSON summary feeds
+
+The feeds are a single FeatureCollection, up to several MB for
+`past_day_all` or `past_month_m45`. Rather than building the whole document
+as nested dicts, the parser is fed the response body chunk by chunk, decodes
+one feature at a time and writes the fields the API uses straight into typed
+columns:
+
+    ids, places           -> object arrays
+    magnitude, depth,
+    latitude, longitude   -> float64 (NaN when missing)
+    time, updated         -> int64 epoch ms (MISSING_TIME when missing)
+    tsunami_flag          -> int8
+
+USGS puts `metadata` (with the feature `count`) ahead of `features`, so the
+columns are normally allocated once at the right size.
+"""
+
+import codecs
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MISSING_TIME = np.iinfo(np.int64).min
+
+_SKIP = re.compile(r'[\s,]*')
+_COLON = re.compile(r'\s*:\s*')
+_decoder = json.JSONDecoder()
+
+@dataclass(frozen=True)
+class FeedColumns:
+    """Per-feature columns of one parsed feed, in feed order"""
+    ids: np.ndarray
+    magnitude: np.ndarray
+    depth: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    time: np.ndarray
+    updated: np.ndarray
+    tsunami_flag: np.ndarray
+    places: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_events(self, previous: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Event dicts in the API's shape
+
+        An event found in `previous` with the same `updated` is reused as is, so
+        dicts are only built for new and updated events.
+        """
+        previous = previous or {}
+        magnitude = self.magnitude.tolist()
+        depth = self.depth.tolist()
+        latitude = self.latitude.tolist()
+        longitude = self.longitude.tolist()
+        time = self.time.tolist()
+        updated = self.updated.tolist()
+        tsunami_flag = self.tsunami_flag.tolist()
+
+        events = []
+        for i, event_id in enumerate(self.ids.tolist()):
+            event_updated = None if updated[i] == MISSING_TIME else updated[i]
+            known = previous.get(event_id)
+            if known is not None and known['updated'] == event_updated:
+                events.append(known)
+                continue
+
+            events.append({
+                'id': event_id,
+                'magnitude': None if magnitude[i] != magnitude[i] else magnitude[i],
+                'depth': 0 if depth[i] != depth[i] else depth[i],
+                'latitude': latitude[i],
+                'longitude': longitude[i],
+                'place': self.places[i],
+                'time': None if time[i] == MISSING_TIME else time[i],
+                'updated': event_updated,
+                'tsunami_flag': tsunami_flag[i]
+            })
+        return events
+
+class _ColumnBuilder:
+    """Growable typed columns; starts at the expected size when it is known"""
+
+    FLOAT_COLUMNS = ('magnitude', 'depth', 'latitude', 'longitude')
+    INT_COLUMNS = ('time', 'updated')
+
+    def __init__(self, capacity: int = 256):
+        self.size = 0
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int):
+        old = getattr(self, 'columns', None)
+        columns = {name: np.full(capacity, np.nan) for name in self.FLOAT_COLUMNS}
+        columns.update({name: np.full(capacity, MISSING_TIME, dtype=np.int64) for name in self.INT_COLUMNS})
+        columns['tsunami_flag'] = np.zeros(capacity, dtype=np.int8)
+        columns['ids'] = np.empty(capacity, dtype=object)
+        columns['places'] = np.empty(capacity, dtype=object)
+        if old is not None:
+            for name, column in old.items():
+                columns[name][:self.size] = column[:self.size]
+        self.columns = columns
+        self.capacity = capacity
+
+    def reserve(self, capacity: int):
+        if capacity > self.capacity:
+            self._allocate(capacity)
+
+    def append(self, feature: Dict[str, Any]):
+        if self.size == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        i = self.size
+        columns = self.columns
+        props = feature.get('properties') or {}
+        coords = (feature.get('geometry') or {}).get('coordinates') or [0, 0, 0]
+
+        columns['ids'][i] = feature.get('id')
+        columns['places'][i] = props.get('place')
+        columns['longitude'][i] = coords[0]
+        columns['latitude'][i] = coords[1]
+        if len(coords) > 2 and coords[2] is not None:
+            columns['depth'][i] = coords[2]
+        if props.get('mag') is not None:
+            columns['magnitude'][i] = props['mag']
+        if props.get('time') is not None:
+            columns['time'][i] = props['time']
+        if props.get('updated') is not None:
+            columns['updated'][i] = props['updated']
+        columns['tsunami_flag'][i] = props.get('tsunami') or 0
+        self.size = i + 1
+
+    def finish(self) -> FeedColumns:
+        return FeedColumns(**{name: column[:self.size] for name, column in self.columns.items()})
+
+class FeatureCollectionParser:
+    """Push parser for a GeoJSON FeatureCollection
+
+    Call feed() with each chunk of the body, then close() for
+    (top-level members other than `features`, FeedColumns). Each feature is
+    decoded on its own and dropped once its fields are in the columns, so
+    memory stays at the columns plus one chunk.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'start'       # start -> members <-> features -> done
+        self.members: Dict[str, Any] = {}
+        self._columns = _ColumnBuilder()
+
+    def feed(self, chunk: bytes):
+        self._buffer += self._text.decode(chunk)
+        self._parse(final=False)
+        if self._pos > 65536:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+    def close(self) -> Tuple[Dict[str, Any], FeedColumns]:
+        self._buffer += self._text.decode(b'', final=True)
+        self._parse(final=True)
+        if self._state != 'done':
+            raise ValueError("Truncated GeoJSON feed")
+        return self.members, self._columns.finish()
+
+    def _value(self, final: bool) -> Optional[Tuple[Any, int]]:
+        """Decode the JSON value at the current position, or None if it may be incomplete"""
+        try:
+            value, end = _decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        # A number or literal running to the end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not final:
+            return None
+        return value, end
+
+    def _parse(self, final: bool):
+        buffer = self._buffer
+        while True:
+            self._pos = _SKIP.match(buffer, self._pos).end()
+            if self._pos >= len(buffer):
+                return
+
+            if self._state == 'start':
+                if buffer[self._pos] != '{':
+                    raise ValueError("GeoJSON feed is not a JSON object")
+                self._pos += 1
+                self._state = 'members'
+
+            elif self._state == 'members':
+                if buffer[self._pos] == '}':
+                    self._pos += 1
+                    self._state = 'done'
+                    continue
+
+                # "key" : value
+                decoded = self._value(final)
+                if decoded is None:
+                    return
+                key, key_end = decoded
+                colon = _COLON.match(buffer, key_end)
+                if colon is None:
+                    if buffer[key_end:].strip():
+                        raise ValueError("Malformed GeoJSON object member")
+                    return
+                value_start = colon.end()
+                if value_start >= len(buffer):
+                    return
+
+                if key == 'features':
+                    if buffer[value_start] != '[':
+                        raise ValueError("GeoJSON `features` is not an array")
+                    self._pos = value_start + 1
+                    self._state = 'features'
+                    continue
+
+                saved, self._pos = self._pos, value_start
+                decoded = self._value(final)
+                if decoded is None:
+                    self._pos = saved
+                    return
+                self.members[key], self._pos = decoded
+                if key == 'metadata' and isinstance(self.members[key], dict):
+                    count = self.members[key].get('count')
+                    if isinstance(count, int):
+                        self._columns.reserve(count)
+
+            elif self._state == 'features':
+                if buffer[self._pos] == ']':
+                    self._pos += 1
+                    self._state = 'members'
+                    continue
+
+                decoded = self._value(final)
+                if decoded is None:
+                    return
+                feature, self._pos = decoded
+                self._columns.append(feature)
+
+            else:
+                raise ValueError("Unexpected data after GeoJSON feed")